@@ -55,3 +55,6 @@ STORAGE_IFACE_INSTANCE = DefaultOMMStore(
 
 # Debugging stuff
 # SQLALCHEMY_ENGINE_LOG_LEVEL = logging.INFO
+
+# Profile every run of the background tasks, see /c/background_tasks/profiles
+# PROFILE_BACKGROUND_TASKS = True
@@ -26,3 +26,9 @@ PRODUCTION = True
 # APScheduler
 TASK_FETCHER = True
 TASK_INDEXER = True
+
+# Profile every run of the background tasks (@see OpenMediaMatch.utils.profiling)
+# Profiles are served by this process at /c/background_tasks/profiles,
+# which also needs ROLE_CURATOR = True
+# PROFILE_BACKGROUND_TASKS = True
+# PROFILE_TOP_N = 25
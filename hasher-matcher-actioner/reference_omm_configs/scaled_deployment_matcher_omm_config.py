@@ -11,7 +11,6 @@ then this will be the largest pool of instances.
 
 import os
 
-
 # Database configuration
 DBUSER = os.environ.get("POSTGRES_USER", "media_match")
 DBPASS = os.environ.get("POSTGRES_PASSWORD", "hunter2")
@@ -28,3 +27,9 @@ ROLE_HASHER = False
 
 # Background tasks configuration
 TASK_INDEX_CACHE = True
+
+# Tracing of matcher requests (@see OpenMediaMatch.utils.tracing)
+# Traces are logged by default; sample a small fraction to keep it cheap
+# TRACING_SAMPLE_RATE = 0.01
+# from OpenMediaMatch.utils.tracing import OpenTelemetrySpanExporter
+# TRACING_EXPORTER_INSTANCE = OpenTelemetrySpanExporter()
@@ -0,0 +1,103 @@
+"""
+Content-addressed blob store for the HMA Review Tool.
+
+Image bytes live on the local filesystem rather than in the database,
+named by their SHA-1 (which is also stored as the image's SHA1 hash), so
+identical uploads share one file. Files are written once, atomically, and
+never modified, which makes them safe to serve in chunks and to cache.
+
+A blob is deleted once no image references it. Storing a blob and
+committing the image that references it, and checking for references and
+deleting, each happen under lock(), so an upload of the same bytes can't
+lose its blob to a concurrent delete.
+"""
+
+import fcntl
+import hashlib
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Relative to the working directory, like the database
+BLOB_STORE_DIR = os.environ.get("BLOB_STORE_DIR", "./blobs")
+CHUNK_SIZE = 64 * 1024
+
+_SHA1_RE = re.compile(r"^[0-9a-f]{40}$")
+
+
+class BlobStore:
+    def __init__(self, root: str = BLOB_STORE_DIR):
+        self.root = root
+
+    def path_for(self, sha1: str) -> str:
+        """Where a blob lives, i.e. ./blobs/ab/cdef..., fanned out to keep directories small."""
+        if not _SHA1_RE.match(sha1):
+            raise ValueError(f"Invalid SHA-1: {sha1}")
+        return os.path.join(self.root, sha1[:2], sha1[2:])
+
+    def exists(self, sha1: str) -> bool:
+        return os.path.exists(self.path_for(sha1))
+
+    def size(self, sha1: str) -> int:
+        return os.path.getsize(self.path_for(sha1))
+
+    def put(self, data: bytes) -> str:
+        """Store data, if it isn't already. Returns its SHA-1."""
+        sha1 = hashlib.sha1(data).hexdigest()
+        path = self.path_for(sha1)
+        if os.path.exists(path):
+            return sha1
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename it into place, so a blob is
+        # either missing or complete, even with concurrent writers
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return sha1
+
+    def iter_range(
+        self, sha1: str, start: int = 0, end: Optional[int] = None, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Read bytes start..end (inclusive, default to the end) in chunks."""
+        with open(self.path_for(sha1), "rb") as f:
+            f.seek(start)
+            remaining = (end - start + 1) if end is not None else None
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Hold while adding or removing references to blobs.
+
+        A file lock, so it also excludes other server processes using the store.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        # Each open is locked separately, so this also excludes other threads
+        with open(os.path.join(self.root, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield  # Closing the file releases the lock
+
+    def delete(self, sha1: str):
+        """Remove a blob. Callers check that nothing references it first, under lock()."""
+        try:
+            os.unlink(self.path_for(sha1))
+        except FileNotFoundError:
+            pass
+
+
+blob_store = BlobStore()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, ForeignKey, LargeBinary
+from sqlalchemy import create_engine, inspect, Column, Integer, String, Float, DateTime, Boolean, ForeignKey, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 import datetime
@@ -24,3 +24,47 @@ def get_db():
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+    # create_all() skips tables that already exist, so add (nullable) columns
+    # and indices that were introduced after an existing database was created
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+    _add_autoincrement()
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def _add_autoincrement():
+    """
+    Rebuild tables that are now AUTOINCREMENT, but were created without it.
+
+    SQLite can't alter a table's primary key, so the table is recreated and
+    its rows copied over, keeping their ids.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not table.dialect_options["sqlite"]["autoincrement"]:
+                continue
+            sql = conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+            ).scalar()
+            if "AUTOINCREMENT" in sql.upper():
+                continue
+            print(f"Rebuilding {table.name} with AUTOINCREMENT...")
+            # Index names are per database, so drop them to recreate them on the new table
+            for index in inspector.get_indexes(table.name):
+                conn.exec_driver_sql(f"DROP INDEX {index['name']}")
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {table.name}_old")
+            table.create(bind=conn)
+            columns = ", ".join(column.name for column in table.columns)
+            # Explicit ids also advance the table's AUTOINCREMENT counter
+            conn.exec_driver_sql(
+                f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_old"
+            )
+            conn.exec_driver_sql(f"DROP TABLE {table.name}_old")
@@ -0,0 +1,47 @@
+"""
+Hashing image files, in the upload processor's worker processes.
+
+Kept apart from the rest of the backend so that worker processes only
+import what hashing needs.
+"""
+
+import hashlib
+from typing import Dict, Tuple
+
+from models import HashAlgorithm
+from setup_pdq import setup_pdq_path
+
+setup_pdq_path()
+try:
+    from pdqhashing.hasher.pdq_hasher import PDQHasher
+except ImportError:
+    print("Warning: PDQ hasher not available. Uploads won't get PDQ hashes.")
+    PDQHasher = None
+
+# One per process, it precomputes its DCT matrix
+_pdq_hasher = None
+
+def compute_hashes(path: str) -> Dict[str, Tuple[str, float]]:
+    """
+    Hash an image file with every algorithm.
+
+    Args:
+        path: Path to the image file, i.e. from the blob store
+
+    Returns:
+        {algorithm: (hash value, quality)}
+    """
+    global _pdq_hasher
+    with open(path, "rb") as f:
+        contents = f.read()
+
+    hashes = {
+        HashAlgorithm.MD5.value: (hashlib.md5(contents).hexdigest(), 1.0),
+        HashAlgorithm.SHA1.value: (hashlib.sha1(contents).hexdigest(), 1.0),
+    }
+    if PDQHasher is not None:
+        if _pdq_hasher is None:
+            _pdq_hasher = PDQHasher()
+        result = _pdq_hasher.fromFile(path)
+        hashes[HashAlgorithm.PDQ.value] = (result.getHash().toHexString(), float(result.getQuality()))
+    return hashes
@@ -6,6 +6,7 @@ import os
 from routes import router
 from database import init_db
 from queue_config import init_app as init_queue
+from upload_processor import init_app as init_upload_processor
 
 # Create tables
 init_db()
@@ -31,6 +32,9 @@ app.include_router(router, prefix="/api/v1")
 # Initialize queue system
 init_queue(app)
 
+# Hash and match uploads in the background
+init_upload_processor(app)
+
 @app.get("/")
 async def root():
     return {
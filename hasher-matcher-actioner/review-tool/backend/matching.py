@@ -0,0 +1,105 @@
+"""
+Finding matches for an image's hashes among the other images.
+"""
+
+from sqlalchemy.orm import Session
+
+from models import Image, Hash, Match, HashAlgorithm
+from pdq_index import pdq_index, PDQ_BITS
+
+def find_matches(image_id: int, db: Session):
+    """Find and store matches for an image."""
+    # Get the image and its hashes
+    image_hashes = db.query(Hash).filter(Hash.image_id == image_id).all()
+    
+    # Group hashes by algorithm
+    hashes_by_algo = {}
+    for hash_obj in image_hashes:
+        hashes_by_algo[hash_obj.algorithm] = hash_obj
+    
+    # For each algorithm, find potential matches
+    for algo, hash_obj in hashes_by_algo.items():
+        if algo == HashAlgorithm.PDQ.value:
+            # For PDQ, find images with similar PDQ hashes
+            pdq_matches = find_pdq_matches(hash_obj.hash_value, db, image_id)
+            for match in pdq_matches:
+                db_match = Match(
+                    query_image_id=image_id,
+                    matched_image_id=match["image_id"],
+                    algorithm=algo,
+                    distance=match["distance"]
+                )
+                db.add(db_match)
+        
+        elif algo in [HashAlgorithm.MD5.value, HashAlgorithm.SHA1.value]:
+            # For cryptographic hashes, find exact matches
+            crypto_matches = find_crypto_matches(hash_obj.hash_value, algo, db, image_id)
+            for match in crypto_matches:
+                db_match = Match(
+                    query_image_id=image_id,
+                    matched_image_id=match["image_id"],
+                    algorithm=algo,
+                    distance=0.0  # Exact match
+                )
+                db.add(db_match)
+    
+    db.commit()
+
+def find_pdq_matches(hash_value: str, db: Session, exclude_image_id: int = None, threshold: float = 0.2):
+    """Find images with similar PDQ hashes."""
+    # Search the in-memory index rather than comparing every stored hash
+    pdq_index.catch_up()
+    max_bits = int(threshold * PDQ_BITS + 1e-9)
+    distances = {
+        image_id: distance
+        for image_id, distance in pdq_index.query(hash_value, max_bits)
+        if image_id != exclude_image_id
+    }
+    if not distances:
+        return []
+    
+    # Images deleted by another process may still be in this one's index
+    pdq_hashes = db.query(Hash.image_id, Hash.hash_value).filter(
+        Hash.algorithm == HashAlgorithm.PDQ.value,
+        Hash.image_id.in_(distances)
+    ).all()
+    
+    matches = []
+    for hash_obj in pdq_hashes:
+        matches.append({
+            "image_id": hash_obj.image_id,
+            "hash_value": hash_obj.hash_value,
+            "distance": distances[hash_obj.image_id] / PDQ_BITS
+        })
+    
+    # Sort by distance (most similar first)
+    matches.sort(key=lambda x: x["distance"])
+    return matches
+
+def find_crypto_matches(hash_value: str, algorithm: str, db: Session, exclude_image_id: int = None):
+    """Find images with matching cryptographic hashes."""
+    matches = []
+    
+    # Find exact matches
+    hash_objs = db.query(Hash).join(Image).filter(
+        Hash.algorithm == algorithm,
+        Hash.hash_value == hash_value,
+        Hash.image_id != exclude_image_id
+    ).all()
+    
+    for hash_obj in hash_objs:
+        matches.append({
+            "image_id": hash_obj.image_id,
+            "hash_value": hash_obj.hash_value,
+            "distance": 0.0
+        })
+    
+    return matches
+
+def calculate_pdq_distance(hash1: str, hash2: str) -> float:
+    """Calculate the normalized Hamming distance between two PDQ hashes."""
+    # Count the differing bits of the hashes as integers
+    hamming_distance = bin(int(hash1, 16) ^ int(hash2, 16)).count("1")
+    
+    # Normalize to 0-1 range
+    return hamming_distance / (len(hash1) * 4)
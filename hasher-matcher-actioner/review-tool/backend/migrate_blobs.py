@@ -0,0 +1,67 @@
+"""
+Move image bytes stored in the database into the blob store.
+
+Images uploaded before the blob store kept their bytes in images.data.
+This writes each one to the blob store, records its SHA-1, and clears the
+column. It's safe to interrupt and rerun, and the review tool serves
+images that haven't been moved yet from the database in the meantime.
+
+Usage:
+    python migrate_blobs.py [--batch-size N] [--vacuum]
+
+--vacuum rebuilds the database file afterwards, to give the freed space
+back to the filesystem (SQLite otherwise keeps the file at its old size).
+"""
+
+import argparse
+
+from sqlalchemy.orm import undefer
+
+from blob_store import blob_store
+from database import SessionLocal, engine, init_db
+from models import Image
+
+def migrate_blobs(batch_size: int = 100) -> int:
+    """Move every image's bytes to the blob store. Returns how many were moved."""
+    # Adds the sha1 column to databases from before the blob store
+    init_db()
+
+    db = SessionLocal()
+    moved = 0
+    try:
+        while True:
+            # Cleared rows drop out of the filter, so always take the first batch
+            images = db.query(Image).options(undefer(Image.data)).filter(
+                Image.data.isnot(None)
+            ).order_by(Image.id).limit(batch_size).all()
+            if not images:
+                break
+            with blob_store.lock():
+                for image in images:
+                    image.sha1 = blob_store.put(image.data)
+                    image.data = None
+                # Blobs are written before the commit, so no image loses its bytes
+                db.commit()
+            moved += len(images)
+            print(f"Moved {moved} images to {blob_store.root}")
+    finally:
+        db.close()
+    return moved
+
+def vacuum():
+    """Rebuild the database file, releasing the space the blobs used."""
+    print("Vacuuming database...")
+    # VACUUM can't run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move image bytes from the database to the blob store")
+    parser.add_argument("--batch-size", type=int, default=100, help="Images to move per transaction")
+    parser.add_argument("--vacuum", action="store_true", help="Rebuild the database file afterwards")
+    args = parser.parse_args()
+
+    moved = migrate_blobs(args.batch_size)
+    print(f"Done, moved {moved} images.")
+    if args.vacuum:
+        vacuum()
@@ -0,0 +1,81 @@
+"""
+Bring review tasks queued by older versions of the review tool up to date.
+
+Tasks used to be queued only in bull:{queue}:wait, scored by priority, and
+found again by scanning every queue. Now they're claimed from the
+prioritized zsets and completed through the jobs hash (see
+queue_manager.py), so without this, pending tasks from before are never
+claimed, tasks being reviewed can't be completed, and queue stats read
+their priorities as timestamps.
+
+For each old task, this adds it to the prioritized zset for its confidence
+level, rescores it in the wait zset by when it was added, and records its
+queue in the jobs hash. It's safe to rerun, tasks already migrated (or
+added since) are left alone. Run it with the review tool stopped, or after
+draining the queues instead.
+
+Usage:
+    python migrate_queues.py
+"""
+
+import json
+import time
+from typing import Optional
+
+from redis import Redis
+
+from queue_config import get_redis, get_queue_name, QueueNames, CONTENT_CATEGORIES
+from queue_manager import JOBS_KEY, MAX_PRIORITY, PRIORITY_SCALE
+
+def _added_at_ms(job_id: str) -> int:
+    """When a task was added, from its id (task:{epoch ms}:{image id}[:...])."""
+    try:
+        return int(job_id.split(":")[1])
+    except (IndexError, ValueError):
+        return int(time.time() * 1000)
+
+def migrate_queues(redis: Optional[Redis] = None) -> int:
+    """Migrate every old pending and active task. Returns how many were migrated."""
+    redis = redis or get_redis()
+    migrated = 0
+    for category in CONTENT_CATEGORIES:
+        for queue_type in QueueNames.get_all():
+            for is_escalated in [False, True]:
+                queue_name = get_queue_name(queue_type, category, is_escalated)
+                queue_key = f"bull:{queue_name}"
+
+                for job_id, old_score in redis.zrange(f"{queue_key}:wait", 0, -1, withscores=True):
+                    if redis.hexists(JOBS_KEY, job_id):
+                        continue
+                    job_key = f"{queue_key}:{job_id}"
+                    data = redis.hget(job_key, "data")
+                    if data is None:
+                        # Nothing left to review
+                        redis.zrem(f"{queue_key}:wait", job_id)
+                        continue
+                    confidence_level = json.loads(data)["confidenceLevel"]
+                    opts = json.loads(redis.hget(job_key, "opts") or "{}")
+                    # The old wait score was the priority
+                    priority = int(opts.get("priority", old_score))
+                    priority = max(-MAX_PRIORITY, min(MAX_PRIORITY, priority))
+                    added_at_ms = _added_at_ms(job_id)
+
+                    pipe = redis.pipeline(transaction=True)
+                    pipe.hset(JOBS_KEY, job_id, queue_name)
+                    pipe.zadd(f"{queue_key}:wait", {job_id: added_at_ms / 1000})
+                    pipe.zadd(
+                        f"{queue_key}:prioritized:{confidence_level}",
+                        {job_id: added_at_ms - priority * PRIORITY_SCALE}
+                    )
+                    pipe.execute()
+                    migrated += 1
+
+                for job_id in redis.zrange(f"{queue_key}:active", 0, -1):
+                    # Completing looks the queue up in the jobs hash
+                    if redis.hsetnx(JOBS_KEY, job_id, queue_name):
+                        migrated += 1
+    return migrated
+
+if __name__ == "__main__":
+    migrated = migrate_queues()
+    print(f"Done, migrated {migrated} review tasks.")
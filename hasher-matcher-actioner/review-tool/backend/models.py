@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, LargeBinary, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, LargeBinary, Enum, Index
+from sqlalchemy.orm import relationship, deferred
 import datetime
 import enum
 from database import Base
@@ -11,6 +11,13 @@ class ReviewStatus(enum.Enum):
     REJECTED = "rejected"
     REPROCESSED = "reprocessed"
 
+# Define ProcessingStatus as an enum, for hashing and matching after upload
+class ProcessingStatus(enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
 # Define HashAlgorithm as an enum
 class HashAlgorithm(enum.Enum):
     PDQ = "pdq"
@@ -24,8 +31,15 @@ class Image(Base):
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, index=True)
     content_type = Column(String)
-    upload_date = Column(DateTime, default=datetime.datetime.utcnow)
-    data = Column(LargeBinary)  # Actual image binary data
+    upload_date = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    # Key of the image bytes in the blob store
+    sha1 = Column(String, index=True)
+    # Image bytes from before the blob store, until moved by migrate_blobs.py.
+    # Only loaded when accessed (or undefer()ed)
+    data = deferred(Column(LargeBinary))
+    # See upload_processor.py; None for images from before it, which are done
+    processing_status = Column(String, index=True)
+    processing_error = Column(String, nullable=True)
     
     # Relationships
     hashes = relationship("Hash", back_populates="image", cascade="all, delete-orphan")
@@ -35,9 +49,12 @@ class Image(Base):
 
 class Hash(Base):
     __tablename__ = "hashes"
+    # Never reuse the ids of deleted hashes, the PDQ index catches up on
+    # hashes by id
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
-    image_id = Column(Integer, ForeignKey("images.id"))
+    image_id = Column(Integer, ForeignKey("images.id"), index=True)
     algorithm = Column(String, index=True)  # PDQ, MD5, SHA1, etc.
     hash_value = Column(String, index=True)
     quality = Column(Float)  # Quality score for some hash types like PDQ
@@ -49,8 +66,8 @@ class Match(Base):
     __tablename__ = "matches"
 
     id = Column(Integer, primary_key=True, index=True)
-    query_image_id = Column(Integer, ForeignKey("images.id"))
-    matched_image_id = Column(Integer, ForeignKey("images.id"))
+    query_image_id = Column(Integer, ForeignKey("images.id"), index=True)
+    matched_image_id = Column(Integer, ForeignKey("images.id"), index=True)
     algorithm = Column(String, index=True)
     distance = Column(Float)  # Similarity distance (lower is more similar)
     match_date = Column(DateTime, default=datetime.datetime.utcnow)
@@ -71,3 +88,8 @@ class ReviewDecision(Base):
     
     # Relationships
     image = relationship("Image", back_populates="review_decisions")
+
+    __table_args__ = (
+        # Latest decision for an image
+        Index("ix_review_decisions_image_id_decision_date", "image_id", "decision_date"),
+    )
@@ -0,0 +1,140 @@
+"""
+In-process PDQ similarity index for the HMA Review Tool.
+
+Keeps every image's PDQ hash in a FAISS binary index, so uploads don't
+have to load and compare every PDQ hash in the database.
+
+For tight thresholds (up to 31 bits, the usual PDQ match threshold),
+candidates come from multi-index hashing: the 256 bits are split into
+16 chunks, and any hash within T bits of the query has at least one chunk
+within T // 16 bits of it, so only those hash buckets are probed. Past
+that, probing costs more than comparing everything, and the index's flat
+storage is scanned instead (SIMD popcount, still ~5ms per million hashes).
+Distances are exact Hamming distances either way.
+
+The index is built from the database on first use. Before each query, it
+catches up on PDQ rows committed since (by this or any other process),
+which relies on SQLite committing hash ids in order, and never reusing the
+ids of deleted hashes (the hashes table is AUTOINCREMENT). Removed images stay
+in FAISS (which can't remove from these indices) but are skipped, until
+enough pile up to rebuild.
+"""
+
+import threading
+from typing import Callable, Dict, List, Tuple
+
+import faiss
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Hash, HashAlgorithm
+
+PDQ_BITS = 256
+NUM_HASH_CHUNKS = 16
+# Probing all buckets within 2+ bits of each chunk is slower than a flat scan
+MAX_CHUNK_FLIPS = 1
+MIN_REMOVED_TO_REBUILD = 1000
+
+
+def hash_to_vector(hash_value: str) -> np.ndarray:
+    """Convert a hex PDQ hash to the (1, 32) uint8 array FAISS expects."""
+    return np.frombuffer(bytes.fromhex(hash_value), dtype=np.uint8).reshape(1, -1)
+
+
+class PDQIndex:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._index = faiss.IndexBinaryMultiHash(
+            PDQ_BITS, NUM_HASH_CHUNKS, PDQ_BITS // NUM_HASH_CHUNKS
+        )
+        self._flat = faiss.downcast_IndexBinary(self._index.storage)
+        # FAISS ids are positions in the index, these are per position
+        self._image_ids = np.empty(0, dtype=np.int64)
+        self._live = np.empty(0, dtype=bool)
+        self._position_by_image_id: Dict[int, int] = {}
+        self._last_hash_id = 0
+
+    def __len__(self) -> int:
+        return len(self._position_by_image_id)
+
+    def catch_up(self):
+        """Add PDQ hashes committed since the last call."""
+        with self._lock:
+            removed = len(self._live) - len(self._position_by_image_id)
+            if removed > max(MIN_REMOVED_TO_REBUILD, len(self._live) // 4):
+                self._reset()
+            # A separate session, so only committed rows are seen
+            db = self._session_factory()
+            try:
+                rows = (
+                    db.query(Hash.id, Hash.image_id, Hash.hash_value)
+                    .filter(
+                        Hash.algorithm == HashAlgorithm.PDQ.value,
+                        Hash.id > self._last_hash_id,
+                    )
+                    .order_by(Hash.id)
+                    .all()
+                )
+            finally:
+                db.close()
+            if not rows:
+                return
+            self._last_hash_id = rows[-1].id
+            live = np.ones(len(rows), dtype=bool)
+            for i, row in enumerate(rows):
+                # The newest hash for an image wins, i.e. if its id was reused
+                previous = self._position_by_image_id.get(row.image_id)
+                if previous is not None:
+                    if previous < len(self._live):
+                        self._live[previous] = False
+                    else:
+                        live[previous - len(self._live)] = False
+                self._position_by_image_id[row.image_id] = len(self._live) + i
+            self._index.add(np.concatenate([hash_to_vector(r.hash_value) for r in rows]))
+            self._image_ids = np.concatenate(
+                [self._image_ids, np.array([r.image_id for r in rows], dtype=np.int64)]
+            )
+            self._live = np.concatenate([self._live, live])
+
+    def query(self, hash_value: str, max_distance: int) -> List[Tuple[int, int]]:
+        """
+        Find indexed images whose PDQ hash is within max_distance bits.
+
+        Returns (image_id, distance) pairs, most similar first.
+        """
+        vector = hash_to_vector(hash_value)
+        with self._lock:
+            if self._index.ntotal == 0:
+                return []
+            # FAISS range searches are for distances strictly below the radius
+            radius = max_distance + 1
+            flips = max_distance // NUM_HASH_CHUNKS
+            if flips <= MAX_CHUNK_FLIPS:
+                self._index.nflip = flips
+                _, distances, positions = self._index.range_search(vector, radius)
+            else:
+                _, distances, positions = self._flat.range_search(vector, radius)
+            live = self._live[positions]
+            image_ids = self._image_ids[positions[live]]
+            distances = distances[live]
+        results = [
+            (int(image_id), int(distance))
+            for image_id, distance in zip(image_ids, distances)
+        ]
+        results.sort(key=lambda r: r[1])
+        return results
+
+    def remove(self, image_id: int):
+        """Stop returning an image, i.e. after it's deleted."""
+        with self._lock:
+            position = self._position_by_image_id.pop(image_id, None)
+            if position is not None:
+                self._live[position] = False
+
+
+pdq_index = PDQIndex()
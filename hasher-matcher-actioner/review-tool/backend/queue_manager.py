@@ -1,25 +1,128 @@
 import json
 import time
+import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Union, Any
 from redis import Redis
 
 from queue_config import (
-    get_redis, 
-    get_queue_name, 
-    QueueNames, 
-    CONTENT_CATEGORIES, 
+    get_redis,
+    get_queue_name,
+    QUEUE_PREFIX,
+    QueueNames,
+    CONTENT_CATEGORIES,
     ConfidenceLevels
 )
 
+# Redis keys, for a queue name from get_queue_name():
+#   bull:{queue}:{job_id}          hash: job "data" and "opts" (JSON) when added,
+#                                  then fields that change (status, startedAt, ...)
+#   bull:{queue}:wait              zset: pending jobs, by time added
+#   bull:{queue}:prioritized:{confidence_level}
+#                                  zset: pending jobs, in the order to claim them
+#   bull:{queue}:active            zset: claimed jobs, by time claimed
+#   bull:{queue}:completed         zset: completed jobs, by time completed
+#   bull:{queue}:metrics           hash: counters
+#   bull:{QUEUE_PREFIX}:jobs       hash: job_id => queue, until completed
+#
+# Claiming and completing run as Lua scripts, so each is one atomic round
+# trip: two reviewers can't claim the same job, however many queues match.
+# The scripts touch keys they derive from job ids, so they need a single
+# Redis node rather than Redis Cluster.
+
+JOBS_KEY = f"bull:{QUEUE_PREFIX}:jobs"
+
+# Claim order is highest priority first, then oldest first. Both go in one
+# zset score, so the best job across any number of queues is the lowest
+# score. Scores must stay exact as doubles (< 2**53), which limits priority.
+PRIORITY_SCALE = 10 ** 13  # > milliseconds since the epoch
+MAX_PRIORITY = 899
+
+# KEYS: prioritized zsets to claim from
+# ARGV: now (epoch seconds), now (ISO format)
+_CLAIM_SCRIPT = """
+while true do
+    local best_key, best_id, best_score
+    for _, key in ipairs(KEYS) do
+        local head = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        if head[1] and (best_score == nil or tonumber(head[2]) < best_score) then
+            best_key, best_id, best_score = key, head[1], tonumber(head[2])
+        end
+    end
+    if best_id == nil then
+        return false
+    end
+
+    local queue_key = string.match(best_key, '^(.*):prioritized:[^:]*$')
+    local job_key = queue_key .. ':' .. best_id
+    redis.call('ZREM', best_key, best_id)
+    redis.call('ZREM', queue_key .. ':wait', best_id)
+    redis.call('HINCRBY', queue_key .. ':metrics', 'pending', -1)
+
+    -- Otherwise, the job was deleted out from under us, try the next
+    if redis.call('EXISTS', job_key) == 1 then
+        redis.call('HSET', job_key, 'status', 'active', 'startedAt', ARGV[2])
+        redis.call('ZADD', queue_key .. ':active', ARGV[1], best_id)
+        redis.call('HINCRBY', queue_key .. ':metrics', 'active', 1)
+        return redis.call('HGETALL', job_key)
+    end
+end
+"""
+
+# KEYS: JOBS_KEY
+# ARGV: job id, result, notes (or ''), now (epoch seconds), now (ISO format)
+_COMPLETE_SCRIPT = """
+local job_id = ARGV[1]
+local queue = redis.call('HGET', KEYS[1], job_id)
+if not queue then
+    return false
+end
+local queue_key = 'bull:' .. queue
+if not redis.call('ZSCORE', queue_key .. ':active', job_id) then
+    return false
+end
+local job_key = queue_key .. ':' .. job_id
+if redis.call('EXISTS', job_key) == 0 then
+    return false
+end
+
+redis.call('HSET', job_key, 'status', 'completed', 'result', ARGV[2], 'completedAt', ARGV[5])
+if ARGV[3] ~= '' then
+    redis.call('HSET', job_key, 'notes', ARGV[3])
+end
+redis.call('ZREM', queue_key .. ':active', job_id)
+redis.call('ZADD', queue_key .. ':completed', ARGV[4], job_id)
+redis.call('HDEL', KEYS[1], job_id)
+redis.call('HINCRBY', queue_key .. ':metrics', 'active', -1)
+redis.call('HINCRBY', queue_key .. ':metrics', 'completed', 1)
+redis.call('HINCRBY', queue_key .. ':metrics', 'result:' .. ARGV[2], 1)
+return redis.call('HGETALL', job_key)
+"""
+
+
+def _job_data(job_hash: List[str]) -> Dict[str, Any]:
+    """Job data from a job hash, as flat [field, value, ...] from HGETALL in a script."""
+    fields = dict(zip(job_hash[::2], job_hash[1::2]))
+    job_data = json.loads(fields.pop("data"))
+    fields.pop("opts", None)
+    job_data.update(fields)
+    return job_data
+
+
 class QueueManager:
     """Manager for BullMQ queues using Redis."""
-    
-    def __init__(self):
-        self.redis = get_redis()
-        
+
+    def __init__(self, redis: Optional[Redis] = None):
+        """
+        Args:
+            redis: Client to use (i.e. fakeredis in tests), default from queue_config
+        """
+        self.redis = redis or get_redis()
+        self._claim = self.redis.register_script(_CLAIM_SCRIPT)
+        self._complete = self.redis.register_script(_COMPLETE_SCRIPT)
+
     def add_review_task(
-        self, 
+        self,
         image_id: int,
         content_category: str,
         hash_algorithm: str,
@@ -30,33 +133,40 @@ class QueueManager:
     ) -> str:
         """
         Add a new review task to the appropriate queue.
-        
+
         Args:
             image_id: ID of the image to review
             content_category: Category of content (adult, violence, etc.)
             hash_algorithm: Hash algorithm used (pdq, md5, sha1)
             confidence_level: Match confidence level (high, medium, low)
             is_escalated: Whether this task is escalated
-            priority: Task priority (higher number = higher priority)
+            priority: Task priority (higher number = higher priority, at most 899)
             metadata: Additional metadata for the task
-            
+
         Returns:
             ID of the created job
         """
         if content_category not in CONTENT_CATEGORIES:
             raise ValueError(f"Invalid content category: {content_category}")
-            
+
         if hash_algorithm not in QueueNames.get_hash_types() and hash_algorithm != QueueNames.MANUAL:
             raise ValueError(f"Invalid hash algorithm: {hash_algorithm}")
-            
+
         if confidence_level not in ConfidenceLevels.get_all():
             raise ValueError(f"Invalid confidence level: {confidence_level}")
-        
+
+        if abs(priority) > MAX_PRIORITY:
+            raise ValueError(f"Invalid priority: {priority}, must be within +/-{MAX_PRIORITY}")
+
         # Create job data
-        job_id = f"task:{int(time.time() * 1000)}:{image_id}"
+        now = time.time()
+        now_ms = int(now * 1000)
+        # Unique, since JOBS_KEY is by job id, even for tasks added for the same
+        # image at the same millisecond
+        job_id = f"task:{now_ms}:{image_id}:{uuid.uuid4().hex}"
         queue_type = QueueNames.ESCALATED if is_escalated else hash_algorithm
         queue_name = get_queue_name(queue_type, content_category, is_escalated)
-        
+
         job_data = {
             "id": job_id,
             "imageId": image_id,
@@ -68,35 +178,44 @@ class QueueManager:
             "status": "pending",
             "metadata": metadata or {}
         }
-        
-        # Add job to queue
-        job_key = f"bull:{queue_name}:{job_id}"
-        self.redis.hset(job_key, "data", json.dumps(job_data))
-        self.redis.hset(job_key, "opts", json.dumps({"priority": priority}))
-        self.redis.zadd(f"bull:{queue_name}:wait", {job_id: priority})
-        
+
+        # Add job to queue, in one round trip
+        queue_key = f"bull:{queue_name}"
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(
+            f"{queue_key}:{job_id}",
+            mapping={"data": json.dumps(job_data), "opts": json.dumps({"priority": priority})}
+        )
+        pipe.hset(JOBS_KEY, job_id, queue_name)
+        pipe.zadd(f"{queue_key}:wait", {job_id: now})
+        pipe.zadd(
+            f"{queue_key}:prioritized:{confidence_level}",
+            {job_id: now_ms - priority * PRIORITY_SCALE}
+        )
+
         # Update queue metrics
-        self.redis.hincrby(f"bull:{queue_name}:metrics", "total", 1)
-        self.redis.hincrby(f"bull:{queue_name}:metrics", "pending", 1)
-        
+        pipe.hincrby(f"{queue_key}:metrics", "total", 1)
+        pipe.hincrby(f"{queue_key}:metrics", "pending", 1)
+        pipe.execute()
+
         return job_id
-        
+
     def get_next_task(
-        self, 
+        self,
         content_categories: Optional[List[str]] = None,
         hash_algorithms: Optional[List[str]] = None,
         confidence_levels: Optional[List[str]] = None,
         is_escalated: Optional[bool] = None
     ) -> Optional[Dict[str, Any]]:
         """
-        Get the next task to review based on filters.
-        
+        Claim the highest priority task (oldest first) across the queues matching the filters.
+
         Args:
             content_categories: List of content categories to include
             hash_algorithms: List of hash algorithms to include
             confidence_levels: List of confidence levels to include
             is_escalated: Whether to get escalated tasks
-            
+
         Returns:
             Next task data or None if no tasks match criteria
         """
@@ -104,96 +223,41 @@ class QueueManager:
         hash_types = hash_algorithms or QueueNames.get_hash_types()
         if is_escalated:
             hash_types = [QueueNames.ESCALATED]
-            
-        # Get highest priority job from matching queues
-        for category in categories:
-            for queue_type in hash_types:
-                queue_name = get_queue_name(queue_type, category, bool(is_escalated))
-                # Get first job in wait queue
-                job_id = self.redis.zrange(f"bull:{queue_name}:wait", 0, 0)
-                if job_id:
-                    job_id = job_id[0]
-                    job_key = f"bull:{queue_name}:{job_id}"
-                    job_data_str = self.redis.hget(job_key, "data")
-                    if job_data_str:
-                        job_data = json.loads(job_data_str)
-                        if confidence_levels and job_data.get("confidenceLevel") not in confidence_levels:
-                            continue
-                        
-                        # Move job to active queue
-                        self.redis.zrem(f"bull:{queue_name}:wait", job_id)
-                        self.redis.zadd(f"bull:{queue_name}:active", {job_id: time.time()})
-                        
-                        # Update job status
-                        job_data["status"] = "active"
-                        job_data["startedAt"] = datetime.utcnow().isoformat()
-                        self.redis.hset(job_key, "data", json.dumps(job_data))
-                        
-                        # Update queue metrics
-                        self.redis.hincrby(f"bull:{queue_name}:metrics", "pending", -1)
-                        self.redis.hincrby(f"bull:{queue_name}:metrics", "active", 1)
-                        
-                        return job_data
-                        
-        return None
-        
+        levels = confidence_levels or ConfidenceLevels.get_all()
+
+        keys = [
+            f"bull:{get_queue_name(queue_type, category, bool(is_escalated))}:prioritized:{level}"
+            for category in categories
+            for queue_type in hash_types
+            for level in levels
+        ]
+        now = time.time()
+        job_hash = self._claim(keys=keys, args=[now, datetime.utcnow().isoformat()])
+        if not job_hash:
+            return None
+        return _job_data(job_hash)
+
     def complete_task(self, job_id: str, result: str, notes: Optional[str] = None) -> bool:
         """
         Complete a review task with a result.
-        
+
         Args:
             job_id: ID of the job
             result: Result of the review (approved, rejected, escalated)
             notes: Optional reviewer notes
-            
+
         Returns:
             Whether the operation was successful
         """
-        # Find job in active queues
-        job_key = None
-        queue_name = None
-        
-        for category in CONTENT_CATEGORIES:
-            for queue_type in QueueNames.get_all():
-                for is_escalated in [False, True]:
-                    q_name = get_queue_name(queue_type, category, is_escalated)
-                    active_key = f"bull:{q_name}:active"
-                    if self.redis.zscore(active_key, job_id) is not None:
-                        job_key = f"bull:{q_name}:{job_id}"
-                        queue_name = q_name
-                        break
-                if job_key:
-                    break
-            if job_key:
-                break
-                
-        if not job_key or not queue_name:
-            return False
-            
-        # Get job data
-        job_data_str = self.redis.hget(job_key, "data")
-        if not job_data_str:
+        job_hash = self._complete(
+            keys=[JOBS_KEY],
+            args=[job_id, result, notes or "", time.time(), datetime.utcnow().isoformat()]
+        )
+        if not job_hash:
             return False
-            
-        job_data = json.loads(job_data_str)
-        
-        # Update job data
-        job_data["status"] = "completed"
-        job_data["result"] = result
-        job_data["completedAt"] = datetime.utcnow().isoformat()
-        if notes:
-            job_data["notes"] = notes
-            
-        # Move job to completed queue
-        self.redis.zrem(f"bull:{queue_name}:active", job_id)
-        self.redis.zadd(f"bull:{queue_name}:completed", {job_id: time.time()})
-        self.redis.hset(job_key, "data", json.dumps(job_data))
-        
-        # Update queue metrics
-        self.redis.hincrby(f"bull:{queue_name}:metrics", "active", -1)
-        self.redis.hincrby(f"bull:{queue_name}:metrics", "completed", 1)
-        self.redis.hincrby(f"bull:{queue_name}:metrics", f"result:{result}", 1)
-        
+
+        job_data = _job_data(job_hash)
+
         # If result is "escalated", add to escalation queue
         if result == "escalated":
             self.add_review_task(
@@ -209,30 +273,30 @@ class QueueManager:
                     "notes": notes
                 }
             )
-            
+
         return True
-        
+
     def get_queue_stats(
-        self, 
+        self,
         content_category: Optional[str] = None,
         hash_algorithm: Optional[str] = None,
         is_escalated: Optional[bool] = None
     ) -> List[Dict[str, Any]]:
         """
         Get statistics for queues matching the filters.
-        
+
         Args:
             content_category: Filter by content category
             hash_algorithm: Filter by hash algorithm
             is_escalated: Filter by escalation status
-            
+
         Returns:
             List of queue statistics
         """
-        stats_list = []
         categories = [content_category] if content_category else CONTENT_CATEGORIES
         hash_types = [hash_algorithm] if hash_algorithm else QueueNames.get_all()
-        
+
+        queues = []
         for category in categories:
             for queue_type in hash_types:
                 # Skip non-escalated queues if we only want escalated
@@ -241,40 +305,48 @@ class QueueManager:
                 # Skip escalated queues if we only want non-escalated
                 if is_escalated is False and queue_type == QueueNames.ESCALATED:
                     continue
-                
-                queue_name = get_queue_name(queue_type, category, bool(is_escalated))
-                metrics_key = f"bull:{queue_name}:metrics"
-                
-                # Get basic metrics
-                metrics = self.redis.hgetall(metrics_key) or {}
-                
-                # Calculate success rate
-                total_completed = int(metrics.get("completed", 0))
-                takedowns = int(metrics.get("result:rejected", 0))
-                success_rate = (takedowns / total_completed * 100) if total_completed > 0 else 0
-                
-                # Get oldest job
-                oldest_age = 0
-                oldest_job = self.redis.zrange(f"bull:{queue_name}:wait", 0, 0, withscores=True)
-                if oldest_job:
-                    oldest_age = int(time.time() - oldest_job[0][1])
-                
-                # Build stats object
-                stats = {
-                    "queueName": queue_name,
-                    "contentCategory": category,
-                    "hashAlgorithm": queue_type,
-                    "isEscalated": bool(is_escalated),
-                    "pending": int(metrics.get("pending", 0)),
-                    "active": int(metrics.get("active", 0)),
-                    "completed": total_completed,
-                    "successRate": success_rate,
-                    "oldestTaskAge": oldest_age
-                }
-                
-                stats_list.append(stats)
-                
+                queues.append((category, queue_type, get_queue_name(queue_type, category, bool(is_escalated))))
+
+        # Fetch everything in one round trip
+        pipe = self.redis.pipeline(transaction=False)
+        for _, _, queue_name in queues:
+            pipe.hgetall(f"bull:{queue_name}:metrics")
+            pipe.zrange(f"bull:{queue_name}:wait", 0, 0, withscores=True)
+        responses = pipe.execute()
+
+        stats_list = []
+        now = time.time()
+        for i, (category, queue_type, queue_name) in enumerate(queues):
+            # Get basic metrics
+            metrics = responses[2 * i] or {}
+            oldest_job = responses[2 * i + 1]
+
+            # Calculate success rate
+            total_completed = int(metrics.get("completed", 0))
+            takedowns = int(metrics.get("result:rejected", 0))
+            success_rate = (takedowns / total_completed * 100) if total_completed > 0 else 0
+
+            # Get oldest job
+            oldest_age = 0
+            if oldest_job:
+                oldest_age = int(now - oldest_job[0][1])
+
+            # Build stats object
+            stats = {
+                "queueName": queue_name,
+                "contentCategory": category,
+                "hashAlgorithm": queue_type,
+                "isEscalated": bool(is_escalated),
+                "pending": int(metrics.get("pending", 0)),
+                "active": int(metrics.get("active", 0)),
+                "completed": total_completed,
+                "successRate": success_rate,
+                "oldestTaskAge": oldest_age
+            }
+
+            stats_list.append(stats)
+
         return stats_list
 
 # Create singleton instance
-queue_manager = QueueManager() 
\ No newline at end of file
+queue_manager = QueueManager()
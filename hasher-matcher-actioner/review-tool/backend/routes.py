@@ -1,29 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query, Body
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query, Body, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, aliased
 from typing import List, Optional, Dict, Any
 import io
-import numpy as np
+import base64
+import json
 from PIL import Image as PILImage
-import hashlib
 import datetime
 from pydantic import BaseModel
 
 from database import get_db
-from models import Image, Hash, Match, ReviewDecision, ReviewStatus, HashAlgorithm
+from blob_store import blob_store
+from models import Image, Hash, Match, ReviewDecision, ReviewStatus, ProcessingStatus
 from queue_manager import queue_manager
+from pdq_index import pdq_index
 from queue_config import QueueNames, CONTENT_CATEGORIES, ConfidenceLevels
-from setup_pdq import setup_pdq_path
-
-# Set up PDQ path
-setup_pdq_path()
-try:
-    from pdqhashing.hasher.pdq_hasher import PDQHasher
-    pdq_hasher = PDQHasher()
-    print("PDQ hasher initialized successfully in routes.py")
-except ImportError:
-    print("Warning: PDQ hasher not available. Using fallback methods.")
-    pdq_hasher = None
+from upload_processor import upload_processor
 
 router = APIRouter()
 
@@ -86,92 +79,84 @@ class QueueFilterParams(BaseModel):
 
 # --- Image Management Endpoints ---
 
-@router.post("/images/upload")
-async def upload_image(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    """Upload an image and calculate hashes for it."""
+@router.post("/images/upload", status_code=202)
+def upload_image(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """
+    Upload an image, to be hashed and matched in the background.
+    
+    Poll GET /images/{image_id}/status until that's done.
+    """
+    # A plain def, so FastAPI runs this in its threadpool rather than on the event loop
+    contents = file.file.read()
+    
+    # Only reads the header, to turn away anything that isn't an image
     try:
-        # Read image file
-        contents = await file.read()
-        
-        # Convert to PIL Image for processing
-        pil_image = PILImage.open(io.BytesIO(contents))
-        
-        # Create Image record
-        db_image = Image(
-            filename=file.filename,
-            content_type=file.content_type,
-            data=contents
-        )
-        db.add(db_image)
-        db.flush()  # Generate ID for the image
-        
-        # Calculate and store hashes
-        # PDQ Hash
-        img_array = np.array(pil_image)
-        if len(img_array.shape) == 3 and img_array.shape[2] >= 3:
-            # Convert to RGB if it's not already
-            rgb_image = img_array[:,:,:3]
-            # Ensure the array is contiguous
-            if not rgb_image.flags['C_CONTIGUOUS']:
-                rgb_image = np.ascontiguousarray(rgb_image)
-            pdq_hash, quality = pdq_hasher.compute(rgb_image)
-            hash_hex = ''.join([f'{x:02x}' for x in pdq_hash.tobytes()])
+        PILImage.open(io.BytesIO(contents))
+    except Exception:
+        raise HTTPException(status_code=400, detail="File is not a supported image")
+    
+    try:
+        # Until the image is committed, nothing references its blob
+        with blob_store.lock():
+            # Store the bytes in the blob store, keyed by their SHA-1
+            sha1_hash = blob_store.put(contents)
             
-            db_hash = Hash(
+            # Create Image record
+            db_image = Image(
+                filename=file.filename,
+                content_type=file.content_type,
+                sha1=sha1_hash,
+                processing_status=ProcessingStatus.PENDING.value
+            )
+            db.add(db_image)
+            db.flush()  # Generate ID for the image
+            
+            # Create initial pending review decision
+            review_decision = ReviewDecision(
                 image_id=db_image.id,
-                algorithm=HashAlgorithm.PDQ.value,
-                hash_value=hash_hex,
-                quality=float(quality)
+                status=ReviewStatus.PENDING.value,
+                reviewer="system",
+                notes="Automatically created on upload"
             )
-            db.add(db_hash)
-        
-        # MD5 Hash
-        md5_hash = hashlib.md5(contents).hexdigest()
-        db_hash = Hash(
-            image_id=db_image.id,
-            algorithm=HashAlgorithm.MD5.value,
-            hash_value=md5_hash,
-            quality=1.0
-        )
-        db.add(db_hash)
-        
-        # SHA1 Hash
-        sha1_hash = hashlib.sha1(contents).hexdigest()
-        db_hash = Hash(
-            image_id=db_image.id,
-            algorithm=HashAlgorithm.SHA1.value,
-            hash_value=sha1_hash,
-            quality=1.0
-        )
-        db.add(db_hash)
-        
-        # Create initial pending review decision
-        review_decision = ReviewDecision(
-            image_id=db_image.id,
-            status=ReviewStatus.PENDING.value,
-            reviewer="system",
-            notes="Automatically created on upload"
-        )
-        db.add(review_decision)
-        
-        # Find similar images
-        find_matches(db_image.id, db)
-        
-        db.commit()
-        
-        return {"success": True, "image_id": db_image.id}
+            db.add(review_decision)
+            db.commit()
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error uploading image: {str(e)}")
+    
+    upload_processor.notify()
+    return {"success": True, "image_id": db_image.id, "processing_status": ProcessingStatus.PENDING.value}
 
-@router.get("/images/{image_id}", response_model=ImageResponse)
+@router.get("/images/{image_id}/status")
+async def get_image_status(image_id: int, db: Session = Depends(get_db)):
+    """Get whether an uploaded image has been hashed and matched yet."""
+    image = db.query(Image.processing_status, Image.processing_error).filter(Image.id == image_id).first()
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    return {
+        "image_id": image_id,
+        "processing_status": image.processing_status or ProcessingStatus.DONE.value,
+        "processing_error": image.processing_error
+    }
+
+@router.get("/images/{image_id}")
 async def get_image(image_id: int, db: Session = Depends(get_db)):
     """Get image metadata by ID."""
-    image = db.query(Image).filter(Image.id == image_id).first()
+    image = db.query(
+        Image.id,
+        Image.filename,
+        Image.content_type,
+        Image.upload_date,
+        Image.processing_status,
+        latest_review_status().label("review_status")
+    ).filter(Image.id == image_id).first()
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
     
-    hashes = db.query(Hash).filter(Hash.image_id == image_id).all()
+    hashes = db.query(Hash.algorithm, Hash.hash_value, Hash.quality).filter(
+        Hash.image_id == image_id
+    ).order_by(Hash.id).all()
     hash_data = {}
     for hash_obj in hashes:
         hash_data[hash_obj.algorithm] = {
@@ -179,21 +164,24 @@ async def get_image(image_id: int, db: Session = Depends(get_db)):
             "quality": hash_obj.quality
         }
     
-    review = db.query(ReviewDecision).filter(
-        ReviewDecision.image_id == image_id
-    ).order_by(ReviewDecision.decision_date.desc()).first()
-    
-    matches = db.query(Match).filter(
+    # Matched images' metadata, in the same query
+    matches = db.query(
+        Match.id,
+        Match.algorithm,
+        Match.distance,
+        Match.match_date,
+        Image.id.label("image_id"),
+        Image.filename
+    ).join(Image, Image.id == Match.matched_image_id).filter(
         Match.query_image_id == image_id
     ).all()
     
     match_data = []
     for match in matches:
-        matched_image = db.query(Image).filter(Image.id == match.matched_image_id).first()
         match_data.append({
             "match_id": match.id,
-            "image_id": matched_image.id,
-            "filename": matched_image.filename,
+            "image_id": match.image_id,
+            "filename": match.filename,
             "algorithm": match.algorithm,
             "distance": match.distance,
             "match_date": match.match_date
@@ -205,73 +193,151 @@ async def get_image(image_id: int, db: Session = Depends(get_db)):
         "content_type": image.content_type,
         "upload_date": image.upload_date,
         "hashes": hash_data,
-        "review_status": review.status if review else None,
+        "processing_status": image.processing_status or ProcessingStatus.DONE.value,
+        "review_status": image.review_status,
         "matches": match_data
     }
 
 @router.get("/images/{image_id}/data")
-async def get_image_data(image_id: int, db: Session = Depends(get_db)):
-    """Get the actual image data by ID."""
-    image = db.query(Image).filter(Image.id == image_id).first()
+async def get_image_data(image_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Get the actual image data by ID.
+    
+    Streamed from the blob store, with support for a single byte Range and
+    revalidation by ETag.
+    """
+    image = db.query(Image.sha1, Image.content_type).filter(Image.id == image_id).first()
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
     
-    return StreamingResponse(io.BytesIO(image.data), media_type=image.content_type)
+    if not image.sha1 or not blob_store.exists(image.sha1):
+        # Not moved to the blob store yet, see migrate_blobs.py
+        data = db.query(Image.data).filter(Image.id == image_id).scalar()
+        if data is None:
+            raise HTTPException(status_code=404, detail="Image data not found")
+        return Response(data, media_type=image.content_type)
+    
+    etag = f'"{image.sha1}"'
+    headers = {
+        "ETag": etag,
+        # Image ids can be reused after a delete, so caches revalidate every
+        # time; the ETag makes that a 304 when the content is unchanged
+        "Cache-Control": "no-cache",
+        "Accept-Ranges": "bytes"
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    size = blob_store.size(image.sha1)
+    byte_range = None
+    if request.headers.get("if-range", etag) == etag:
+        byte_range = parse_byte_range(request.headers.get("range"), size)
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            blob_store.iter_range(image.sha1), media_type=image.content_type, headers=headers
+        )
+    
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        blob_store.iter_range(image.sha1, start, end),
+        status_code=206,
+        media_type=image.content_type,
+        headers=headers
+    )
 
-@router.get("/images", response_model=List[ImageResponse])
+@router.get("/images")
 async def get_images(
     status: Optional[str] = None,
     sort_by: str = "upload_date",
     sort_order: str = "desc",
-    page: int = 1,
-    limit: int = 20,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
-    """Get a list of images with optional filtering."""
-    query = db.query(Image)
+    """
+    Get a page of images with optional filtering.
     
+    Pass the previous page's next_cursor to get the next page; it's None on the last page.
+    """
+    if sort_by not in IMAGE_SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort_by. Must be one of: {', '.join(IMAGE_SORT_COLUMNS)}")
+    sort_column = IMAGE_SORT_COLUMNS[sort_by]
+    descending = sort_order.lower() != "asc"
+    
+    filters = []
     # Apply filtering if status is provided
     if status:
         # Find images with the specified review status
-        subquery = db.query(ReviewDecision.image_id).filter(
-            ReviewDecision.status == status
-        ).subquery()
-        query = query.filter(Image.id.in_(subquery))
-    
-    # Apply sorting
-    if sort_order.lower() == "asc":
-        query = query.order_by(getattr(Image, sort_by))
+        filters.append(Image.id.in_(
+            select(ReviewDecision.image_id).where(ReviewDecision.status == status)
+        ))
+    total = db.query(func.count(Image.id)).filter(*filters).scalar()
+    
+    # Apply pagination, continuing after the last image of the previous page
+    # NULLs sort as the lowest values, and comparisons with them are never
+    # true, so they get their own branches
+    if cursor:
+        last_value, last_id = decode_image_cursor(sort_by, cursor)
+        if descending and last_value is None:
+            filters.append(and_(sort_column.is_(None), Image.id < last_id))
+        elif descending:
+            filters.append(or_(
+                sort_column < last_value,
+                sort_column.is_(None),
+                and_(sort_column == last_value, Image.id < last_id)
+            ))
+        elif last_value is None:
+            filters.append(or_(
+                sort_column.isnot(None),
+                and_(sort_column.is_(None), Image.id > last_id)
+            ))
+        else:
+            filters.append(or_(
+                sort_column > last_value,
+                and_(sort_column == last_value, Image.id > last_id)
+            ))
+    
+    # Apply sorting, with the id as a tie breaker so the order is stable
+    if descending:
+        order = [sort_column.desc().nulls_last(), Image.id.desc()]
     else:
-        query = query.order_by(getattr(Image, sort_by).desc())
-    
-    # Apply pagination
-    total = query.count()
-    query = query.offset((page - 1) * limit).limit(limit)
-    images = query.all()
+        order = [sort_column.asc().nulls_first(), Image.id]
+    
+    # Review status and match count come from indexed subqueries,
+    # so the page is a single query, without the image data
+    images = db.query(
+        Image.id,
+        Image.filename,
+        Image.upload_date,
+        latest_review_status().label("review_status"),
+        select(func.count()).where(
+            Match.query_image_id == Image.id
+        ).scalar_subquery().label("match_count")
+    ).filter(*filters).order_by(*order).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(images) > limit:
+        images = images[:limit]
+        next_cursor = encode_image_cursor(sort_by, images[-1])
     
     # Prepare result data
     results = []
     for image in images:
-        # Get latest review decision
-        review = db.query(ReviewDecision).filter(
-            ReviewDecision.image_id == image.id
-        ).order_by(ReviewDecision.decision_date.desc()).first()
-        
-        # Get match count
-        match_count = db.query(Match).filter(Match.query_image_id == image.id).count()
-        
         results.append({
             "id": image.id,
             "filename": image.filename,
             "upload_date": image.upload_date,
-            "review_status": review.status if review else None,
-            "match_count": match_count
+            "review_status": image.review_status,
+            "match_count": image.match_count
         })
     
     return {
         "total": total,
-        "page": page,
         "limit": limit,
+        "next_cursor": next_cursor,
         "results": results
     }
 
@@ -280,6 +346,28 @@ async def get_image_matches(image_id: int, db: Session = Depends(get_db)):
     matches = db.query(Match).filter(Match.query_image_id == image_id).all()
     return matches
 
+@router.delete("/images/{image_id}")
+def delete_image(image_id: int, db: Session = Depends(get_db)):
+    """Delete an image, with its hashes, matches and review decisions."""
+    image = db.query(Image).filter(Image.id == image_id).first()
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    db.query(Match).filter(
+        or_(Match.query_image_id == image_id, Match.matched_image_id == image_id)
+    ).delete(synchronize_session=False)
+    sha1 = image.sha1
+    db.delete(image)
+    db.commit()
+    pdq_index.remove(image_id)
+    # Identical uploads share a blob
+    if sha1:
+        with blob_store.lock():
+            if not db.query(Image.id).filter(Image.sha1 == sha1).first():
+                blob_store.delete(sha1)
+    
+    return {"success": True}
+
 # --- Review Endpoints ---
 
 @router.post("/reviews")
@@ -350,7 +438,17 @@ async def get_matches(
     db: Session = Depends(get_db)
 ):
     """Get matches with optional filtering."""
-    query = db.query(Match)
+    query_image = aliased(Image)
+    matched_image = aliased(Image)
+    query = db.query(
+        Match,
+        query_image.filename.label("query_image_filename"),
+        matched_image.filename.label("matched_image_filename")
+    ).join(
+        query_image, query_image.id == Match.query_image_id
+    ).join(
+        matched_image, matched_image.id == Match.matched_image_id
+    )
     
     # Apply filters
     if image_id:
@@ -368,23 +466,20 @@ async def get_matches(
     # Apply pagination
     total = query.count()
     query = query.offset((page - 1) * limit).limit(limit)
-    matches = query.all()
+    rows = query.all()
     
     # Prepare result data
     results = []
-    for match in matches:
-        query_image = db.query(Image).filter(Image.id == match.query_image_id).first()
-        matched_image = db.query(Image).filter(Image.id == match.matched_image_id).first()
-        
+    for match, query_image_filename, matched_image_filename in rows:
         results.append({
             "id": match.id,
             "query_image": {
-                "id": query_image.id,
-                "filename": query_image.filename
+                "id": match.query_image_id,
+                "filename": query_image_filename
             },
             "matched_image": {
-                "id": matched_image.id,
-                "filename": matched_image.filename
+                "id": match.matched_image_id,
+                "filename": matched_image_filename
             },
             "algorithm": match.algorithm,
             "distance": match.distance,
@@ -400,102 +495,84 @@ async def get_matches(
 
 # --- Helper Functions ---
 
-def find_matches(image_id: int, db: Session):
-    """Find and store matches for an image."""
-    # Get the image and its hashes
-    image_hashes = db.query(Hash).filter(Hash.image_id == image_id).all()
-    
-    # Group hashes by algorithm
-    hashes_by_algo = {}
-    for hash_obj in image_hashes:
-        hashes_by_algo[hash_obj.algorithm] = hash_obj
-    
-    # For each algorithm, find potential matches
-    for algo, hash_obj in hashes_by_algo.items():
-        if algo == HashAlgorithm.PDQ.value:
-            # For PDQ, find images with similar PDQ hashes
-            pdq_matches = find_pdq_matches(hash_obj.hash_value, db, image_id)
-            for match in pdq_matches:
-                db_match = Match(
-                    query_image_id=image_id,
-                    matched_image_id=match["image_id"],
-                    algorithm=algo,
-                    distance=match["distance"]
-                )
-                db.add(db_match)
-        
-        elif algo in [HashAlgorithm.MD5.value, HashAlgorithm.SHA1.value]:
-            # For cryptographic hashes, find exact matches
-            crypto_matches = find_crypto_matches(hash_obj.hash_value, algo, db, image_id)
-            for match in crypto_matches:
-                db_match = Match(
-                    query_image_id=image_id,
-                    matched_image_id=match["image_id"],
-                    algorithm=algo,
-                    distance=0.0  # Exact match
-                )
-                db.add(db_match)
-    
-    db.commit()
+# Columns images can be sorted by
+IMAGE_SORT_COLUMNS = {
+    "upload_date": Image.upload_date,
+    "filename": Image.filename,
+    "id": Image.id,
+}
 
-def find_pdq_matches(hash_value: str, db: Session, exclude_image_id: int = None, threshold: float = 0.2):
-    """Find images with similar PDQ hashes."""
-    # Get all PDQ hashes
-    pdq_hashes = db.query(Hash).join(Image).filter(
-        Hash.algorithm == HashAlgorithm.PDQ.value,
-        Hash.image_id != exclude_image_id
-    ).all()
-    
-    matches = []
-    for hash_obj in pdq_hashes:
-        # Calculate Hamming distance
-        distance = calculate_pdq_distance(hash_value, hash_obj.hash_value)
-        
-        # Add to matches if below threshold
-        if distance <= threshold:
-            matches.append({
-                "image_id": hash_obj.image_id,
-                "hash_value": hash_obj.hash_value,
-                "distance": distance
-            })
-    
-    # Sort by distance (most similar first)
-    matches.sort(key=lambda x: x["distance"])
-    return matches
+def latest_review_status():
+    """Status of the latest review decision, as a subquery correlated to Image."""
+    return select(ReviewDecision.status).where(
+        ReviewDecision.image_id == Image.id
+    ).order_by(
+        ReviewDecision.decision_date.desc(), ReviewDecision.id.desc()
+    ).limit(1).scalar_subquery()
 
-def find_crypto_matches(hash_value: str, algorithm: str, db: Session, exclude_image_id: int = None):
-    """Find images with matching cryptographic hashes."""
-    matches = []
-    
-    # Find exact matches
-    hash_objs = db.query(Hash).join(Image).filter(
-        Hash.algorithm == algorithm,
-        Hash.hash_value == hash_value,
-        Hash.image_id != exclude_image_id
-    ).all()
-    
-    for hash_obj in hash_objs:
-        matches.append({
-            "image_id": hash_obj.image_id,
-            "hash_value": hash_obj.hash_value,
-            "distance": 0.0
-        })
-    
-    return matches
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (compared weakly)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
 
-def calculate_pdq_distance(hash1: str, hash2: str) -> float:
-    """Calculate the normalized Hamming distance between two PDQ hashes."""
-    # Convert hex strings to binary
-    bin1 = ''.join([format(int(c, 16), '04b') for c in hash1])
-    bin2 = ''.join([format(int(c, 16), '04b') for c in hash2])
-    
-    # Calculate Hamming distance
-    hamming_distance = sum(b1 != b2 for b1, b2 in zip(bin1, bin2))
-    
-    # Normalize to 0-1 range
-    normalized_distance = hamming_distance / len(bin1)
-    
-    return normalized_distance
+def parse_byte_range(range_header: Optional[str], size: int):
+    """
+    The (start, end) bytes, inclusive, requested by a Range header.
+    
+    Returns None to send the whole content, for no Range, one we can't parse, or
+    multiple ranges. Raises a 416 for a range past the end of the content.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    first, sep, last = range_header[len("bytes="):].strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # bytes=-N is the last N bytes
+            suffix_length = int(last)
+            start = max(size - suffix_length, 0)
+            end = size - 1 if suffix_length else -1
+    except ValueError:
+        return None
+    if start < 0 or (first and last and end < start):
+        return None
+    if start >= size or end < start:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size - 1)
+
+def encode_image_cursor(sort_by: str, image) -> str:
+    """Opaque cursor for the page after this image."""
+    value = getattr(image, sort_by)
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, image.id]).encode()).decode()
+
+def decode_image_cursor(sort_by: str, cursor: str):
+    """The (sort value, image id) of the last image of the previous page."""
+    try:
+        value, image_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort_by == "upload_date" and value is not None:
+            value = datetime.datetime.fromisoformat(value)
+        return value, int(image_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 # --- Queue Endpoints ---
 
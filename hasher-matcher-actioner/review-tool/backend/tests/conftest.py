@@ -0,0 +1,65 @@
+import io
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image as PILImage
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models  # noqa: F401, registers the tables
+from blob_store import blob_store
+from database import Base, get_db
+from pdq_index import pdq_index
+from routes import router
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """Sessions on a fresh database, which the PDQ index also reads."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(pdq_index, "_session_factory", factory)
+    pdq_index._reset()
+    yield factory
+    pdq_index._reset()
+    engine.dispose()
+
+
+@pytest.fixture
+def blobs(tmp_path, monkeypatch):
+    """The blob store, in a temporary directory."""
+    monkeypatch.setattr(blob_store, "root", str(tmp_path / "blobs"))
+    return blob_store
+
+
+@pytest.fixture
+def client(session_factory, blobs) -> TestClient:
+    """The API, on the fresh database and blob store."""
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_test_db
+    return TestClient(app)
+
+
+def make_png(color=(255, 0, 0), size=(64, 64)) -> bytes:
+    data = io.BytesIO()
+    PILImage.new("RGB", size, color).save(data, "PNG")
+    return data.getvalue()
+
+
+def upload(client: TestClient, data: bytes, filename: str = "image.png") -> int:
+    resp = client.post("/api/v1/images/upload", files={"file": (filename, data, "image/png")})
+    assert resp.status_code == 202, resp.text
+    return resp.json()["image_id"]
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from blob_store import BlobStore
+from conftest import make_png, upload
+from routes import etag_matches, parse_byte_range
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-9", (0, 9)),
+        ("bytes=10-", (10, 99)),
+        ("bytes=90-200", (90, 99)),
+        ("bytes=-10", (90, 99)),
+        ("bytes=-200", (0, 99)),
+        # Ignored, so the whole content is sent
+        ("items=0-9", None),
+        ("bytes=0-9,20-29", None),
+        ("bytes=a-b", None),
+        ("bytes=9-0", None),
+        ("bytes=5", None),
+    ],
+)
+def test_parse_byte_range(header, expected):
+    assert parse_byte_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=150-200", "bytes=-0"])
+def test_parse_byte_range_unsatisfiable(header):
+    with pytest.raises(HTTPException) as e:
+        parse_byte_range(header, 100)
+    assert e.value.status_code == 416
+    assert e.value.headers["Content-Range"] == "bytes */100"
+
+
+def test_etag_matches():
+    assert etag_matches('"a"', '"a"')
+    assert etag_matches('W/"a"', '"a"')
+    assert etag_matches('"b", "a"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"b"', '"a"')
+    assert not etag_matches(None, '"a"')
+
+
+def test_blob_store(tmp_path):
+    store = BlobStore(str(tmp_path))
+    data = bytes(range(256)) * 1000
+    sha1 = store.put(data)
+    assert store.put(data) == sha1
+    assert store.exists(sha1)
+    assert store.size(sha1) == len(data)
+    assert b"".join(store.iter_range(sha1)) == data
+    assert b"".join(store.iter_range(sha1, 1000, 199_999, chunk_size=4096)) == data[1000:200_000]
+    assert b"".join(store.iter_range(sha1, 255_990)) == data[255_990:]
+
+    store.delete(sha1)
+    store.delete(sha1)
+    assert not store.exists(sha1)
+    with pytest.raises(ValueError):
+        store.path_for("../../etc/passwd")
+
+
+def test_get_image_data(client):
+    data = make_png()
+    image_id = upload(client, data)
+    url = f"/api/v1/images/{image_id}/data"
+
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.content == data
+    assert resp.headers["content-type"] == "image/png"
+    assert resp.headers["accept-ranges"] == "bytes"
+    etag = resp.headers["etag"]
+
+    resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+    resp = client.get(url, headers={"Range": "bytes=10-19"})
+    assert resp.status_code == 206
+    assert resp.content == data[10:20]
+    assert resp.headers["content-range"] == f"bytes 10-19/{len(data)}"
+
+    resp = client.get(url, headers={"Range": "bytes=-5"})
+    assert resp.status_code == 206
+    assert resp.content == data[-5:]
+
+    resp = client.get(url, headers={"Range": f"bytes={len(data)}-"})
+    assert resp.status_code == 416
+    assert resp.headers["content-range"] == f"bytes */{len(data)}"
+
+    # A stale If-Range gets the whole, current content
+    resp = client.get(url, headers={"Range": "bytes=10-19", "If-Range": '"other"'})
+    assert resp.status_code == 200
+    assert resp.content == data
+
+    assert client.get("/api/v1/images/999/data").status_code == 404
+
+
+def test_delete_shared_blob(client, blobs):
+    data = make_png()
+    first = upload(client, data)
+    second = upload(client, data)
+    sha1 = client.get(f"/api/v1/images/{first}/data").headers["etag"].strip('"')
+
+    assert client.delete(f"/api/v1/images/{first}").status_code == 200
+    assert blobs.exists(sha1)
+    assert client.delete(f"/api/v1/images/{second}").status_code == 200
+    assert not blobs.exists(sha1)
+    assert client.get(f"/api/v1/images/{second}/data").status_code == 404
+
+
+def test_delete_races_upload(client, blobs, monkeypatch):
+    data = make_png()
+    deleted = upload(client, data)
+
+    # Another upload of the same bytes, stuck between storing the blob and
+    # committing the image that references it
+    put = type(blobs).put
+    def slow_put(self, data):
+        sha1 = put(self, data)
+        time.sleep(0.2)
+        return sha1
+    monkeypatch.setattr(type(blobs), "put", slow_put)
+    kept = []
+    uploader = threading.Thread(target=lambda: kept.append(upload(client, data)))
+    uploader.start()
+    time.sleep(0.1)
+
+    assert client.delete(f"/api/v1/images/{deleted}").status_code == 200
+    uploader.join()
+    assert client.get(f"/api/v1/images/{kept[0]}/data").status_code == 200
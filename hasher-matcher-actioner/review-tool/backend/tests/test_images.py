@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+
+from models import Image
+
+
+@pytest.fixture
+def images(session_factory):
+    """Images with some duplicate and missing sort values, by id."""
+    values = [
+        ("b.png", datetime.datetime(2024, 1, 2)),
+        (None, datetime.datetime(2024, 1, 1)),
+        ("a.png", None),
+        ("b.png", datetime.datetime(2024, 1, 2)),
+        (None, None),
+        ("c.png", datetime.datetime(2024, 1, 3)),
+        ("a.png", datetime.datetime(2024, 1, 1)),
+    ]
+    db = session_factory()
+    try:
+        for filename, upload_date in values:
+            image = Image(filename=filename)
+            db.add(image)
+            db.flush()
+            # Otherwise the column default fills it in
+            image.upload_date = upload_date
+        db.commit()
+        return {
+            image.id: (image.filename, image.upload_date) for image in db.query(Image)
+        }
+    finally:
+        db.close()
+
+
+def expected_order(images, sort_by, descending):
+    def key(image_id):
+        filename, upload_date = images[image_id]
+        value = {"filename": filename, "upload_date": upload_date, "id": image_id}[sort_by]
+        # NULLs are the lowest values
+        return (value is not None, value if value is not None else 0, image_id)
+    return sorted(images, key=key, reverse=descending)
+
+
+@pytest.mark.parametrize("sort_by", ["filename", "upload_date", "id"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_get_images_pages(client, images, sort_by, sort_order):
+    seen = []
+    params = {"sort_by": sort_by, "sort_order": sort_order, "limit": 2}
+    while True:
+        resp = client.get("/api/v1/images", params=params)
+        assert resp.status_code == 200, resp.text
+        page = resp.json()
+        assert page["total"] == len(images)
+        seen += [image["id"] for image in page["results"]]
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    assert seen == expected_order(images, sort_by, sort_order == "desc")
+
+
+def test_get_images_bad_params(client):
+    assert client.get("/api/v1/images", params={"sort_by": "data"}).status_code == 400
+    assert client.get("/api/v1/images", params={"cursor": "nonsense"}).status_code == 400
@@ -0,0 +1,172 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import pdq_index as pdq_index_module
+from database import Base
+from models import Hash, HashAlgorithm, Image
+from pdq_index import PDQIndex, PDQ_BITS
+
+
+def random_hash(rng: random.Random) -> str:
+    return f"{rng.getrandbits(PDQ_BITS):064x}"
+
+
+def flip_bits(hash_value: str, bits: int, rng: random.Random) -> str:
+    value = int(hash_value, 16)
+    for bit in rng.sample(range(PDQ_BITS), bits):
+        value ^= 1 << bit
+    return f"{value:064x}"
+
+
+def distance(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+@pytest.fixture
+def session_factory():
+    """Sessions on a fresh in-memory database, shared by every session."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def add_image(session_factory):
+    def add_image(pdq: str, image_id: int = None) -> int:
+        db = session_factory()
+        try:
+            image = Image(id=image_id, filename="image.png")
+            db.add(image)
+            db.flush()
+            db.add(Hash(image_id=image.id, algorithm=HashAlgorithm.PDQ.value, hash_value=pdq))
+            db.add(Hash(image_id=image.id, algorithm=HashAlgorithm.MD5.value, hash_value="0" * 32))
+            db.commit()
+            return image.id
+        finally:
+            db.close()
+    return add_image
+
+
+@pytest.fixture
+def delete_image(session_factory):
+    def delete_image(image_id: int):
+        db = session_factory()
+        try:
+            db.delete(db.get(Image, image_id))
+            db.commit()
+        finally:
+            db.close()
+    return delete_image
+
+
+def test_catch_up(session_factory, add_image):
+    rng = random.Random(1)
+    index = PDQIndex(session_factory)
+    a = random_hash(rng)
+    a_id = add_image(a)
+    index.catch_up()
+    assert len(index) == 1
+
+    close = flip_bits(a, 10, rng)
+    close_id = add_image(close)
+    add_image(random_hash(rng))
+    # Not until the next catch_up()
+    assert index.query(a, 31) == [(a_id, 0)]
+    index.catch_up()
+    assert len(index) == 3
+    assert index.query(a, 31) == [(a_id, 0), (close_id, 10)]
+    # Nothing new
+    index.catch_up()
+    assert len(index._live) == 3
+
+
+def test_newest_hash_wins(session_factory, add_image):
+    rng = random.Random(2)
+    index = PDQIndex(session_factory)
+    old = random_hash(rng)
+    image_id = add_image(old)
+    index.catch_up()
+
+    new = random_hash(rng)
+    db = session_factory()
+    db.add(Hash(image_id=image_id, algorithm=HashAlgorithm.PDQ.value, hash_value=new))
+    db.commit()
+    db.close()
+    index.catch_up()
+    assert index.query(old, 31) == []
+    assert index.query(new, 31) == [(image_id, 0)]
+
+
+def test_remove(session_factory, add_image, delete_image):
+    rng = random.Random(3)
+    index = PDQIndex(session_factory)
+    a = random_hash(rng)
+    a_id = add_image(a)
+    b_id = add_image(flip_bits(a, 5, rng))
+    index.catch_up()
+
+    delete_image(b_id)
+    index.remove(b_id)
+    assert index.query(a, 31) == [(a_id, 0)]
+
+    # The newest hashes were deleted, and their ids aren't reused
+    c_id = add_image(flip_bits(a, 7, rng))
+    index.catch_up()
+    assert index.query(a, 31) == [(a_id, 0), (c_id, 7)]
+
+
+def test_rebuild(session_factory, add_image, delete_image, monkeypatch):
+    monkeypatch.setattr(pdq_index_module, "MIN_REMOVED_TO_REBUILD", 2)
+    rng = random.Random(4)
+    index = PDQIndex(session_factory)
+    hashes = [random_hash(rng) for _ in range(8)]
+    ids = [add_image(h) for h in hashes]
+    index.catch_up()
+
+    for image_id in ids[:2]:
+        delete_image(image_id)
+        index.remove(image_id)
+    index.catch_up()
+    # Not past the threshold yet
+    assert len(index._live) == 8
+
+    delete_image(ids[2])
+    index.remove(ids[2])
+    index.catch_up()
+    assert len(index._live) == len(index) == 5
+    assert index.query(hashes[0], 31) == []
+    assert index.query(hashes[3], 31) == [(ids[3], 0)]
+
+
+@pytest.mark.parametrize("max_distance", [0, 15, 31, 32, 63, 90])
+def test_query(session_factory, add_image, max_distance):
+    rng = random.Random(max_distance)
+    index = PDQIndex(session_factory)
+    query = random_hash(rng)
+    hashes = [random_hash(rng) for _ in range(50)]
+    hashes += [flip_bits(query, bits, rng) for bits in range(0, 100, 3)]
+    hashes = {add_image(h): h for h in hashes}
+    index.catch_up()
+
+    expected = sorted(
+        (image_id, distance(query, h))
+        for image_id, h in hashes.items()
+        if distance(query, h) <= max_distance
+    )
+    results = index.query(query, max_distance)
+    assert sorted(results) == expected
+    assert [d for _, d in results] == sorted(d for _, d in results)
+    # Multi-index hashing up to 1 bit per chunk, then the flat scan
+    if max_distance < 32:
+        assert index._index.nflip == max_distance // 16
+
+
+def test_empty(session_factory):
+    index = PDQIndex(session_factory)
+    index.catch_up()
+    assert index.query("0" * 64, 31) == []
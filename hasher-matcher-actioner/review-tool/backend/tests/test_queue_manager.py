@@ -0,0 +1,161 @@
+import json
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from migrate_queues import migrate_queues
+from queue_config import get_queue_name
+from queue_manager import QueueManager
+
+
+@pytest.fixture
+def manager() -> QueueManager:
+    return QueueManager(fakeredis.FakeRedis(decode_responses=True))
+
+
+def add(manager: QueueManager, image_id: int, **kwargs) -> str:
+    kwargs = {
+        "content_category": "adult",
+        "hash_algorithm": "pdq",
+        "confidence_level": "high",
+        **kwargs,
+    }
+    job_id = manager.add_review_task(image_id, **kwargs)
+    # Job ids are by the millisecond
+    time.sleep(0.002)
+    return job_id
+
+
+def test_claim_order(manager):
+    old = add(manager, 1)
+    new = add(manager, 2, hash_algorithm="md5", confidence_level="low")
+    urgent = add(manager, 3, content_category="spam", priority=5)
+
+    assert [manager.get_next_task()["id"] for _ in range(3)] == [urgent, old, new]
+    assert manager.get_next_task() is None
+
+
+def test_claim_filters(manager):
+    add(manager, 1, confidence_level="low")
+    add(manager, 2, hash_algorithm="md5")
+
+    assert manager.get_next_task(confidence_levels=["medium"]) is None
+    task = manager.get_next_task(hash_algorithms=["md5"])
+    assert task["imageId"] == 2
+    assert task["status"] == "active"
+    assert manager.get_next_task(content_categories=["spam"]) is None
+    assert manager.get_next_task()["imageId"] == 1
+
+
+def test_concurrent_claims(manager):
+    job_ids = {add(manager, i, confidence_level=["high", "low"][i % 2]) for i in range(100)}
+    claimed = []
+
+    def claim():
+        while True:
+            task = manager.get_next_task()
+            if task is None:
+                return
+            claimed.append(task["id"])
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(job_ids)
+
+
+def test_same_image_same_time(manager, monkeypatch):
+    monkeypatch.setattr(time, "time", lambda: 1700000000.0)
+    pdq = manager.add_review_task(7, "adult", "pdq", "high")
+    md5 = manager.add_review_task(7, "adult", "md5", "high")
+    assert pdq != md5
+
+    assert manager.get_next_task(hash_algorithms=["pdq"])["id"] == pdq
+    assert manager.complete_task(pdq, "approved")
+    assert manager.get_next_task(hash_algorithms=["md5"])["id"] == md5
+    assert manager.complete_task(md5, "approved")
+
+
+def test_complete(manager):
+    job_id = add(manager, 1)
+    assert not manager.complete_task(job_id, "approved")  # Not claimed yet
+    manager.get_next_task()
+
+    assert manager.complete_task(job_id, "rejected", notes="bad")
+    assert not manager.complete_task(job_id, "rejected")
+    assert not manager.complete_task("task:0:0", "rejected")
+
+    queue_key = f"bull:{get_queue_name('pdq', 'adult')}"
+    job = manager.redis.hgetall(f"{queue_key}:{job_id}")
+    assert job["status"] == "completed"
+    assert job["result"] == "rejected"
+    assert job["notes"] == "bad"
+    assert json.loads(job["data"])["imageId"] == 1
+
+
+def test_escalate(manager):
+    job_id = add(manager, 1)
+    manager.get_next_task()
+    assert manager.complete_task(job_id, "escalated")
+
+    assert manager.get_next_task() is None
+    task = manager.get_next_task(is_escalated=True)
+    assert task["imageId"] == 1
+    assert task["isEscalated"]
+    assert task["metadata"]["originalJobId"] == job_id
+
+
+def test_queue_stats(manager):
+    add(manager, 1)
+    add(manager, 2, priority=10)
+    job_id = add(manager, 3)
+    manager.get_next_task()
+    manager.complete_task(manager.get_next_task()["id"], "rejected")
+
+    (stats,) = manager.get_queue_stats(content_category="adult", hash_algorithm="pdq")
+    assert stats["pending"] == 1
+    assert stats["active"] == 1
+    assert stats["completed"] == 1
+    assert stats["successRate"] == 100
+    # Not the priority, which used to be the score
+    assert 0 <= stats["oldestTaskAge"] < 5
+
+
+def add_old_format(manager: QueueManager, image_id: int, priority: int, added_at_ms: int) -> str:
+    """Add a task like versions before the prioritized zsets did."""
+    job_id = f"task:{added_at_ms}:{image_id}"
+    queue_name = get_queue_name("pdq", "adult")
+    job_data = {"id": job_id, "imageId": image_id, "confidenceLevel": "high", "status": "pending"}
+    manager.redis.hset(f"bull:{queue_name}:{job_id}", "data", json.dumps(job_data))
+    manager.redis.hset(f"bull:{queue_name}:{job_id}", "opts", json.dumps({"priority": priority}))
+    manager.redis.zadd(f"bull:{queue_name}:wait", {job_id: priority})
+    manager.redis.hincrby(f"bull:{queue_name}:metrics", "pending", 1)
+    return job_id
+
+
+def test_migrate_queues(manager):
+    now_ms = int(time.time() * 1000)
+    old = add_old_format(manager, 1, 0, now_ms - 60_000)
+    urgent = add_old_format(manager, 2, 10, now_ms - 1_000)
+    active = add_old_format(manager, 3, 0, now_ms - 120_000)
+    # Claimed before the upgrade
+    queue_key = f"bull:{get_queue_name('pdq', 'adult')}"
+    manager.redis.zrem(f"{queue_key}:wait", active)
+    manager.redis.zadd(f"{queue_key}:active", {active: now_ms / 1000})
+    new = add(manager, 4)
+
+    assert manager.get_next_task()["id"] == new
+    assert not manager.complete_task(active, "approved")
+
+    assert migrate_queues(manager.redis) == 3
+    assert migrate_queues(manager.redis) == 0
+
+    (stats,) = manager.get_queue_stats(content_category="adult", hash_algorithm="pdq")
+    assert 59 <= stats["oldestTaskAge"] <= 65
+    assert [manager.get_next_task()["id"] for _ in range(2)] == [urgent, old]
+    assert manager.complete_task(active, "approved")
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+import upload_processor as upload_processor_module
+from conftest import make_png, upload
+from models import Hash, HashAlgorithm, Image, Match, ProcessingStatus
+from upload_processor import UploadProcessor
+
+
+@pytest.fixture
+def processor(session_factory) -> UploadProcessor:
+    # No pool or threads, images are processed by the test
+    return UploadProcessor(workers=0, session_factory=session_factory)
+
+
+def status(client, image_id: int) -> dict:
+    resp = client.get(f"/api/v1/images/{image_id}/status")
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def process_next(processor: UploadProcessor) -> int:
+    image_id = processor._claim_next()
+    assert image_id is not None
+    processor.process(image_id)
+    return image_id
+
+
+def test_claim_next(client, processor, session_factory):
+    first = upload(client, make_png((1, 0, 0)))
+    second = upload(client, make_png((2, 0, 0)))
+    assert status(client, first)["processing_status"] == ProcessingStatus.PENDING.value
+
+    assert processor._claim_next() == first
+    assert status(client, first)["processing_status"] == ProcessingStatus.PROCESSING.value
+    assert processor._claim_next() == second
+    assert processor._claim_next() is None
+
+
+def test_process(client, processor, session_factory):
+    data = make_png()
+    original = upload(client, data)
+    duplicate = upload(client, data)
+    assert process_next(processor) == original
+    assert process_next(processor) == duplicate
+
+    assert status(client, duplicate) == {
+        "image_id": duplicate,
+        "processing_status": ProcessingStatus.DONE.value,
+        "processing_error": None,
+    }
+    db = session_factory()
+    try:
+        algorithms = {h.algorithm for h in db.query(Hash).filter(Hash.image_id == duplicate)}
+        assert {HashAlgorithm.MD5.value, HashAlgorithm.SHA1.value} <= algorithms
+        matches = {
+            (m.matched_image_id, m.algorithm)
+            for m in db.query(Match).filter(Match.query_image_id == duplicate)
+        }
+        assert (original, HashAlgorithm.MD5.value) in matches
+    finally:
+        db.close()
+
+
+def test_process_failure(client, processor, blobs):
+    image_id = upload(client, make_png())
+    sha1 = client.get(f"/api/v1/images/{image_id}/data").headers["etag"].strip('"')
+    os.unlink(blobs.path_for(sha1))
+
+    process_next(processor)
+    image_status = status(client, image_id)
+    assert image_status["processing_status"] == ProcessingStatus.FAILED.value
+    assert image_status["processing_error"].startswith("FileNotFoundError")
+
+
+def test_deleted_while_processing(client, processor, session_factory, monkeypatch):
+    image_id = upload(client, make_png())
+    compute_hashes = upload_processor_module.compute_hashes
+
+    def delete_then_hash(path):
+        assert client.delete(f"/api/v1/images/{image_id}").status_code == 200
+        return compute_hashes(path)
+
+    monkeypatch.setattr(upload_processor_module, "compute_hashes", delete_then_hash)
+    process_next(processor)
+
+    db = session_factory()
+    try:
+        assert db.query(Image).filter(Image.id == image_id).first() is None
+        assert db.query(Hash).filter(Hash.image_id == image_id).count() == 0
+    finally:
+        db.close()
+    assert client.get(f"/api/v1/images/{image_id}/status").status_code == 404
+
+
+def test_deleted_while_pending(client, processor):
+    image_id = upload(client, make_png())
+    claimed = processor._claim_next()
+    client.delete(f"/api/v1/images/{image_id}")
+    # Nothing to do
+    processor.process(claimed)
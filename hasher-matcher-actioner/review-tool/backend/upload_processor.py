@@ -0,0 +1,194 @@
+"""
+Hashing and matching uploaded images in the background.
+
+An upload only stores the file and records the image as pending, so the
+request returns without waiting on any of the work below, and a burst of
+uploads can't stall other requests.
+
+Worker threads claim pending images from the database and hash them in a
+pool of processes (the PDQ hasher is pure Python, so in-process it would
+hold the GIL, and with it the event loop, for ~0.5s per image). Storing
+the hashes and matching them against other images is quick, and runs one
+image at a time so that near-simultaneous uploads still match each other.
+Clients poll GET /images/{image_id}/status for the outcome.
+
+The queue is the images table itself: it is bounded only by disk, and
+images still pending when the server stops are processed after it starts.
+"""
+
+import multiprocessing
+import os
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+from fastapi import FastAPI
+from sqlalchemy.orm import Session
+
+from blob_store import blob_store
+from database import SessionLocal
+from hashing import compute_hashes
+from matching import find_matches
+from models import Image, Hash, ProcessingStatus
+from pdq_index import pdq_index
+
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", min(4, os.cpu_count() or 1)))
+# Also picks up images uploaded through other server processes
+POLL_INTERVAL_SEC = 5.0
+
+
+class UploadProcessor:
+    def __init__(self, workers: int = HASH_WORKERS, session_factory: Callable[[], Session] = SessionLocal):
+        self.workers = workers
+        self._session_factory = session_factory
+        self._wakeups = threading.Semaphore(0)
+        self._match_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        """Start the workers, and retry images whose processing was interrupted."""
+        db = self._session_factory()
+        try:
+            db.query(Image).filter(
+                Image.processing_status == ProcessingStatus.PROCESSING.value
+            ).update(
+                {Image.processing_status: ProcessingStatus.PENDING.value}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        self._stopping.clear()
+        # Not forked: the server has threads, and FAISS uses OpenMP
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._threads = [
+            threading.Thread(target=self._run, name=f"UploadProcessor-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop the workers, after the images they're processing."""
+        self._stopping.set()
+        for _ in self._threads:
+            self._wakeups.release()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def notify(self):
+        """Wake a worker for a newly pending image."""
+        self._wakeups.release()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            image_id = self._claim_next()
+            if image_id is None:
+                self._wakeups.acquire(timeout=POLL_INTERVAL_SEC)
+                continue
+            try:
+                self.process(image_id)
+            except Exception:
+                # Keep the worker alive, the image stays processing until a restart retries it
+                print(f"Error processing image {image_id}: {traceback.format_exc()}")
+
+    def _claim_next(self) -> Optional[int]:
+        """Mark the oldest pending image as processing, and return its id."""
+        db = self._session_factory()
+        try:
+            while True:
+                image_id = db.query(Image.id).filter(
+                    Image.processing_status == ProcessingStatus.PENDING.value
+                ).order_by(Image.id).limit(1).scalar()
+                if image_id is None:
+                    return None
+                # Conditional, in case another worker (or server process) got there first
+                claimed = db.query(Image).filter(
+                    Image.id == image_id,
+                    Image.processing_status == ProcessingStatus.PENDING.value
+                ).update(
+                    {Image.processing_status: ProcessingStatus.PROCESSING.value}, synchronize_session=False
+                )
+                db.commit()
+                if claimed:
+                    return image_id
+        finally:
+            db.close()
+
+    def process(self, image_id: int):
+        """Hash an image and find its matches, recording the outcome on the image."""
+        db = self._session_factory()
+        try:
+            sha1 = db.query(Image.sha1).filter(Image.id == image_id).scalar()
+            if sha1 is None:
+                # Deleted while pending
+                return
+            # Don't hold a transaction open while hashing
+            db.rollback()
+            try:
+                path = blob_store.path_for(sha1)
+                if self._pool is not None:
+                    hashes = self._pool.submit(compute_hashes, path).result()
+                else:
+                    hashes = compute_hashes(path)
+
+                with self._match_lock:
+                    # By id rather than through an Image instance, which would
+                    # fail to flush if the image was deleted while hashing
+                    if not self._set_status(db, image_id, ProcessingStatus.DONE):
+                        db.rollback()
+                        return
+                    for algorithm, (hash_value, quality) in hashes.items():
+                        db.add(Hash(
+                            image_id=image_id,
+                            algorithm=algorithm,
+                            hash_value=hash_value,
+                            quality=quality
+                        ))
+                    # find_matches() reads the hashes back, and commits
+                    db.flush()
+                    find_matches(image_id, db)
+                    # Index the new hash now, rather than on the next match
+                    pdq_index.catch_up()
+            except Exception as e:
+                print(f"Error processing image {image_id}: {traceback.format_exc()}")
+                db.rollback()
+                self._set_status(db, image_id, ProcessingStatus.FAILED, f"{type(e).__name__}: {e}")
+                db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _set_status(
+        db: Session, image_id: int, status: ProcessingStatus, error: Optional[str] = None
+    ) -> bool:
+        """Record the outcome for an image being processed. False if it's since been deleted."""
+        updated = db.query(Image).filter(
+            Image.id == image_id,
+            Image.processing_status == ProcessingStatus.PROCESSING.value
+        ).update(
+            {Image.processing_status: status.value, Image.processing_error: error},
+            synchronize_session=False
+        )
+        return updated > 0
+
+
+def init_app(app: FastAPI) -> None:
+    """Process uploads while the app is running."""
+    @app.on_event("startup")
+    async def start_upload_processor():
+        upload_processor.start()
+
+    @app.on_event("shutdown")
+    async def stop_upload_processor():
+        upload_processor.stop()
+
+
+upload_processor = UploadProcessor()
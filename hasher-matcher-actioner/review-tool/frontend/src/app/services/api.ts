@@ -207,7 +207,7 @@ export const ImageAPI = {
     status?: string;
     sortBy?: string;
     sortOrder?: 'asc' | 'desc';
-    page?: number;
+    cursor?: string; // next_cursor from the previous page
     limit?: number;
   }) => {
     // Build query string
@@ -215,7 +215,7 @@ export const ImageAPI = {
     if (params?.status) queryParams.append('status', params.status);
     if (params?.sortBy) queryParams.append('sort_by', params.sortBy);
     if (params?.sortOrder) queryParams.append('sort_order', params.sortOrder);
-    if (params?.page) queryParams.append('page', params.page.toString());
+    if (params?.cursor) queryParams.append('cursor', params.cursor);
     if (params?.limit) queryParams.append('limit', params.limit.toString());
     
     const queryString = queryParams.toString() ? `?${queryParams.toString()}` : '';
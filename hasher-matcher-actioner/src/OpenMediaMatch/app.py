@@ -32,7 +32,7 @@ from OpenMediaMatch.background_tasks import (
 )
 from OpenMediaMatch.persistence import get_storage
 from OpenMediaMatch.blueprints import development, hashing, matching, curation, ui
-from OpenMediaMatch.utils import dev_utils
+from OpenMediaMatch.utils import dev_utils, loadtest, metrics, profiling, tracing
 
 
 def _is_debug_mode():
@@ -56,6 +56,7 @@ def _setup_task_logging(app_logger: logging.Logger):
     """Clownily replace module loggers with our own"""
     fetcher.logger = app_logger.getChild("Fetcher")
     build_index.logger = app_logger.getChild("Indexer")
+    tracing.logger = app_logger.getChild("Tracing")
 
 
 def create_app() -> flask.Flask:
@@ -106,6 +107,7 @@ def create_app() -> flask.Flask:
     ), "STORAGE_IFACE_INSTANCE is not an instance of IUnifiedStore"
 
     _setup_task_logging(app.logger)
+    tracing.init_app(app)
 
     scheduler: APScheduler | None = None
 
@@ -130,7 +132,7 @@ def create_app() -> flask.Flask:
                 tasks.append("Fetcher")
                 scheduler.add_job(
                     "Fetcher",
-                    fetcher.apscheduler_fetch_all,
+                    profiling.wrap_task(app, "Fetcher", fetcher.apscheduler_fetch_all),
                     trigger="interval",
                     seconds=60 * 4,
                     start_date=now + datetime.timedelta(seconds=30),
@@ -139,7 +141,9 @@ def create_app() -> flask.Flask:
                 tasks.append("Indexer")
                 scheduler.add_job(
                     "Indexer",
-                    build_index.apscheduler_build_all_indices,
+                    profiling.wrap_task(
+                        app, "Indexer", build_index.apscheduler_build_all_indices
+                    ),
                     trigger="interval",
                     seconds=60,
                     start_date=now + datetime.timedelta(seconds=15),
@@ -187,6 +191,13 @@ def create_app() -> flask.Flask:
                 return f"INDEX-STALE", 503
         return "I-AM-ALIVE", 200
 
+    @app.route("/metrics")
+    def metrics_endpoint():
+        """
+        Metrics for this process, in the Prometheus text format
+        """
+        return metrics.REGISTRY.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
     @app.route("/site-map")
     def site_map():
         # Use a set to avoid duplicates (e.g. same path, multiple methods)
@@ -213,22 +224,106 @@ def create_app() -> flask.Flask:
         """
         dev_utils.seed_banks_random(banks, seeds)
 
+    profile_option = click.option(
+        "--profile",
+        is_flag=True,
+        help="print where the task spent its time (@see utils/profiling.py)",
+    )
+
     @app.cli.command("fetch")
-    def fetch():
+    @profile_option
+    def fetch(profile: bool):
         """Run the 'background task' to fetch from 3p data and sync to local banks"""
         app.logger.setLevel(logging.DEBUG)
         storage = get_storage()
-        fetcher.fetch_all(
-            storage,
-            storage.get_signal_type_configs(),
+        _run_cli_task(
+            "Fetcher",
+            lambda: fetcher.fetch_all(storage, storage.get_signal_type_configs()),
+            profile,
         )
 
     @app.cli.command("build_indices")
-    def build_indices():
+    @profile_option
+    def build_indices(profile: bool):
         """Run the 'background task' to rebuild indices from bank contents"""
         app.logger.setLevel(logging.DEBUG)
         storage = get_storage()
-        build_index.build_all_indices(storage, storage, storage)
+        _run_cli_task(
+            "Indexer",
+            lambda: build_index.build_all_indices(storage, storage, storage),
+            profile,
+        )
+
+    @app.cli.command("loadtest")
+    @click.option(
+        "-n",
+        "--signals",
+        default=1000000,
+        show_default=True,
+        help="how many signals to fetch from the random exchange",
+    )
+    @click.option(
+        "-s",
+        "--signal-type",
+        "signal_types",
+        multiple=True,
+        help="only these signal types (default: all enabled)",
+    )
+    @click.option("--qps", default=100.0, show_default=True, help="lookup rate")
+    @click.option(
+        "--duration", default=30.0, show_default=True, help="seconds of lookups"
+    )
+    @click.option(
+        "--concurrency", default=8, show_default=True, help="lookups in flight"
+    )
+    @click.option(
+        "--target-url",
+        help="send lookups to a running OMM (i.e. http://localhost:5000)",
+    )
+    @click.option(
+        "--staleness-signals",
+        default=100,
+        show_default=True,
+        help="signals to fetch after, to time ingest -> match (0 to skip)",
+    )
+    @click.option(
+        "--keep", is_flag=True, help="don't delete the load test's collab and bank"
+    )
+    @click.option("--output", type=click.File("w"), help="write results as JSON")
+    def run_loadtest(
+        signals: int,
+        signal_types: t.Tuple[str, ...],
+        qps: float,
+        duration: float,
+        concurrency: int,
+        target_url: str | None,
+        staleness_signals: int,
+        keep: bool,
+        output: t.TextIO | None,
+    ) -> None:
+        """
+        Time fetch, index build, matcher reload and lookups end-to-end
+
+        Fetches from a new InfiniteRandomExchange collab, so it must be in
+        the exchange_types in the omm_config.
+        """
+        cfg = loadtest.LoadTestConfig(
+            signal_count=signals,
+            signal_types=set(signal_types),
+            lookup_qps=qps,
+            lookup_duration_sec=duration,
+            lookup_concurrency=concurrency,
+            target_url=target_url,
+            staleness_signal_count=staleness_signals,
+            cleanup=not keep,
+        )
+        try:
+            result = loadtest.run_loadtest(app, get_storage(), cfg)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        click.echo(result.pretty_str())
+        if output is not None:
+            output.write(result.to_json())
 
     @app.cli.command("auth")
     @click.argument("api_name", callback=_get_api_cfg)
@@ -277,6 +372,16 @@ def create_app() -> flask.Flask:
     return app
 
 
+def _run_cli_task(name: str, fn: t.Callable[[], None], profile: bool) -> None:
+    if not profile:
+        fn()
+        return
+    try:
+        profiling.profile_call(name, fn)
+    finally:
+        click.echo(profiling.get_recent_profiles(name)[0].pretty_str())
+
+
 def _get_api_cfg(ctx: click.Context, param: click.Parameter, value: str):
     storage = get_storage()
     config = storage.exchange_apis_get_configs().get(value)
@@ -14,6 +14,7 @@ from OpenMediaMatch.storage.interface import (
     IBankStore,
     SignalTypeIndexBuildCheckpoint,
 )
+from OpenMediaMatch.utils import metrics
 from OpenMediaMatch.utils.time_utils import duration_to_human_str
 
 logger = logging.getLogger(__name__)
@@ -90,3 +91,9 @@ def build_index(
         duration_to_human_str(int(time.time() - start)),
     )
     index_store.store_signal_type_index(for_signal_type, built_index, checkpoint)
+    metrics.INDEX_BUILD_SECONDS.observe(
+        time.time() - start, signal_type=for_signal_type.get_name()
+    )
+    metrics.INDEX_BUILD_SIGNALS.set(
+        len(signal_list), signal_type=for_signal_type.get_name()
+    )
@@ -8,6 +8,7 @@ import time
 
 from threatexchange.exchanges.fetch_state import (
     CollaborationConfigBase,
+    FetchCheckpointBase,
     FetchDeltaTyped,
     NoCheckpointing,
 )
@@ -16,6 +17,7 @@ from OpenMediaMatch.background_tasks.development import get_apscheduler
 from OpenMediaMatch.persistence import get_storage
 from OpenMediaMatch.storage.interface import ISignalExchangeStore
 from threatexchange.storage.interfaces import SignalTypeConfig
+from OpenMediaMatch.utils import metrics
 from OpenMediaMatch.utils.time_utils import duration_to_human_str
 
 logger = logging.getLogger(__name__)
@@ -67,11 +69,13 @@ def fetch(
             collab.name, is_up_to_date=False, exception=True
         )
     finally:
+        elapsed = time.time() - start
+        metrics.FETCH_SECONDS.observe(elapsed, collab=collab.name)
         logger.info(
             "%s[%s] Completed - %s",
             collab.name,
             collab.api,
-            duration_to_human_str(int(time.time() - start)),
+            duration_to_human_str(int(elapsed)),
         )
 
 
@@ -144,6 +148,7 @@ def _fetch(
             ("" if progress_time is None else f" @ {_timeformat(progress_time)}"),
             level=logger.debug,
         )
+        metrics.FETCH_RECORDS.inc(len(delta.updates), collab=collab.name)
         pending_merge = _merge_delta(pending_merge, delta)
         next_checkpoint = delta.checkpoint
 
@@ -159,12 +164,7 @@ def _fetch(
 
         if _should_commit(pending_merge, last_db_commit):
             log("Committing progress...")
-            collab_store.exchange_commit_fetch(
-                collab,
-                starting_checkpoint,
-                pending_merge.updates,
-                pending_merge.checkpoint,
-            )
+            _commit(collab_store, collab, starting_checkpoint, pending_merge)
             starting_checkpoint = pending_merge.checkpoint
             pending_merge = None
             last_db_commit = time.time()
@@ -177,18 +177,26 @@ def _fetch(
 
     if pending_merge is not None:
         log("Committing progress...")
-        collab_store.exchange_commit_fetch(
-            collab,
-            starting_checkpoint,
-            pending_merge.updates,
-            pending_merge.checkpoint,
-        )
+        _commit(collab_store, collab, starting_checkpoint, pending_merge)
 
     collab_store.exchange_complete_fetch(
         collab.name, is_up_to_date=up_to_date, exception=False
     )
 
 
+def _commit(
+    collab_store: ISignalExchangeStore,
+    collab: CollaborationConfigBase,
+    old_checkpoint: t.Optional[FetchCheckpointBase],
+    delta: FetchDeltaTyped,
+) -> None:
+    metrics.FETCH_COMMIT_BATCH_SIZE.observe(len(delta.updates), collab=collab.name)
+    with metrics.FETCH_COMMIT_SECONDS.time(collab=collab.name):
+        collab_store.exchange_commit_fetch(
+            collab, old_checkpoint, delta.updates, delta.checkpoint
+        )
+
+
 def _merge_delta(
     into: t.Optional[FetchDeltaTyped], new: FetchDeltaTyped
 ) -> FetchDeltaTyped:
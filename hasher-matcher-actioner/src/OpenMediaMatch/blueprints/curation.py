@@ -5,7 +5,7 @@ import re
 import time
 import typing as t
 
-from flask import Blueprint, Response, request, jsonify, abort
+from flask import Blueprint, Response, current_app, request, jsonify, abort
 from sqlalchemy.exc import IntegrityError
 from werkzeug.exceptions import HTTPException
 
@@ -14,7 +14,7 @@ from threatexchange.signal_type.signal_base import SignalType
 from threatexchange.exchanges import auth
 
 from OpenMediaMatch import persistence
-from OpenMediaMatch.utils import flask_utils
+from OpenMediaMatch.utils import flask_utils, profiling
 import OpenMediaMatch.storage.interface as iface
 from OpenMediaMatch.blueprints import hashing
 
@@ -625,3 +625,43 @@ def update_content_type_config(signal_type_name: str):
     }
     """
     abort(501, "unimplemented")
+
+
+# Background Tasks
+@bp.route("/background_tasks/profiles", methods=["GET"])
+def background_task_profiles():
+    """
+    Recent profiles of background tasks run by this process, newest first.
+
+    Requires PROFILE_BACKGROUND_TASKS in the config, @see utils/profiling.py
+
+    Input:
+     * Optional task name (i.e. "Indexer", "Fetcher", "CachedIndex[pdq]")
+    Returns:
+    {
+        "enabled": true,
+        "profiles": [
+            {
+                "task": "Indexer",
+                "started_at": 1700236661.5,
+                "wall_sec": 240.2,
+                "cpu_sec": 180.9,
+                "samples": 23975,
+                "interval_sec": 0.01,
+                "hot_functions": [
+                    {
+                        "function": "threatexchange/.../pdq_faiss_matcher.py:41(add)",
+                        "self_samples": 9012,
+                        "total_samples": 9120
+                    },
+                    ...
+                ],
+                "error": null
+            }
+        ]
+    }
+    """
+    return {
+        "enabled": profiling.is_enabled(current_app),
+        "profiles": profiling.get_recent_profiles(request.args.get("task")),
+    }
@@ -12,9 +12,17 @@ import sys
 import typing as t
 import time
 
-from flask import Blueprint, Flask, abort, current_app, request
+from flask import (
+    Blueprint,
+    Flask,
+    abort,
+    current_app,
+    has_app_context,
+    request,
+)
 from flask_apscheduler import APScheduler
 from werkzeug.exceptions import HTTPException
+from werkzeug.wrappers import Response
 
 from threatexchange.signal_type.signal_base import SignalType
 from threatexchange.signal_type.index import (
@@ -26,6 +34,7 @@ from threatexchange.signal_type.index import (
 from OpenMediaMatch.background_tasks.development import get_apscheduler
 from OpenMediaMatch.storage import interface
 from OpenMediaMatch.blueprints import hashing
+from OpenMediaMatch.utils import metrics, profiling, tracing
 from OpenMediaMatch.utils.flask_utils import (
     api_error_handler,
     require_request_param,
@@ -35,6 +44,7 @@ from OpenMediaMatch.persistence import get_storage
 
 bp = Blueprint("matching", __name__)
 bp.register_error_handler(HTTPException, api_error_handler)
+tracing.trace_requests(bp)
 
 
 # Type helpers
@@ -81,6 +91,7 @@ class _SignalIndexInMemoryCache:
         # There's a race condition here, but it's unclear if we should solve it
         curr_checkpoint = store.get_last_index_build_checkpoint(self.signal_type)
         if curr_checkpoint is not None and self.checkpoint != curr_checkpoint:
+            load_start = time.perf_counter()
             new_index = store.get_signal_type_index(self.signal_type)
             if new_index is None:
                 app: Flask = get_apscheduler().app
@@ -93,6 +104,11 @@ class _SignalIndexInMemoryCache:
                 return
             self.index = new_index
             self.checkpoint = curr_checkpoint
+            name = self.signal_type.get_name()
+            metrics.INDEX_RELOAD_SECONDS.observe(
+                time.perf_counter() - load_start, signal_type=name
+            )
+            metrics.INDEX_RELOADS.inc(signal_type=name)
         self.last_check_ts = now
 
     def periodic_task(self) -> None:
@@ -146,19 +162,26 @@ def query_index(
     signal: str, signal_type_name: str
 ) -> t.Sequence[IndexMatchUntyped[SignalSimilarityInfo, int]]:
     storage = get_storage()
-    signal_type = _validate_and_transform_signal_type(signal_type_name, storage)
+    with tracing.span("validate_signal"):
+        signal_type = _validate_and_transform_signal_type(signal_type_name, storage)
 
-    try:
-        signal = signal_type.validate_signal_str(signal)
-    except Exception as e:
-        abort(400, f"invalid signal: {e}")
+        try:
+            signal = signal_type.validate_signal_str(signal)
+        except Exception as e:
+            abort(400, f"invalid signal: {e}")
 
-    index = _get_index(signal_type)
+    with tracing.span("get_index"):
+        index = _get_index(signal_type)
 
     if index is None:
         abort(503, "index not yet ready")
     current_app.logger.debug("[lookup_signal] querying index")
-    results = index.query(signal)
+    with tracing.span("index.query") as span, metrics.INDEX_QUERY_SECONDS.time(
+        signal_type=signal_type_name
+    ):
+        results = index.query(signal)
+        if span is not None:
+            span.set_attribute("matches", len(results))
     current_app.logger.debug("[lookup_signal] query complete")
     return results
 
@@ -197,7 +220,7 @@ def _validate_and_transform_signal_type(
 
 
 @bp.route("/lookup", methods=["GET"])
-def lookup_get() -> t.Union[TMatchByBank, TBankMatchBySignalType]:
+def lookup_get() -> Response:
     """
     Look up a hash in the similarity index. The hash can either be specified via
     `signal_type` and `signal` query params, or a file url can be provided in the
@@ -246,23 +269,24 @@ def lookup_get() -> t.Union[TMatchByBank, TBankMatchBySignalType]:
         if not current_app.config.get("ROLE_HASHER", False):
             abort(403, "Hashing is disabled, missing role")
 
-        hashes = hashing.hash_media()
+        with tracing.span("hash_media"):
+            hashes = hashing.hash_media()
         for signal_type in hashes.keys():
             signal = hashes[signal_type]
             resp[signal_type] = lookup(signal, signal_type)
     else:
         signal = require_request_param("signal")
         signal_type = require_request_param("signal_type")
-        return lookup(signal, signal_type)
+        return _encode_response(lookup(signal, signal_type))
 
     selected_st = request.args.get("signal_type")
     if selected_st is not None:
-        return resp[selected_st]
-    return resp
+        return _encode_response(resp[selected_st])
+    return _encode_response(resp)
 
 
 @bp.route("/lookup", methods=["POST"])
-def lookup_post() -> TBankMatchBySignalType:
+def lookup_post() -> Response:
     """
     Look up the hash for the uploaded file in the similarity index.
     @see OpenMediaMatch.blueprints.hashing hash_media_from_form_data()
@@ -277,50 +301,76 @@ def lookup_post() -> TBankMatchBySignalType:
     if not current_app.config.get("ROLE_HASHER", False):
         abort(403, "Hashing is disabled, missing role")
 
-    hashes = hashing.hash_media_from_form_data()
+    with tracing.span("hash_media"):
+        hashes = hashing.hash_media_from_form_data()
 
     resp = {}
     for signal_type in hashes.keys():
         signal = hashes[signal_type]
         resp[signal_type] = lookup(signal, signal_type)
 
-    return resp
+    return _encode_response(resp)
+
+
+def _encode_response(resp: t.Mapping[str, t.Any]) -> Response:
+    # Done explicitly rather than by returning the dict, so encoding is traced
+    with tracing.span("encode_response"):
+        return current_app.json.response(resp)
 
 
 def lookup(signal: str, signal_type_name: str) -> TMatchByBank:
+    with tracing.span("lookup", signal_type=signal_type_name):
+        return _lookup(signal, signal_type_name)
+
+
+def _lookup(signal: str, signal_type_name: str) -> TMatchByBank:
     current_app.logger.debug("performing lookup")
+    start = time.perf_counter()
     results_by_bank_content_id = {
         r.metadata: r for r in query_index(signal, signal_type_name)
     }
+    metrics.LOOKUP_MATCHES.observe(
+        len(results_by_bank_content_id), signal_type=signal_type_name
+    )
     storage = get_storage()
     current_app.logger.debug("getting bank content")
-    contents = storage.bank_content_get(results_by_bank_content_id)
-    enabled_content = [c for c in contents if c.enabled]
-    current_app.logger.debug(
-        "lookup matches %d content ids (%d enabled_content)",
-        len(contents),
-        len(enabled_content),
-    )
-    banks = {c.bank.name: c.bank for c in enabled_content}
-    rand = random.Random(request.args.get("seed"))
-    coinflip = rand.random()
-    enabled_banks = {
-        b.name for b in banks.values() if b.matching_enabled_ratio >= coinflip
-    }
-    current_app.logger.debug(
-        "lookup matches %d banks (%d enabled_banks)", len(banks), len(enabled_banks)
-    )
-    results = defaultdict(list)
-    for content in enabled_content:
-        if content.bank.name not in enabled_banks:
-            continue
-
-        matched_content = results_by_bank_content_id[content.id]
-        match: MatchWithDistance = {
-            "bank_content_id": content.id,
-            "distance": matched_content.similarity_info.pretty_str(),
+    with tracing.span(
+        "bank_content_get"
+    ) as span, metrics.LOOKUP_ENRICHMENT_SECONDS.time(signal_type=signal_type_name):
+        contents = storage.bank_content_get(results_by_bank_content_id)
+        if span is not None:
+            span.set_attribute("contents", len(contents))
+    with tracing.span("coinflip_filter"):
+        enabled_content = [c for c in contents if c.enabled]
+        current_app.logger.debug(
+            "lookup matches %d content ids (%d enabled_content)",
+            len(contents),
+            len(enabled_content),
+        )
+        banks = {c.bank.name: c.bank for c in enabled_content}
+        rand = random.Random(request.args.get("seed"))
+        coinflip = rand.random()
+        enabled_banks = {
+            b.name for b in banks.values() if b.matching_enabled_ratio >= coinflip
         }
-        results[content.bank.name].append(match)
+        current_app.logger.debug(
+            "lookup matches %d banks (%d enabled_banks)", len(banks), len(enabled_banks)
+        )
+    with tracing.span("shape_response"):
+        results = defaultdict(list)
+        for content in enabled_content:
+            if content.bank.name not in enabled_banks:
+                continue
+
+            matched_content = results_by_bank_content_id[content.id]
+            match: MatchWithDistance = {
+                "bank_content_id": content.id,
+                "distance": matched_content.similarity_info.pretty_str(),
+            }
+            results[content.bank.name].append(match)
+    metrics.LOOKUP_SECONDS.observe(
+        time.perf_counter() - start, signal_type=signal_type_name
+    )
     return results
 
 
@@ -431,7 +481,7 @@ def initiate_index_cache(app: Flask, scheduler: APScheduler | None) -> None:
         for name, entry in cache.items():
             scheduler.add_job(
                 f"Match Index Refresh[{name}]",
-                entry.periodic_task,
+                profiling.wrap_task(app, f"CachedIndex[{name}]", entry.periodic_task),
                 trigger="interval",
                 seconds=30,
                 start_date=datetime.datetime.now() - datetime.timedelta(seconds=29),
@@ -447,6 +497,29 @@ def _get_index_cache() -> IndexCache:
     return t.cast(IndexCache, getattr(current_app, "signal_type_index_cache", {}))
 
 
+def _collect_index_cache_metrics() -> None:
+    if not has_app_context():
+        return
+    now = time.time()
+    for name, entry in _get_index_cache().items():
+        if not entry.is_ready:
+            continue
+        metrics.INDEX_SIZE.set(entry.checkpoint.total_hash_count, signal_type=name)
+        metrics.INDEX_GENERATION.set(
+            entry.checkpoint.last_item_timestamp, signal_type=name
+        )
+        if entry.checkpoint.last_item_timestamp >= 0:
+            metrics.INDEX_AGE_SECONDS.set(
+                now - entry.checkpoint.last_item_timestamp, signal_type=name
+            )
+        metrics.INDEX_LAST_CHECK_AGE_SECONDS.set(
+            now - entry.last_check_ts, signal_type=name
+        )
+
+
+metrics.REGISTRY.add_collector(_collect_index_cache_metrics)
+
+
 def index_cache_is_stale() -> bool:
     return any(idx.is_stale for idx in _get_index_cache().values())
 
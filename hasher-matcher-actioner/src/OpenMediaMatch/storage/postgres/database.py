@@ -467,14 +467,19 @@ class SignalIndex(db.Model):  # type: ignore[name-defined]
 
         return self
 
-    def load_signal_index(self) -> SignalTypeIndex[int]:
+    def load_signal_index(
+        self, index_cls: t.Type[SignalTypeIndex] = SignalTypeIndex
+    ) -> SignalTypeIndex[int]:
+        """
+        Load the stored index, using index_cls.deserialize()
+
+        Most indices are pickled, which will produce the right class no
+        matter which class deserializes them, but some (like the exact
+        match indices for MD5s and URLs) have their own format, so callers
+        should pass the SignalType's get_index_cls().
+        """
         oid = self.serialized_index_large_object_oid
         assert oid is not None
-        # If we were being fully proper, we would get the SignalType
-        # class and use that index to compare them. However, every existing
-        # index as of 10/2/2023 is using pickle, which will produce the right
-        # class no matter which interface we call it on.
-        # I'm sorry future debugger finding this comment.
         load_start_time = time.time()
         raw_conn = db.engine.raw_connection()
         l_obj = raw_conn.lobject(oid, "rb")  # type: ignore[attr-defined]
@@ -493,7 +498,7 @@ class SignalIndex(db.Model):  # type: ignore[name-defined]
             deserialize_start = time.time()
             index = t.cast(
                 SignalTypeIndex[int],
-                SignalTypeIndex.deserialize(t.cast(t.BinaryIO, tmpfile.file)),
+                index_cls.deserialize(t.cast(t.BinaryIO, tmpfile.file)),
             )
             self._log(
                 "deserialized - %s",
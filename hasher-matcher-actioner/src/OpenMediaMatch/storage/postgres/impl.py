@@ -3,6 +3,7 @@
 """
 The default store for accessing persistent data on OMM.
 """
+
 from dataclasses import dataclass
 import pickle
 import time
@@ -192,7 +193,7 @@ class DefaultOMMStore(interface.IUnifiedStore):
 
         if db_record is None or not db_record.index_lobj_exists():
             return None
-        return db_record.load_signal_index()
+        return db_record.load_signal_index(signal_type.get_index_cls())
 
     def store_signal_type_index(
         self,
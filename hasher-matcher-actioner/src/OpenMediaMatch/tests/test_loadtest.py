@@ -0,0 +1,42 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import pytest
+from flask import Flask
+
+from OpenMediaMatch.persistence import get_storage
+from OpenMediaMatch.tests.utils import app
+from OpenMediaMatch.utils import loadtest
+from OpenMediaMatch.utils.fetch_benchmarking import InfiniteRandomExchange
+
+
+def test_loadtest(app: Flask, monkeypatch: pytest.MonkeyPatch):
+    storage = get_storage()
+    monkeypatch.setattr(
+        storage,
+        "exchange_types",
+        {
+            **storage.exchange_types,  # type: ignore[attr-defined]
+            InfiniteRandomExchange.get_name(): InfiniteRandomExchange,
+        },
+    )
+    result = loadtest.run_loadtest(
+        app,
+        storage,
+        loadtest.LoadTestConfig(
+            signal_count=200,
+            lookup_qps=100,
+            lookup_duration_sec=0.5,
+            lookup_concurrency=2,
+            staleness_signal_count=10,
+        ),
+    )
+    assert set(result.signal_types) == {"pdq", "video_md5"}
+    assert {"fetch", "commit", "index build", "matcher reload"} <= set(result.stages)
+    assert result.lookups is not None
+    assert result.lookups.count == 50
+    assert result.lookups.errors == 0
+    assert result.lookups.hit_rate == 1.0
+    assert result.staleness_matched == 1.0
+    # Cleaned up after
+    assert result.collab_name not in storage.exchanges_get()
+    assert result.collab_name not in storage.get_banks()
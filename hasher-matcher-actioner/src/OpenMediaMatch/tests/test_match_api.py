@@ -2,41 +2,15 @@
 
 import typing as t
 
-import pytest
 from flask.testing import FlaskClient
 
 from threatexchange.signal_type.pdq.signal import PdqSignal
 from threatexchange.signal_type.md5 import VideoMD5Signal
-from threatexchange.exchanges.impl.static_sample import StaticSampleSignalExchangeAPI
 
-from OpenMediaMatch.tests.utils import app
+from OpenMediaMatch.tests.utils import app, client_with_sample_data
 
-from OpenMediaMatch.background_tasks import fetcher, build_index
 from OpenMediaMatch.blueprints.matching import TMatchByBank
 from OpenMediaMatch.persistence import get_storage
-from OpenMediaMatch.storage import interface as iface
-
-
-@pytest.fixture()
-def client_with_sample_data(app) -> FlaskClient:
-    storage = get_storage()
-    storage.exchange_api_config_update(
-        iface.SignalExchangeAPIConfig(StaticSampleSignalExchangeAPI)
-    )
-    storage.exchange_update(
-        StaticSampleSignalExchangeAPI.get_config_cls()(
-            name="SAMPLE",
-            api=StaticSampleSignalExchangeAPI.get_name(),
-            enabled=True,
-        ),
-        create=True,
-    )
-    fetcher.fetch_all(storage, storage.get_signal_type_configs())
-    build_index.build_all_indices(storage, storage, storage)
-
-    client = app.test_client()
-    assert client.get("/status").status_code == 200
-    return client
 
 
 def test_raw_lookups(client_with_sample_data: FlaskClient):
@@ -0,0 +1,105 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import time
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+
+from threatexchange.signal_type.pdq.signal import PdqSignal
+
+from OpenMediaMatch.tests.utils import app, client_with_sample_data
+from OpenMediaMatch.blueprints import matching
+from OpenMediaMatch.storage import interface as iface
+from OpenMediaMatch.utils import metrics
+
+
+def test_render():
+    registry = metrics.MetricsRegistry()
+    counter = metrics.Counter("c_total", "A counter", ["x"], registry=registry)
+    gauge = metrics.Gauge("g", "A gauge", registry=registry)
+    hist = metrics.Histogram(
+        "h_seconds", "A histogram", ["x"], buckets=[0.1, 1], registry=registry
+    )
+    registry.add_collector(lambda: gauge.set(2.5))
+
+    counter.inc(x='a"b')
+    counter.inc(2, x='a"b')
+    for v in (0.05, 0.1, 0.5, 5):
+        hist.observe(v, x="y")
+
+    assert registry.render().splitlines() == [
+        "# HELP c_total A counter",
+        "# TYPE c_total counter",
+        'c_total{x="a\\"b"} 3',
+        "# HELP g A gauge",
+        "# TYPE g gauge",
+        "g 2.5",
+        "# HELP h_seconds A histogram",
+        "# TYPE h_seconds histogram",
+        'h_seconds_bucket{x="y",le="0.1"} 2',
+        'h_seconds_bucket{x="y",le="1"} 3',
+        'h_seconds_bucket{x="y",le="+Inf"} 4',
+        'h_seconds_sum{x="y"} 5.65',
+        'h_seconds_count{x="y"} 4',
+    ]
+
+
+def test_wrong_labels():
+    registry = metrics.MetricsRegistry()
+    counter = metrics.Counter("c_total", "A counter", ["x"], registry=registry)
+    for labels in ({}, {"y": 1}, {"x": 1, "y": 1}):
+        with pytest.raises(ValueError):
+            counter.inc(**labels)
+
+
+def test_metrics_endpoint(client_with_sample_data: FlaskClient):
+    client = client_with_sample_data
+    resp = client.get(
+        "/m/lookup",
+        query_string={
+            "signal": PdqSignal.get_examples()[0],
+            "signal_type": PdqSignal.get_name(),
+        },
+    )
+    assert resp.status_code == 200
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.content_type == metrics.CONTENT_TYPE
+    samples = {line.split(" ")[0] for line in resp.text.splitlines() if line[0] != "#"}
+    for expected in (
+        'omm_lookup_seconds_count{signal_type="pdq"}',
+        'omm_index_query_seconds_count{signal_type="pdq"}',
+        'omm_lookup_enrichment_seconds_count{signal_type="pdq"}',
+        'omm_index_build_seconds_count{signal_type="pdq"}',
+        'omm_index_build_signals{signal_type="pdq"}',
+        'omm_fetch_records_total{collab="SAMPLE"}',
+        'omm_fetch_commit_seconds_count{collab="SAMPLE"}',
+        'omm_fetch_commit_batch_size_count{collab="SAMPLE"}',
+    ):
+        assert expected in samples
+
+
+def test_index_cache_metrics(app: Flask):
+    now = time.time()
+    app.signal_type_index_cache = {  # type: ignore[attr-defined]
+        "pdq": matching._SignalIndexInMemoryCache(
+            PdqSignal,
+            PdqSignal.get_index_cls().build([]),
+            iface.SignalTypeIndexBuildCheckpoint(
+                last_item_timestamp=int(now) - 3600,
+                last_item_id=1,
+                total_hash_count=5,
+            ),
+            now - 30,
+        )
+    }
+    values = {
+        line.split(" ")[0]: float(line.split(" ")[1])
+        for line in metrics.REGISTRY.render().splitlines()
+        if line[0] != "#"
+    }
+    assert values['omm_index_size{signal_type="pdq"}'] == 5
+    assert 3600 <= values['omm_index_age_seconds{signal_type="pdq"}'] < 3660
+    assert 30 <= values['omm_index_last_check_age_seconds{signal_type="pdq"}'] < 90
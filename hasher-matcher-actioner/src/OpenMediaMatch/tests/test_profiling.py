@@ -0,0 +1,84 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import time
+
+import pytest
+from flask import Flask
+
+from OpenMediaMatch.tests.utils import app
+from OpenMediaMatch.utils import profiling
+
+
+def _spin(sec: float) -> None:
+    end = time.perf_counter() + sec
+    while time.perf_counter() < end:
+        pass
+
+
+def _call_spin() -> None:
+    # No samples of its own, they're all in _spin
+    _spin(0.3)
+
+
+def _spin_then_sleep() -> None:
+    _call_spin()
+    time.sleep(0.3)
+
+
+def test_profile_call():
+    profile = profiling.profile_call(
+        "test_profile_call", _spin_then_sleep, interval_sec=0.005
+    )
+    assert profile.error is None
+    assert profile.wall_sec >= 0.6
+    # The sleep is wall time, but not CPU time
+    assert 0.2 < profile.cpu_sec < profile.wall_sec - 0.2
+    assert profile.samples > 50
+
+    (spin,) = [f for f in profile.hot_functions if f.function.endswith("(_spin)")]
+    assert spin.self_samples > profile.samples / 10
+    assert spin.total_samples >= spin.self_samples
+    (call_spin,) = [
+        f for f in profile.hot_functions if f.function.endswith("(_call_spin)")
+    ]
+    assert call_spin.total_samples >= spin.total_samples
+    assert "_spin" in profile.pretty_str()
+
+    assert profiling.get_recent_profiles("test_profile_call") == [profile]
+
+
+def test_profile_call_error():
+    def fail():
+        raise ValueError("oh no")
+
+    with pytest.raises(ValueError):
+        profiling.profile_call("test_profile_call_error", fail)
+    (profile,) = profiling.get_recent_profiles("test_profile_call_error")
+    assert profile.error == "ValueError: oh no"
+
+
+def test_keep_runs():
+    for _ in range(3):
+        profiling.profile_call("test_keep_runs", lambda: None, keep_runs=2)
+    profiles = profiling.get_recent_profiles("test_keep_runs")
+    assert len(profiles) == 2
+    assert profiles[0].started_at >= profiles[1].started_at
+
+
+def test_wrap_task(app: Flask):
+    def task():
+        pass
+
+    assert profiling.wrap_task(app, "test_wrap_task", task) is task
+    app.config["PROFILE_BACKGROUND_TASKS"] = True
+    profiling.wrap_task(app, "test_wrap_task", task)()
+    assert len(profiling.get_recent_profiles("test_wrap_task")) == 1
+
+    client = app.test_client()
+    resp = client.get(
+        "/c/background_tasks/profiles", query_string={"task": "test_wrap_task"}
+    )
+    assert resp.status_code == 200
+    assert resp.json is not None
+    assert resp.json["enabled"] is True
+    assert [p["task"] for p in resp.json["profiles"]] == ["test_wrap_task"]
@@ -0,0 +1,100 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+
+from threatexchange.signal_type.pdq.signal import PdqSignal
+
+from OpenMediaMatch.tests.utils import app, client_with_sample_data
+from OpenMediaMatch.utils import tracing
+
+
+def test_spans():
+    exporter = tracing.InMemorySpanExporter()
+    tracer = tracing.Tracer(exporter, sample_rate=1.0)
+
+    with tracer.span("root", a=1) as root:
+        with tracer.span("child") as child:
+            assert tracing.current_span() is child
+            with tracer.span("grandchild"):
+                pass
+        with pytest.raises(ValueError):
+            with tracer.span("error"):
+                raise ValueError("oh no")
+        assert exporter.spans == []  # Only exported once the root ends
+    assert tracing.current_span() is None
+
+    assert root is not None and child is not None
+    spans = {s.name: s for s in exporter.spans}
+    assert set(spans) == {"root", "child", "grandchild", "error"}
+    assert {s.trace_id for s in spans.values()} == {root.trace_id}
+    assert root.parent_id is None
+    assert root.attributes == {"a": 1}
+    assert child.parent_id == root.span_id
+    assert spans["grandchild"].parent_id == child.span_id
+    assert spans["error"].parent_id == root.span_id
+    assert "oh no" in str(spans["error"].attributes["error"])
+    assert root.start_time_ns <= child.start_time_ns <= child.end_time_ns
+    assert child.end_time_ns <= root.end_time_ns
+
+
+def test_sampling():
+    exporter = tracing.InMemorySpanExporter()
+    tracer = tracing.Tracer(exporter, sample_rate=0.0)
+    with tracer.span("root") as root:
+        with tracer.span("child") as child:
+            assert root is None and child is None
+            assert tracing.current_span() is None
+    assert exporter.spans == []
+
+    # The next trace is sampled on its own
+    tracer.sample_rate = 1.0
+    with tracer.span("root"):
+        pass
+    assert [s.name for s in exporter.spans] == ["root"]
+
+
+def test_broken_exporter():
+    class BrokenExporter(tracing.SpanExporter):
+        def export(self, spans):
+            raise Exception("Oh no")
+
+    with tracing.Tracer(BrokenExporter(), sample_rate=1.0).span("root"):
+        pass
+
+
+def test_lookup_spans(app: Flask, client_with_sample_data: FlaskClient):
+    client = client_with_sample_data
+    exporter = tracing.InMemorySpanExporter()
+    app.extensions["omm_tracer"] = tracing.Tracer(exporter, sample_rate=1.0)
+
+    resp = client.get(
+        "/m/lookup",
+        query_string={
+            "signal": PdqSignal.get_examples()[0],
+            "signal_type": PdqSignal.get_name(),
+        },
+    )
+    assert resp.status_code == 200
+    assert resp.json
+
+    spans = {s.name: s for s in exporter.spans}
+    assert set(spans) == {
+        "GET /m/lookup",
+        "lookup",
+        "validate_signal",
+        "get_index",
+        "index.query",
+        "bank_content_get",
+        "coinflip_filter",
+        "shape_response",
+        "encode_response",
+    }
+    root = spans["GET /m/lookup"]
+    assert root.attributes["http.status_code"] == 200
+    assert spans["lookup"].parent_id == root.span_id
+    assert spans["encode_response"].parent_id == root.span_id
+    assert spans["index.query"].parent_id == spans["lookup"].span_id
+    matches = spans["index.query"].attributes["matches"]
+    assert isinstance(matches, int) and matches >= 1
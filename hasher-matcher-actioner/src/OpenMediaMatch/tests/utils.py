@@ -10,12 +10,13 @@ from flask.testing import FlaskClient
 from threatexchange.exchanges.impl.static_sample import StaticSampleSignalExchangeAPI
 
 from OpenMediaMatch.app import create_app
+from OpenMediaMatch.background_tasks import fetcher, build_index
 from OpenMediaMatch.persistence import get_storage
+from OpenMediaMatch.storage import interface as iface
 from OpenMediaMatch.storage.postgres.flask_utils import reset_tables
 from OpenMediaMatch.storage.postgres import database
 from sqlalchemy.sql import text
 
-
 IMAGE_URL_TO_PDQ = {
     "https://github.com/facebook/ThreatExchange/blob/main/pdq/data/bridge-mods/aaa-orig.jpg?raw=true": "f8f8f0cee0f4a84f06370a22038f63f0b36e2ed596621e1d33e6b39c4e9c9b22",
     "https://github.com/facebook/ThreatExchange/blob/main/pdq/data/misc-images/c.png?raw=true": "e64cc9d91c623882f8d1f1d9a398e78c9f199b3bd83924f2b7e11e0bf861b064",
@@ -49,6 +50,29 @@ def client(app) -> FlaskClient:
     return app.test_client()
 
 
+@pytest.fixture()
+def client_with_sample_data(app) -> FlaskClient:
+    """A client, with the sample exchange fetched and its indices built."""
+    storage = get_storage()
+    storage.exchange_api_config_update(
+        iface.SignalExchangeAPIConfig(StaticSampleSignalExchangeAPI)
+    )
+    storage.exchange_update(
+        StaticSampleSignalExchangeAPI.get_config_cls()(
+            name="SAMPLE",
+            api=StaticSampleSignalExchangeAPI.get_name(),
+            enabled=True,
+        ),
+        create=True,
+    )
+    fetcher.fetch_all(storage, storage.get_signal_type_configs())
+    build_index.build_all_indices(storage, storage, storage)
+
+    client = app.test_client()
+    assert client.get("/status").status_code == 200
+    return client
+
+
 def create_bank(client: FlaskClient, bank_name: str):
     post_response = client.post(
         "/c/banks",
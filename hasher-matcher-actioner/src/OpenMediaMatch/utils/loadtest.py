@@ -0,0 +1,421 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+End-to-end load test of OMM, using InfiniteRandomExchange as the data source.
+
+Drives the same code the background tasks do, timing each stage:
+  1. fetch N random signals from a new InfiniteRandomExchange collab, and
+     commit them to the database (which puts them in the collab's bank)
+  2. build the indices for the fetched signal types
+  3. load the new indices into the matcher's in-memory cache
+  4. /m/lookup at a target rate, for latency percentiles
+  5. fetch a few more signals, and wait for them to be matchable, for the
+     staleness between ingest and match
+
+By default, lookups are sent to this process's app (without HTTP). If
+target_url is set, they are sent to a running OMM instead, and staleness
+is measured against that instance's own background tasks. The database
+is whichever the omm_config points at - use a dedicated one, since
+millions of signals are slow to clean up.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+import json
+import random
+import threading
+import time
+import typing as t
+
+import flask
+import requests
+
+from threatexchange.exchanges.fetch_state import FetchCheckpointBase
+from threatexchange.exchanges.collab_config import CollaborationConfigBase
+from threatexchange.signal_type.signal_base import CanGenerateRandomSignal, SignalType
+
+from OpenMediaMatch.background_tasks import build_index, fetcher
+from OpenMediaMatch.blueprints import matching
+from OpenMediaMatch.storage.interface import IUnifiedStore
+from OpenMediaMatch.utils.fetch_benchmarking import (
+    InfiniteRandomExchange,
+    InfiniteRandomExchangeCollabConfig,
+)
+
+# (signal type name, signal)
+TLookup = t.Tuple[str, str]
+# Sends one lookup, returns the status code and whether anything matched
+TSendLookup = t.Callable[[str, str], t.Tuple[int, bool]]
+
+
+@dataclass
+class LoadTestConfig:
+    # How many signals to fetch from the random exchange
+    signal_count: int = 1000000
+    # Only these signal types (default: every enabled one that can be generated)
+    signal_types: t.Set[str] = field(default_factory=set)
+    # /m/lookup requests per second, and for how long
+    lookup_qps: float = 100.0
+    lookup_duration_sec: float = 30.0
+    lookup_concurrency: int = 8
+    # Fraction of lookups for signals that were fetched (vs random misses)
+    lookup_hit_ratio: float = 0.5
+    # Send lookups to a running OMM at this url instead of in-process
+    target_url: str | None = None
+    # How many signals to fetch and wait on for staleness
+    staleness_signal_count: int = 100
+    staleness_timeout_sec: float = 600.0
+    staleness_poll_sec: float = 1.0
+    # Delete the collab (and so its bank and signals) after
+    cleanup: bool = True
+
+
+@dataclass
+class LatencyStats:
+    count: int
+    errors: int
+    duration_sec: float
+    achieved_qps: float
+    hit_rate: float
+    # From when the request should have been sent, so a server that can't
+    # keep up shows up as latency rather than a lower request rate
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    # From when the request was actually sent
+    service_p50_ms: float
+    service_p99_ms: float
+
+
+@dataclass
+class LoadTestResult:
+    collab_name: str
+    signal_count: int
+    signal_types: t.List[str]
+    # stage name -> seconds
+    stages: t.Dict[str, float] = field(default_factory=dict)
+    index_build_sec: t.Dict[str, float] = field(default_factory=dict)
+    index_reload_sec: t.Dict[str, float] = field(default_factory=dict)
+    lookups: LatencyStats | None = None
+    # Seconds from the commit of new signals until all of them matched
+    staleness_sec: float | None = None
+    staleness_matched: float | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), indent=2)
+
+    def pretty_str(self) -> str:
+        lines = [
+            f"Load test {self.collab_name}: {self.signal_count:,} signals "
+            f"({', '.join(self.signal_types)})"
+        ]
+        for stage, sec in self.stages.items():
+            lines.append(f"  {stage:<16} {sec:10.2f}s")
+        for name, sec in self.index_build_sec.items():
+            lines.append(f"    build[{name}] {sec:.2f}s")
+        for name, sec in self.index_reload_sec.items():
+            lines.append(f"    reload[{name}] {sec:.2f}s")
+        if self.lookups is not None:
+            l = self.lookups
+            lines.append(
+                f"  lookups: {l.count:,} ({l.errors:,} errors) "
+                f"@ {l.achieved_qps:,.1f} qps, hit rate {l.hit_rate:.0%}"
+            )
+            lines.append(
+                f"    latency p50 {l.p50_ms:.1f}ms p90 {l.p90_ms:.1f}ms "
+                f"p99 {l.p99_ms:.1f}ms max {l.max_ms:.1f}ms "
+                f"(service p50 {l.service_p50_ms:.1f}ms p99 {l.service_p99_ms:.1f}ms)"
+            )
+        if self.staleness_sec is not None:
+            lines.append(
+                f"  ingest -> match staleness: {self.staleness_sec:.2f}s "
+                f"({self.staleness_matched:.0%} matched)"
+            )
+        return "\n".join(lines)
+
+
+class _CommitRecorder:
+    """
+    Wraps the store to time commits, and keep a sample of committed signals
+
+    The sample is what lookups query for, since the random exchange doesn't
+    otherwise say what it generated.
+    """
+
+    def __init__(self, store: IUnifiedStore, sample_size: int) -> None:
+        self._store = store
+        self._sample_size = sample_size
+        self.commit_sec = 0.0
+        self.last_commit_ts = 0.0
+        self.committed = 0
+        self.sample: t.List[TLookup] = []
+
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self._store, name)
+
+    def exchange_commit_fetch(
+        self,
+        collab: CollaborationConfigBase,
+        old_checkpoint: t.Optional[FetchCheckpointBase],
+        dat: t.Dict[t.Any, t.Any],
+        checkpoint: FetchCheckpointBase,
+    ) -> None:
+        start = time.time()
+        self._store.exchange_commit_fetch(collab, old_checkpoint, dat, checkpoint)
+        self.last_commit_ts = time.time()
+        self.commit_sec += self.last_commit_ts - start
+        for val in dat.values():
+            if val is None:
+                continue
+            # Reservoir sample
+            self.committed += 1
+            if len(self.sample) < self._sample_size:
+                self.sample.append(val)
+            else:
+                i = random.randrange(self.committed)
+                if i < self._sample_size:
+                    self.sample[i] = val
+
+    def reset(self) -> None:
+        self.commit_sec = 0.0
+        self.committed = 0
+        self.sample = []
+
+
+def run_loadtest(
+    app: flask.Flask, storage: IUnifiedStore, cfg: LoadTestConfig
+) -> LoadTestResult:
+    if InfiniteRandomExchange.get_name() not in storage.exchange_apis_get_installed():
+        raise ValueError(
+            f"{InfiniteRandomExchange.get_name()} isn't installed - "
+            "add InfiniteRandomExchange to exchange_types in the omm_config"
+        )
+    signal_types = _get_signal_types(storage, cfg.signal_types)
+    collab = InfiniteRandomExchangeCollabConfig(
+        name=f"LOADTEST_{int(time.time())}",
+        api=InfiniteRandomExchange.get_name(),
+        enabled=True,
+        total_item_limit=cfg.signal_count,
+        only_signal_types={st.get_name() for st in signal_types},
+    )
+    storage.exchange_update(collab, create=True)
+    app.logger.info("Created %s for the load test", collab.name)
+    ret = LoadTestResult(
+        collab.name, cfg.signal_count, [st.get_name() for st in signal_types]
+    )
+    recorder = _CommitRecorder(storage, sample_size=10000)
+    try:
+        start = time.time()
+        _fetch_until_up_to_date(recorder, collab)
+        ret.stages["fetch"] = time.time() - start - recorder.commit_sec
+        ret.stages["commit"] = recorder.commit_sec
+
+        start = time.time()
+        ret.index_build_sec = _build_indices(storage, signal_types)
+        ret.stages["index build"] = time.time() - start
+
+        start = time.time()
+        ret.index_reload_sec = _reload_indices(app, storage, signal_types)
+        ret.stages["matcher reload"] = time.time() - start
+
+        send = _get_sender(app, cfg.target_url)
+        hits = recorder.sample
+        ret.lookups = _run_lookups(send, hits, signal_types, cfg)
+
+        if cfg.staleness_signal_count > 0:
+            recorder.reset()
+            collab.total_item_limit += cfg.staleness_signal_count
+            storage.exchange_update(collab)
+            start = time.time()
+            _fetch_until_up_to_date(recorder, collab)
+            ret.stages["staleness fetch"] = time.time() - start
+            if cfg.target_url is None:
+                # Nothing runs the background tasks in process, so do it here
+                _build_indices(storage, signal_types)
+                _reload_indices(app, storage, signal_types)
+            ret.staleness_sec, ret.staleness_matched = _wait_for_matches(
+                send, recorder.sample, recorder.last_commit_ts, cfg
+            )
+    finally:
+        if cfg.cleanup:
+            start = time.time()
+            storage.exchange_delete(collab.name)
+            ret.stages["cleanup"] = time.time() - start
+    return ret
+
+
+def _get_signal_types(
+    storage: IUnifiedStore, only: t.Set[str]
+) -> t.List[t.Type[SignalType]]:
+    enabled = storage.get_enabled_signal_types()
+    unknown = only - enabled.keys()
+    if unknown:
+        raise ValueError(f"signal types not enabled: {', '.join(sorted(unknown))}")
+    ret: t.List[t.Type[SignalType]] = [
+        st
+        for name, st in enabled.items()
+        if (not only or name in only) and issubclass(st, CanGenerateRandomSignal)
+    ]
+    if not ret:
+        raise ValueError("no enabled signal types can generate random signals")
+    return ret
+
+
+def _fetch_until_up_to_date(
+    recorder: _CommitRecorder, collab: InfiniteRandomExchangeCollabConfig
+) -> None:
+    # A single fetch() gives up after fetcher.ONE_FETCH_MAX_SEC
+    store = t.cast(IUnifiedStore, recorder)
+    while True:
+        fetcher.fetch(store, store.get_signal_type_configs(), collab)
+        status = store.exchange_get_fetch_status(collab.name)
+        if status.up_to_date:
+            return
+        if status.last_fetch_succeeded is False:
+            raise RuntimeError(f"{collab.name} fetch failed, see logs")
+
+
+def _build_indices(
+    storage: IUnifiedStore, signal_types: t.Sequence[t.Type[SignalType]]
+) -> t.Dict[str, float]:
+    ret = {}
+    for st in signal_types:
+        start = time.time()
+        build_index.build_index(st, storage, storage)
+        ret[st.get_name()] = time.time() - start
+    return ret
+
+
+def _reload_indices(
+    app: flask.Flask,
+    storage: IUnifiedStore,
+    signal_types: t.Sequence[t.Type[SignalType]],
+) -> t.Dict[str, float]:
+    if not hasattr(app, "signal_type_index_cache"):
+        # TASK_INDEX_CACHE is off, but without it every lookup loads the index
+        matching.initiate_index_cache(app, None)
+    cache = matching._get_index_cache()
+    ret = {}
+    for st in signal_types:
+        start = time.time()
+        cache[st.get_name()].reload_if_needed(storage)
+        ret[st.get_name()] = time.time() - start
+    return ret
+
+
+def _get_sender(app: flask.Flask, target_url: str | None) -> TSendLookup:
+    # Neither the test client nor requests.Session are thread safe
+    local = threading.local()
+
+    if target_url is None:
+
+        def send(signal_type: str, signal: str) -> t.Tuple[int, bool]:
+            if not hasattr(local, "client"):
+                local.client = app.test_client()
+            resp = local.client.get(
+                "/m/lookup",
+                query_string={"signal_type": signal_type, "signal": signal},
+            )
+            return resp.status_code, resp.status_code == 200 and bool(resp.json)
+
+        return send
+
+    url = f"{target_url.rstrip('/')}/m/lookup"
+
+    def send_http(signal_type: str, signal: str) -> t.Tuple[int, bool]:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        resp = local.session.get(
+            url, params={"signal_type": signal_type, "signal": signal}, timeout=30
+        )
+        return resp.status_code, resp.ok and bool(resp.json())
+
+    return send_http
+
+
+def _run_lookups(
+    send: TSendLookup,
+    hits: t.Sequence[TLookup],
+    signal_types: t.Sequence[t.Type[SignalType]],
+    cfg: LoadTestConfig,
+) -> LatencyStats:
+    count = max(1, int(cfg.lookup_qps * cfg.lookup_duration_sec))
+    queries: t.List[t.Tuple[bool, TLookup]] = []
+    for i in range(count):
+        if hits and random.random() < cfg.lookup_hit_ratio:
+            queries.append((True, random.choice(hits)))
+        else:
+            st = signal_types[i % len(signal_types)]
+            signal = t.cast(t.Type[CanGenerateRandomSignal], st).get_random_signal()
+            queries.append((False, (st.get_name(), signal)))
+
+    def one(query: TLookup, scheduled: float) -> t.Tuple[float, float, int, bool]:
+        sent = time.perf_counter()
+        try:
+            status, matched = send(*query)
+        except requests.RequestException:
+            status, matched = -1, False
+        done = time.perf_counter()
+        return done - scheduled, done - sent, status, matched
+
+    start = time.perf_counter()
+    # Open loop: requests go out on schedule, whether or not earlier ones
+    # have come back
+    with ThreadPoolExecutor(cfg.lookup_concurrency) as pool:
+        futures = []
+        for i, (_, query) in enumerate(queries):
+            scheduled = start + i / cfg.lookup_qps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(one, query, scheduled))
+        results = [f.result() for f in futures]
+    duration = time.perf_counter() - start
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    service = sorted(r[1] * 1000 for r in results)
+    expected_hits = [r[3] for r, (is_hit, _) in zip(results, queries) if is_hit]
+    return LatencyStats(
+        count=len(results),
+        errors=sum(r[2] != 200 for r in results),
+        duration_sec=duration,
+        achieved_qps=len(results) / duration,
+        hit_rate=sum(expected_hits) / len(expected_hits) if expected_hits else 0.0,
+        p50_ms=_percentile(latencies, 0.5),
+        p90_ms=_percentile(latencies, 0.9),
+        p99_ms=_percentile(latencies, 0.99),
+        max_ms=latencies[-1],
+        service_p50_ms=_percentile(service, 0.5),
+        service_p99_ms=_percentile(service, 0.99),
+    )
+
+
+def _wait_for_matches(
+    send: TSendLookup,
+    new_signals: t.Sequence[TLookup],
+    committed_ts: float,
+    cfg: LoadTestConfig,
+) -> t.Tuple[float, float]:
+    """Poll until every new signal matches, returns (staleness, fraction matched)"""
+    pending = set(new_signals)
+    deadline = committed_ts + cfg.staleness_timeout_sec
+    while True:
+        pending = {q for q in pending if not _is_match(send, q)}
+        now = time.time()
+        if not pending or now > deadline:
+            break
+        time.sleep(cfg.staleness_poll_sec)
+    matched = 1 - len(pending) / len(new_signals) if new_signals else 1.0
+    return now - committed_ts, matched
+
+
+def _is_match(send: TSendLookup, query: TLookup) -> bool:
+    try:
+        return send(*query)[1]
+    except requests.RequestException:
+        return False
+
+
+def _percentile(sorted_values: t.Sequence[float], pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
@@ -0,0 +1,300 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+Metrics for OMM's hot paths, served at /metrics in the Prometheus text format.
+
+Metrics are kept in memory per process, and each scrape only sees the
+process that happened to serve it. Gunicorn workers share a port, so run
+one worker per scrape target (scale with replicas, which Prometheus scrapes
+and labels separately), or the series jump between workers' values.
+
+Counters are cumulative, so rates (i.e. fetched records per second) come
+from rate() on the Prometheus side. Values that are only meaningful at
+scrape time (i.e. how old the loaded index is) are set by collectors,
+which run just before rendering.
+"""
+
+import abc
+from contextlib import contextmanager
+import bisect
+import math
+import threading
+import time
+import typing as t
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from sub-millisecond index queries up to long index builds
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+SIZE_BUCKETS = (1, 10, 100, 500, 1000, 2500, 5000, 10000, 50000)
+
+TLabels = t.Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(metaclass=abc.ABCMeta):
+    TYPE: t.ClassVar[str]
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: t.Sequence[str] = (),
+        registry: t.Optional["MetricsRegistry"] = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _label_values(self, labels: t.Mapping[str, t.Any]) -> TLabels:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _format_labels(self, values: TLabels, extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, values)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> t.List[str]:
+        ret = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        with self._lock:
+            ret.extend(self._render_samples())
+        return ret
+
+    @abc.abstractmethod
+    def _render_samples(self) -> t.List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A count that only goes up, i.e. records fetched"""
+
+    TYPE = "counter"
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: t.Dict[TLabels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: t.Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_samples(self) -> t.List[str]:
+        return [
+            f"{self.name}{self._format_labels(k)} {_format_value(v)}"
+            for k, v in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """A value that can go up or down, i.e. how many signals are indexed"""
+
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels: t.Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """The distribution of observed values, i.e. lookup latency"""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: t.Sequence[str] = (),
+        buckets: t.Sequence[float] = DEFAULT_BUCKETS,
+        registry: t.Optional["MetricsRegistry"] = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # labels => (count per bucket, with +Inf last), sum
+        self._values: t.Dict[TLabels, t.Tuple[t.List[int], float]] = {}
+
+    def observe(self, value: float, **labels: t.Any) -> None:
+        key = self._label_values(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0)
+            counts[i] += 1
+            self._values[key] = counts, total + value
+
+    @contextmanager
+    def time(self, **labels: t.Any) -> t.Iterator[None]:
+        """Observe how long the with block takes, in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self) -> t.List[str]:
+        ret = []
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = self._format_labels(key, f'le="{_format_value(bound)}"')
+                ret.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = self._format_labels(key)
+            ret.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            ret.append(f"{self.name}_count{labels} {cumulative}")
+        return ret
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: t.Dict[str, _Metric] = {}
+        self._collectors: t.List[t.Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> None:
+        assert metric.name not in self._metrics, f"duplicate metric {metric.name}"
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: t.Callable[[], None]) -> None:
+        """Called on every render(), to set values that depend on scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Matching
+LOOKUP_SECONDS = Histogram(
+    "omm_lookup_seconds",
+    "Time for a whole /m/lookup of one signal, including bank enrichment",
+    ["signal_type"],
+)
+INDEX_QUERY_SECONDS = Histogram(
+    "omm_index_query_seconds",
+    "Time to query the in-memory index for one signal",
+    ["signal_type"],
+)
+LOOKUP_ENRICHMENT_SECONDS = Histogram(
+    "omm_lookup_enrichment_seconds",
+    "Time to load bank content from the database for lookup matches",
+    ["signal_type"],
+)
+LOOKUP_MATCHES = Histogram(
+    "omm_lookup_matches",
+    "Number of index matches per lookup",
+    ["signal_type"],
+    buckets=SIZE_BUCKETS,
+)
+
+# Matcher index cache
+INDEX_SIZE = Gauge(
+    "omm_index_size",
+    "Signals in the index loaded by this process",
+    ["signal_type"],
+)
+INDEX_GENERATION = Gauge(
+    "omm_index_generation",
+    "Timestamp of the newest signal in the index loaded by this process",
+    ["signal_type"],
+)
+INDEX_AGE_SECONDS = Gauge(
+    "omm_index_age_seconds",
+    "Seconds since the newest signal in the index loaded by this process",
+    ["signal_type"],
+)
+INDEX_LAST_CHECK_AGE_SECONDS = Gauge(
+    "omm_index_last_check_age_seconds",
+    "Seconds since this process last checked for a new index",
+    ["signal_type"],
+)
+INDEX_RELOADS = Counter(
+    "omm_index_reloads_total",
+    "Times this process loaded a new index",
+    ["signal_type"],
+)
+INDEX_RELOAD_SECONDS = Histogram(
+    "omm_index_reload_seconds",
+    "Time to load a new index from storage into memory",
+    ["signal_type"],
+)
+
+# Index building
+INDEX_BUILD_SECONDS = Histogram(
+    "omm_index_build_seconds",
+    "Time to build and store an index from bank contents",
+    ["signal_type"],
+)
+INDEX_BUILD_SIGNALS = Gauge(
+    "omm_index_build_signals",
+    "Signals in the last index built",
+    ["signal_type"],
+)
+
+# Fetching
+FETCH_RECORDS = Counter(
+    "omm_fetch_records_total",
+    "Records fetched from an exchange",
+    ["collab"],
+)
+FETCH_SECONDS = Histogram(
+    "omm_fetch_seconds",
+    "Time for one fetch of a collab, including commits",
+    ["collab"],
+)
+FETCH_COMMIT_SECONDS = Histogram(
+    "omm_fetch_commit_seconds",
+    "Time to commit one batch of fetched records to the database",
+    ["collab"],
+)
+FETCH_COMMIT_BATCH_SIZE = Histogram(
+    "omm_fetch_commit_batch_size",
+    "Records in one commit of fetched records",
+    ["collab"],
+    buckets=SIZE_BUCKETS,
+)
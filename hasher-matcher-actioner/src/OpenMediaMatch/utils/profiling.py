@@ -0,0 +1,233 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+An opt-in sampling profiler for background tasks.
+
+With PROFILE_BACKGROUND_TASKS = True, every run of a background task
+(fetching, index building, index cache refreshes) is profiled. A sampler
+thread looks at the task thread's stack every PROFILE_INTERVAL_SEC, so
+the overhead is low enough to leave on while investigating a slow build,
+and the task itself runs unmodified.
+
+The last PROFILE_KEEP_RUNS profiles of each task are kept in memory, and
+are served by the process running the tasks at /c/background_tasks/profiles.
+`flask fetch --profile` and `flask build_indices --profile` profile a
+single run from the CLI.
+"""
+
+from collections import Counter, deque
+from dataclasses import dataclass, field
+import os
+import sys
+import threading
+import time
+import traceback
+import typing as t
+
+from flask import Flask
+
+DEFAULT_INTERVAL_SEC = 0.01
+DEFAULT_TOP_N = 25
+DEFAULT_KEEP_RUNS = 10
+
+# (filename, first line, function name)
+TFunctionKey = t.Tuple[str, int, str]
+
+
+@dataclass
+class HotFunction:
+    function: str
+    # Samples where this function was the innermost Python frame,
+    # which includes time in C calls it made (i.e. sleep(), socket reads)
+    self_samples: int
+    # Samples where this function was anywhere on the stack
+    total_samples: int
+
+
+@dataclass
+class TaskProfile:
+    task: str
+    started_at: float
+    wall_sec: float
+    # Time the task's thread spent on CPU; the rest of wall time is
+    # waiting on I/O (the database, exchange APIs) or the GIL
+    cpu_sec: float
+    samples: int
+    interval_sec: float
+    hot_functions: t.List[HotFunction] = field(default_factory=list)
+    error: t.Optional[str] = None
+
+    def pretty_str(self) -> str:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at))
+        lines = [
+            f"{self.task} @ {started}: {self.wall_sec:.2f}s wall, "
+            f"{self.cpu_sec:.2f}s cpu, {self.samples} samples",
+        ]
+        if self.error:
+            lines.append(f"  failed: {self.error}")
+        if self.hot_functions:
+            lines.append(f"  {'self%':>6} {'total%':>6}  function")
+        for f in self.hot_functions:
+            lines.append(
+                f"  {_pct(f.self_samples, self.samples):>6} "
+                f"{_pct(f.total_samples, self.samples):>6}  {f.function}"
+            )
+        return "\n".join(lines)
+
+
+def _pct(n: int, total: int) -> str:
+    return f"{100 * n / total:.1f}" if total else "-"
+
+
+class SamplingProfiler:
+    """Samples the stack of one thread from a background thread"""
+
+    def __init__(
+        self,
+        thread_id: int,
+        interval_sec: float = DEFAULT_INTERVAL_SEC,
+        stop_at: t.Any = None,
+    ) -> None:
+        """
+        Args:
+            stop_at: a frame on the thread's stack; it and its callers
+                (the same in every sample) aren't counted
+        """
+        self.thread_id = thread_id
+        self.interval_sec = interval_sec
+        self._stop_at = stop_at
+        self.samples = 0
+        self.self_counts: t.Counter[TFunctionKey] = Counter()
+        self.total_counts: t.Counter[TFunctionKey] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"SamplingProfiler[{thread_id}]", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or frame is self._stop_at:
+                continue
+            self.samples += 1
+            self.self_counts[_function_key(frame)] += 1
+            # Recursive functions only count once per sample
+            on_stack = set()
+            while frame is not None and frame is not self._stop_at:
+                on_stack.add(_function_key(frame))
+                frame = frame.f_back
+            self.total_counts.update(on_stack)
+
+    def hot_functions(self, top_n: int) -> t.List[HotFunction]:
+        """
+        The top_n functions by self samples, and the top_n by total samples
+
+        The latter find slow callers whose time is spent in many small
+        callees, which no single callee would show. Most self samples first.
+        """
+        keys = {key for key, _ in self.self_counts.most_common(top_n)}
+        keys.update(key for key, _ in self.total_counts.most_common(top_n))
+        hot = [
+            HotFunction(
+                _function_name(key), self.self_counts[key], self.total_counts[key]
+            )
+            for key in keys
+        ]
+        hot.sort(key=lambda f: (-f.self_samples, -f.total_samples))
+        return hot
+
+
+def _function_key(frame: t.Any) -> TFunctionKey:
+    code = frame.f_code
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def _function_name(key: TFunctionKey) -> str:
+    filename, line, name = key
+    # Trim to the path inside site-packages or the source tree
+    for path in sorted(sys.path, key=len, reverse=True):
+        if path and filename.startswith(path + os.sep):
+            filename = filename[len(path) + 1 :]
+            break
+    return f"{filename}:{line}({name})"
+
+
+def profile_call(
+    task: str,
+    fn: t.Callable[[], None],
+    interval_sec: float = DEFAULT_INTERVAL_SEC,
+    top_n: int = DEFAULT_TOP_N,
+    keep_runs: int = DEFAULT_KEEP_RUNS,
+) -> TaskProfile:
+    """
+    Run fn() in this thread while sampling it, and keep the profile.
+
+    Exceptions from fn() are recorded in the profile, then re-raised.
+    """
+    profiler = SamplingProfiler(
+        threading.get_ident(), interval_sec, stop_at=sys._getframe()
+    )
+    profile = TaskProfile(task, time.time(), 0, 0, 0, interval_sec)
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    profiler.start()
+    try:
+        fn()
+    except Exception:
+        profile.error = traceback.format_exc(limit=1).strip().splitlines()[-1]
+        raise
+    finally:
+        profiler.stop()
+        profile.wall_sec = time.perf_counter() - wall_start
+        profile.cpu_sec = time.thread_time() - cpu_start
+        profile.samples = profiler.samples
+        profile.hot_functions = profiler.hot_functions(top_n)
+        _record(profile, keep_runs)
+    return profile
+
+
+_lock = threading.Lock()
+_recent: t.Dict[str, t.Deque[TaskProfile]] = {}
+
+
+def _record(profile: TaskProfile, keep_runs: int) -> None:
+    with _lock:
+        runs = _recent.get(profile.task)
+        if runs is None or runs.maxlen != keep_runs:
+            runs = _recent[profile.task] = deque(runs or (), maxlen=keep_runs)
+        runs.append(profile)
+
+
+def get_recent_profiles(task: t.Optional[str] = None) -> t.List[TaskProfile]:
+    """Recent profiles from this process, newest first"""
+    with _lock:
+        if task is not None:
+            profiles = list(_recent.get(task, ()))
+        else:
+            profiles = [p for q in _recent.values() for p in q]
+    return sorted(profiles, key=lambda p: p.started_at, reverse=True)
+
+
+def is_enabled(app: Flask) -> bool:
+    return bool(app.config.get("PROFILE_BACKGROUND_TASKS", False))
+
+
+def wrap_task(app: Flask, task: str, fn: t.Callable[[], None]) -> t.Callable[[], None]:
+    """Profile every run of a background task, if enabled in the config"""
+    if not is_enabled(app):
+        return fn
+    interval_sec = float(app.config.get("PROFILE_INTERVAL_SEC", DEFAULT_INTERVAL_SEC))
+    top_n = int(app.config.get("PROFILE_TOP_N", DEFAULT_TOP_N))
+    keep_runs = int(app.config.get("PROFILE_KEEP_RUNS", DEFAULT_KEEP_RUNS))
+
+    def profiled() -> None:
+        profile_call(task, fn, interval_sec, top_n, keep_runs)
+
+    return profiled
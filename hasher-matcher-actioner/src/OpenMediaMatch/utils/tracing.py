@@ -0,0 +1,270 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+Lightweight tracing, for seeing where time goes inside a request.
+
+Usage:
+    with tracing.span("index.query", signal_type="pdq") as span:
+        results = index.query(signal)
+        if span is not None:
+            span.set_attribute("matches", len(results))
+
+Whether a trace is recorded is decided once, when its root span starts
+(TRACING_SAMPLE_RATE, off by default), so an unsampled request only pays
+for a random() call and a few contextvar lookups. Finished traces are
+handed as a whole to a SpanExporter, configured with
+TRACING_EXPORTER_INSTANCE (by default they are logged). Trace and span ids
+use the same format as OpenTelemetry, and OpenTelemetrySpanExporter
+re-emits traces through the OpenTelemetry API for any deployment that
+already has an OTel pipeline.
+"""
+
+import abc
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import logging
+import random
+import threading
+import time
+import typing as t
+
+from flask import Blueprint, Flask, Response, current_app, g, has_app_context, request
+
+logger = logging.getLogger(__name__)
+
+TAttributeValue = t.Union[str, int, float, bool]
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str  # 32 hex chars
+    span_id: str  # 16 hex chars
+    parent_id: t.Optional[str]
+    start_time_ns: int
+    end_time_ns: int = 0
+    attributes: t.Dict[str, TAttributeValue] = field(default_factory=dict)
+    # All spans for the trace, exported when the root span ends
+    _trace: t.List["Span"] = field(default_factory=list, repr=False, compare=False)
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent_id is None
+
+    @property
+    def duration_sec(self) -> float:
+        return (self.end_time_ns - self.start_time_ns) / 1e9
+
+    def set_attribute(self, key: str, value: TAttributeValue) -> None:
+        self.attributes[key] = value
+
+
+class SpanExporter(metaclass=abc.ABCMeta):
+    """Receives the spans of each finished, sampled trace"""
+
+    @abc.abstractmethod
+    def export(self, spans: t.Sequence[Span]) -> None:
+        raise NotImplementedError
+
+
+class NoopSpanExporter(SpanExporter):
+    """Drops every trace"""
+
+    def export(self, spans: t.Sequence[Span]) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps every span, i.e. for tests"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.spans: t.List[Span] = []
+
+    def export(self, spans: t.Sequence[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class LoggingSpanExporter(SpanExporter):
+    """Logs one line per trace, with the duration of each span"""
+
+    def export(self, spans: t.Sequence[Span]) -> None:
+        root = next(s for s in spans if s.is_root)
+        logger.info(
+            "Trace[%s] %s %.1fms: %s",
+            root.trace_id,
+            root.name,
+            root.duration_sec * 1000,
+            ", ".join(
+                f"{s.name} {s.duration_sec * 1000:.1f}ms"
+                for s in sorted(spans, key=lambda s: s.start_time_ns)
+                if not s.is_root
+            ),
+        )
+
+
+class OpenTelemetrySpanExporter(SpanExporter):
+    """
+    Re-emits traces through the OpenTelemetry API.
+
+    Requires opentelemetry-api, and a configured OpenTelemetry SDK
+    to actually send them anywhere.
+    """
+
+    def __init__(self, instrumentation_name: str = "OpenMediaMatch") -> None:
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(instrumentation_name)
+
+    def export(self, spans: t.Sequence[Span]) -> None:
+        otel_spans: t.Dict[str, t.Any] = {}
+        # Parents always start before their children
+        for span in sorted(spans, key=lambda s: s.start_time_ns):
+            parent = otel_spans.get(span.parent_id or "")
+            otel_spans[span.span_id] = self._tracer.start_span(
+                span.name,
+                context=(
+                    None if parent is None else self._trace.set_span_in_context(parent)
+                ),
+                attributes=span.attributes,
+                start_time=span.start_time_ns,
+            )
+        for span in spans:
+            otel_spans[span.span_id].end(end_time=span.end_time_ns)
+
+
+class _NotSampled:
+    pass
+
+
+_NOT_SAMPLED = _NotSampled()
+_current_span: ContextVar[t.Union[Span, _NotSampled, None]] = ContextVar(
+    "omm_current_span", default=None
+)
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter, sample_rate: float = 0.0) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @contextmanager
+    def span(
+        self, name: str, **attributes: TAttributeValue
+    ) -> t.Iterator[t.Optional[Span]]:
+        """
+        Time the with block as a span, a child of any span already open.
+
+        Yields None if the trace is not being sampled.
+        """
+        parent = _current_span.get()
+        if parent is _NOT_SAMPLED:
+            yield None
+            return
+        if parent is None and random.random() >= self.sample_rate:
+            _current_span.set(_NOT_SAMPLED)
+            try:
+                yield None
+            finally:
+                _current_span.set(None)
+            return
+
+        if isinstance(parent, Span):
+            span = Span(
+                name,
+                parent.trace_id,
+                _random_id(64),
+                parent.span_id,
+                time.time_ns(),
+                _trace=parent._trace,
+            )
+        else:
+            span = Span(name, _random_id(128), _random_id(64), None, time.time_ns())
+        span.attributes.update(attributes)
+        _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_attribute("error", repr(e))
+            raise
+        finally:
+            span.end_time_ns = time.time_ns()
+            span._trace.append(span)
+            _current_span.set(parent)
+            if span.is_root:
+                self._export(span._trace)
+
+    def _export(self, spans: t.Sequence[Span]) -> None:
+        try:
+            self.exporter.export(spans)
+        except Exception:
+            # Tracing should never break the request it's tracing
+            logger.exception("Failed to export trace")
+
+
+def _random_id(bits: int) -> str:
+    return format(random.getrandbits(bits) or 1, f"0{bits // 4}x")
+
+
+_DISABLED = Tracer(NoopSpanExporter(), 0.0)
+
+
+def init_app(app: Flask) -> None:
+    exporter = app.config.get("TRACING_EXPORTER_INSTANCE")
+    if exporter is None:
+        exporter = LoggingSpanExporter()
+    assert isinstance(
+        exporter, SpanExporter
+    ), "TRACING_EXPORTER_INSTANCE is not an instance of SpanExporter"
+    app.extensions["omm_tracer"] = Tracer(
+        exporter, float(app.config.get("TRACING_SAMPLE_RATE", 0.0))
+    )
+
+
+def get_tracer() -> Tracer:
+    """The tracer for the current flask app, or a no-op one outside of it"""
+    if not has_app_context():
+        return _DISABLED
+    return t.cast(Tracer, current_app.extensions.get("omm_tracer", _DISABLED))
+
+
+def span(
+    name: str, **attributes: TAttributeValue
+) -> t.ContextManager[t.Optional[Span]]:
+    """@see Tracer.span"""
+    return get_tracer().span(name, **attributes)
+
+
+def current_span() -> t.Optional[Span]:
+    span = _current_span.get()
+    return span if isinstance(span, Span) else None
+
+
+def trace_requests(bp: Blueprint) -> None:
+    """Make each request to the blueprint's endpoints the root of a trace"""
+
+    @bp.before_request
+    def _start_trace() -> None:
+        rule = request.url_rule.rule if request.url_rule else request.path
+        g.omm_trace = ExitStack()
+        g.omm_trace.enter_context(span(f"{request.method} {rule}"))
+
+    @bp.after_request
+    def _record_status(response: Response) -> Response:
+        root = current_span()
+        if root is not None:
+            root.set_attribute("http.status_code", response.status_code)
+        return response
+
+    @bp.teardown_request
+    def _end_trace(_exc: t.Optional[BaseException]) -> None:
+        trace = g.pop("omm_trace", None)
+        if trace is not None:
+            trace.close()
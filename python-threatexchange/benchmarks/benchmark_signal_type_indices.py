@@ -0,0 +1,434 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+Benchmark every SignalTypeIndex for the signal types that can generate random signals
+
+For each signal type (see CanGenerateRandomSignal), index class, dataset
+size and threshold, measures:
+  * build time, and memory retained by the built index
+  * serialized size, serialize and load (deserialize from a file) time
+  * single query latency percentiles and QPS
+  * batch query QPS, for indices with query_many()
+
+Half of the queries are signals from the dataset (and so should match), and
+half are new random signals (which almost never do). For signal types that
+match text rather than other signals (i.e. trend_query), queries are text
+that matches the signal instead (see QUERY_FOR_SIGNAL).
+
+Results are printed as a table, and with --output, written as JSON that
+--compare can diff against a later run to find regressions.
+"""
+
+import argparse
+import functools
+import gc
+import importlib
+import inspect
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing as t
+
+from threatexchange.cli.main import _DEFAULT_SIGNAL_TYPES
+from threatexchange.extensions.manifest import ThreatExchangeExtensionManifest
+from threatexchange.signal_type.index import SignalTypeIndex
+from threatexchange.signal_type.signal_base import CanGenerateRandomSignal, SignalType
+
+FORMAT_VERSION = 1
+# Index classes benchmarked as well as get_index_cls(), by signal type name
+EXTRA_INDEX_CLASSES = {
+    "pdq": ["threatexchange.signal_type.pdq.pdq_index2.PDQIndex2"],
+}
+
+# Metrics --compare checks, and whether bigger is better
+COMPARED_METRICS = {
+    "build_s": False,
+    "memory_bytes": False,
+    "serialized_bytes": False,
+    "load_s": False,
+    "query_p50_us": False,
+    "query_p99_us": False,
+    "query_qps": True,
+    "batch_query_qps": True,
+}
+
+
+def trend_query_text(signal: str) -> str:
+    """Text that matches a trend query: a term from each "and" clause"""
+    query = json.loads(signal)
+    return " ".join(random.choice(and_["or"]) for and_ in query["and"])
+
+
+# Query that matches a signal, for signal types where that isn't the signal
+# itself, by signal type name
+QUERY_FOR_SIGNAL: t.Dict[str, t.Callable[[str], str]] = {
+    "trend_query": trend_query_text,
+}
+
+
+def import_class(dotted_name: str) -> t.Type[t.Any]:
+    module_name, _, class_name = dotted_name.rpartition(".")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def get_signal_types(extensions: t.List[str]) -> t.Dict[str, t.Type[SignalType]]:
+    signal_types = list(_DEFAULT_SIGNAL_TYPES)
+    for extension in extensions:
+        try:
+            manifest = ThreatExchangeExtensionManifest.load_from_module_name(extension)
+        except ValueError as e:
+            print(f"Skipping extension {extension}: {e}", file=sys.stderr)
+            continue
+        signal_types.extend(manifest.signal_types)
+    return {
+        st.get_name(): st
+        for st in signal_types
+        if issubclass(st, CanGenerateRandomSignal)
+    }
+
+
+def threshold_param(index_cls: t.Type[SignalTypeIndex]) -> t.Optional[str]:
+    """The __init__ argument for the match threshold, if the index has one"""
+    for name in inspect.signature(index_cls.__init__).parameters:
+        if name == "threshold" or name.endswith("_threshold"):
+            return name
+    return None
+
+
+def rss_bytes() -> t.Optional[int]:
+    """Current resident set size, which includes native (i.e. faiss) memory"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def percentile(sorted_values: t.List[float], pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+def benchmark_index(
+    index_cls: t.Type[SignalTypeIndex],
+    make_index: t.Callable[[], SignalTypeIndex],
+    entries: t.List[t.Tuple[str, int]],
+    queries: t.List[str],
+    hit_ids: t.List[int],
+    batch_size: int,
+    trace_memory: bool,
+) -> t.Dict[str, t.Any]:
+    ret: t.Dict[str, t.Any] = {}
+
+    # Build once just for memory, since tracing slows down allocations
+    gc.collect()
+    rss_before = rss_bytes()
+    if trace_memory:
+        tracemalloc.start()
+    index = make_index()
+    index.add_all(entries)
+    ret["memory_traced_bytes"] = None
+    if trace_memory:
+        ret["memory_traced_bytes"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    rss_after = rss_bytes()
+    ret["rss_delta_bytes"] = (
+        rss_after - rss_before
+        if rss_before is not None and rss_after is not None
+        else None
+    )
+    # tracemalloc doesn't see native allocations (i.e. faiss), while RSS
+    # does, but is noisy, so take whichever saw more
+    ret["memory_bytes"] = max(
+        ret["memory_traced_bytes"] or 0, ret["rss_delta_bytes"] or 0
+    )
+    del index
+    gc.collect()
+
+    start = time.perf_counter()
+    index = make_index()
+    index.add_all(entries)
+    ret["build_s"] = time.perf_counter() - start
+
+    buf = io.BytesIO()
+    start = time.perf_counter()
+    index.serialize(buf)
+    ret["serialize_s"] = time.perf_counter() - start
+    ret["serialized_bytes"] = buf.tell()
+
+    with tempfile.NamedTemporaryFile() as f:
+        f.write(buf.getbuffer())
+        f.flush()
+        del buf
+        f.seek(0)
+        start = time.perf_counter()
+        index_cls.deserialize(t.cast(t.BinaryIO, f))
+        ret["load_s"] = time.perf_counter() - start
+
+    # The first query may do one-off work (i.e. sorting pending adds)
+    start = time.perf_counter()
+    index.query(queries[0])
+    ret["first_query_s"] = time.perf_counter() - start
+
+    latencies = []
+    results = []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(index.query(q))
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    latencies.sort()
+    ret["query_qps"] = len(queries) / max(total, 1e-9)
+    ret["query_mean_us"] = total / len(queries) * 1e6
+    for name, pct in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        ret[f"query_{name}_us"] = percentile(latencies, pct) * 1e6
+    ret["hit_rate"] = sum(
+        any(m.metadata == i for m in matches) for i, matches in zip(hit_ids, results)
+    ) / max(len(hit_ids), 1)
+    ret["miss_match_rate"] = sum(bool(m) for m in results[len(hit_ids) :]) / max(
+        len(queries) - len(hit_ids), 1
+    )
+
+    query_many = getattr(index, "query_many", None)
+    ret["batch_query_qps"] = None
+    if query_many is not None:
+        start = time.perf_counter()
+        for i in range(0, len(queries), batch_size):
+            query_many(queries[i : i + batch_size])
+        ret["batch_query_qps"] = len(queries) / max(time.perf_counter() - start, 1e-9)
+    return ret
+
+
+def run(args: argparse.Namespace) -> t.List[t.Dict[str, t.Any]]:
+    signal_types = get_signal_types(args.extensions)
+    names = args.signal_types or list(signal_types)
+    thresholds: t.Dict[str, t.List[t.Union[int, float]]] = {}
+    for spec in args.thresholds:
+        name, _, values = spec.partition("=")
+        thresholds[name] = [
+            int(v) if float(v).is_integer() else float(v) for v in values.split(",")
+        ]
+
+    results = []
+    for name in names:
+        if name not in signal_types:
+            raise SystemExit(
+                f"Unknown signal type {name}, choose from {', '.join(signal_types)}"
+            )
+        st = signal_types[name]
+        generate = t.cast(t.Type[CanGenerateRandomSignal], st).get_random_signal
+        to_query = QUERY_FOR_SIGNAL.get(name, lambda signal: signal)
+        index_classes: t.List[t.Type[SignalTypeIndex]] = [
+            import_class(c) for c in args.index_classes
+        ] or [st.get_index_cls()] + [
+            import_class(c) for c in EXTRA_INDEX_CLASSES.get(name, [])
+        ]
+
+        for size in args.dataset_sizes:
+            signals = [generate() for _ in range(size)]
+            entries = [(s, i) for i, s in enumerate(signals)]
+            hit_ids = [random.randrange(size) for _ in range(args.num_queries // 2)]
+            queries = [to_query(signals[i]) for i in hit_ids] + [
+                to_query(generate()) for _ in range(args.num_queries - len(hit_ids))
+            ]
+
+            for index_cls in index_classes:
+                param = threshold_param(index_cls)
+                if param is None and name in thresholds:
+                    print(
+                        f"Warning: {index_cls.__name__} has no threshold, "
+                        f"ignoring --thresholds {name}=...",
+                        file=sys.stderr,
+                    )
+                cls_thresholds: t.List[t.Union[None, int, float]] = [None]
+                if param is not None and name in thresholds:
+                    cls_thresholds = list(thresholds[name])
+                for threshold in cls_thresholds:
+                    kwargs: t.Dict[str, t.Any] = {}
+                    if param is not None and threshold is not None:
+                        kwargs[param] = threshold
+                    make_index = functools.partial(index_cls, **kwargs)
+
+                    result = {
+                        "signal_type": name,
+                        "index_cls": f"{index_cls.__module__}.{index_cls.__qualname__}",
+                        "dataset_size": size,
+                        "threshold": threshold,
+                        "num_queries": len(queries),
+                    }
+                    result.update(
+                        benchmark_index(
+                            index_cls,
+                            make_index,
+                            entries,
+                            queries,
+                            hit_ids,
+                            args.batch_size,
+                            args.trace_memory,
+                        )
+                    )
+                    print_result(result)
+                    results.append(result)
+    return results
+
+
+def result_key(result: t.Dict[str, t.Any]) -> t.Tuple[t.Any, ...]:
+    return (
+        result["signal_type"],
+        result["index_cls"],
+        result["dataset_size"],
+        result["threshold"],
+    )
+
+
+def print_result(result: t.Dict[str, t.Any]) -> None:
+    batch_qps = result["batch_query_qps"]
+    print(
+        f"{result['signal_type']:>10} {result['index_cls'].rpartition('.')[2]:<24}"
+        f" n={result['dataset_size']:<8,d} threshold={result['threshold']}\n"
+        f"\tbuild: {result['build_s']:.3f}s"
+        f" memory: {result['memory_bytes'] // 1024:,d}KB"
+        f" serialized: {result['serialized_bytes'] // 1024:,d}KB"
+        f" load: {result['load_s']:.3f}s\n"
+        f"\tquery p50: {result['query_p50_us']:.1f}us"
+        f" p99: {result['query_p99_us']:.1f}us"
+        f" qps: {result['query_qps']:,.0f}"
+        f" batch qps: {'n/a' if batch_qps is None else f'{batch_qps:,.0f}'}"
+        f" hit rate: {result['hit_rate']:.0%}"
+    )
+
+
+def compare(
+    baseline: t.Dict[str, t.Any],
+    results: t.List[t.Dict[str, t.Any]],
+    tolerance: float,
+) -> int:
+    """Print every metric that got worse by more than tolerance, return how many"""
+    baseline_by_key = {result_key(r): r for r in baseline["results"]}
+    regressions = 0
+    for result in results:
+        old = baseline_by_key.get(result_key(result))
+        if old is None:
+            continue
+        for metric, bigger_is_better in COMPARED_METRICS.items():
+            before, after = old.get(metric), result.get(metric)
+            if not before or not after:
+                continue
+            ratio = before / after if bigger_is_better else after / before
+            if ratio > 1 + tolerance:
+                regressions += 1
+                print(
+                    f"REGRESSION {' '.join(str(k) for k in result_key(result))}"
+                    f" {metric}: {before:.6g} -> {after:.6g} ({ratio:.2f}x worse)"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--signal-types",
+        nargs="+",
+        metavar="NAME",
+        help="signal types to benchmark (default: all that can generate random signals)",
+    )
+    parser.add_argument(
+        "--extensions",
+        nargs="*",
+        default=["threatexchange.extensions.tlsh"],
+        help="extension modules to also load signal types from",
+    )
+    parser.add_argument(
+        "--index-classes",
+        nargs="+",
+        default=[],
+        metavar="MODULE.CLASS",
+        help="index classes to benchmark instead of each signal type's defaults",
+    )
+    parser.add_argument(
+        "--dataset-sizes",
+        type=int,
+        nargs="+",
+        default=[10000, 100000],
+        help="number of signals to index",
+    )
+    parser.add_argument(
+        "--num-queries",
+        type=int,
+        default=1000,
+        help="number of queries, half from the dataset and half new",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="queries per call for indices with query_many()",
+    )
+    parser.add_argument(
+        "--thresholds",
+        nargs="+",
+        default=[],
+        metavar="NAME=T1,T2",
+        help=(
+            "thresholds to benchmark for a signal type, i.e. pdq=0,31,63 "
+            "(default: each index's own default)"
+        ),
+    )
+    parser.add_argument(
+        "--no-trace-memory",
+        dest="trace_memory",
+        action="store_false",
+        help="only measure memory by RSS, which is faster but noisier",
+    )
+    parser.add_argument("--seed", type=int, help="seed for random number generator")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="JSON from an earlier --output run, to report regressions against",
+    )
+    parser.add_argument(
+        "--regression-tolerance",
+        type=float,
+        default=0.2,
+        help="how much worse a metric can get before --compare reports it",
+    )
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else time.time_ns()
+    random.seed(seed)
+    if args.seed is None:
+        print(f"using random seed of {seed}, use --seed {seed} to rerun")
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "format_version": FORMAT_VERSION,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "seed": seed,
+                    "args": vars(args),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, results, args.regression_tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import argparse
+import pickle
+import random
+import string
+import time
+
+from threatexchange.extensions.tlsh.text_tlsh import TextTLSHSignal
+from threatexchange.extensions.tlsh.tlsh_index import TLSHIndex
+from threatexchange.signal_type.signal_base import TrivialLinearSearchHashIndex
+
+parser = argparse.ArgumentParser(
+    description="Run basic benchmarks comparing TLSHIndex to a linear scan with tlsh.diffxlen",
+    formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+)
+
+parser.add_argument(
+    "--dataset-size",
+    type=int,
+    default=20000,
+    help="number of texts to hash for the dataset to search against",
+)
+parser.add_argument(
+    "--num-queries",
+    type=int,
+    default=100,
+    help="number of queries to generate, each a lightly edited dataset text",
+)
+parser.add_argument(
+    "--edits",
+    type=int,
+    default=3,
+    help="number of characters to change in each query text",
+)
+parser.add_argument("--seed", type=int, help="seed for random number generator")
+
+args = parser.parse_args()
+
+######
+# Print Benchmark Settings
+######
+
+print("Benchmark: TLSH Index vs Linear Scan")
+print("")
+print("Options:")
+for arg in vars(args):
+    print("\t", arg, ": ", getattr(args, arg))
+print("")
+
+######
+# Set up environment and helpers
+######
+
+seed = args.seed if args.seed else time.time_ns()
+rng = random.Random(seed)
+if args.seed is None:
+    print("using random seed of ", seed)
+    print("use --seed ", seed, " to rerun with same random values")
+    print("")
+
+
+class TLSHLinearSearch(TrivialLinearSearchHashIndex):
+    _SIGNAL_TYPE = TextTLSHSignal
+
+
+def generate_random_text():
+    """returns ~100 random words, enough for TLSH to produce a hash"""
+    return " ".join(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 8)))
+        for _ in range(100)
+    )
+
+
+def edit_text(text, edits):
+    chars = list(text)
+    for _ in range(edits):
+        chars[rng.randrange(len(chars))] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+######
+# Generate Random Dataset and Build Indexes
+######
+
+texts = [generate_random_text() for _ in range(args.dataset_size)]
+entries = [(TextTLSHSignal.hash_from_str(text), i) for i, text in enumerate(texts)]
+target_ids = [rng.randrange(len(texts)) for _ in range(args.num_queries)]
+queries = [
+    TextTLSHSignal.hash_from_str(edit_text(texts[i], args.edits)) for i in target_ids
+]
+
+print("Building Stats:")
+for index_cls in (TLSHIndex, TLSHLinearSearch):
+    start = time.time()
+    index = index_cls.build(entries)
+    serialized = pickle.dumps(index)
+    end = time.time()
+    print(f"\t{index_cls.__name__}: time to build (s): ", end - start)
+    print(f"\t{index_cls.__name__}: approximate size: {len(serialized) // 1024:,d}KB")
+print("")
+
+######
+# Run benchmarks
+######
+
+results = {}
+for index_cls in (TLSHIndex, TLSHLinearSearch):
+    index = index_cls.build(entries)
+    start = time.time()
+    results[index_cls] = [
+        sorted((m.metadata, m.similarity_info.distance) for m in index.query(q))
+        for q in queries
+    ]
+    end = time.time()
+    print(f"\t{index_cls.__name__} - Total Time to search  (s): ", end - start)
+    print(
+        f"\t{index_cls.__name__} - Queries per second: ",
+        args.num_queries / max(end - start, 1e-9),
+    )
+
+found = sum(
+    any(i == target for i, _ in result)
+    for target, result in zip(target_ids, results[TLSHIndex])
+)
+# TLSH is sensitive to edits, so not every edited text is still a match
+print(
+    "\tTLSHIndex - Percent of queries matching their target: ",
+    found * 100 / args.num_queries,
+)
+print(
+    "\tTLSHIndex - Same results as linear scan: ",
+    results[TLSHIndex] == results[TLSHLinearSearch],
+)
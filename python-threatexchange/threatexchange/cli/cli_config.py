@@ -29,7 +29,7 @@ from threatexchange.exchanges import fetch_state
 from threatexchange.exchanges.impl.static_sample import StaticSampleSignalExchangeAPI
 from threatexchange.signal_type import signal_base
 from threatexchange.interface_validation import FunctionalityMapping
-from threatexchange.cli.cli_state import CliSimpleState, CliIndexStore
+from threatexchange.cli.cli_state import CliSimpleState, CliIndexStore, CliHashCache
 from threatexchange.utils import dataclass_json
 
 
@@ -94,6 +94,10 @@ class CliState(collab_config.CollaborationConfigStoreBase):
     def config_file(self) -> pathlib.Path:
         return self._dir / "config.json"
 
+    @property
+    def hash_cache_file(self) -> pathlib.Path:
+        return self._dir / "hash_cache.sqlite"
+
     def path_for_collab_config(
         self, config: collab_config.CollaborationConfigBase
     ) -> pathlib.Path:
@@ -221,6 +225,7 @@ class CLISettings:
         self._sample_message_printed = False
         self._config: t.Optional[CLiConfig] = None
         self.index = CliIndexStore(cli_state.index_dir)
+        self.hash_cache = CliHashCache(cli_state.hash_cache_file)
         self.fetched_state = _FetchStoreAccessor(self)
         self.apis = _SignalExchangeAccessor(self)
 
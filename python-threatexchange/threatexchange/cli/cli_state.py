@@ -8,10 +8,12 @@ There are a few categories of state that this wraps:
   1. Checkpoints - state about previous fetches
   2. Collaboration Indicator Dumps - Raw output from threat_updates
   3. Index state - serializations of indexes for SignalType
+  4. Hash cache - results of previous `threatexchange hash` runs
 """
 
 import pickle
 import pathlib
+import sqlite3
 import typing as t
 import logging
 
@@ -90,6 +92,95 @@ class CliIndexStore:
             return signal_type.get_index_cls().deserialize(fin)
 
 
+class CliHashCache:
+    """
+    Remembers the output of FileHasher.hash_from_file() between runs.
+
+    Entries are keyed by (path, size, mtime, signal type), so if a file is
+    changed on disk, it will be hashed again. Stored in sqlite so that very
+    large runs don't need to fit in memory, and progress is kept if
+    interrupted.
+    """
+
+    # How many writes to batch before committing
+    COMMIT_EVERY = 1000
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self._conn: t.Optional[sqlite3.Connection] = None
+        self._uncommitted = 0
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.path))
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS hashes ("
+                "path TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "mtime_ns INTEGER NOT NULL, "
+                "signal_type TEXT NOT NULL, "
+                "hash TEXT NOT NULL, "
+                "PRIMARY KEY (path, signal_type))"
+            )
+        return self._conn
+
+    @staticmethod
+    def _key(
+        file: pathlib.Path, signal_type: t.Type[SignalType]
+    ) -> t.Tuple[str, int, int, str]:
+        stat = file.stat()
+        return (
+            str(file.resolve()),
+            stat.st_size,
+            stat.st_mtime_ns,
+            signal_type.get_name(),
+        )
+
+    def get(
+        self, file: pathlib.Path, signal_type: t.Type[SignalType]
+    ) -> t.Optional[str]:
+        """The previously stored hash, or None if missing or the file changed"""
+        path, size, mtime_ns, name = self._key(file, signal_type)
+        row = self._db.execute(
+            "SELECT hash FROM hashes "
+            "WHERE path = ? AND signal_type = ? AND size = ? AND mtime_ns = ?",
+            (path, name, size, mtime_ns),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def put(
+        self, file: pathlib.Path, signal_type: t.Type[SignalType], hash_str: str
+    ) -> None:
+        path, size, mtime_ns, name = self._key(file, signal_type)
+        self._db.execute(
+            "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?)",
+            (path, size, mtime_ns, name, hash_str),
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= self.COMMIT_EVERY:
+            self.commit()
+
+    def commit(self) -> None:
+        if self._conn is not None:
+            self._conn.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        """Commit any outstanding writes and release the file"""
+        if self._conn is not None:
+            self.commit()
+            self._conn.close()
+            self._conn = None
+
+    def clear(self) -> None:
+        """Remove all cached hashes"""
+        self.close()
+        if self.path.exists():
+            logging.info("Removing hash cache %s", self.path)
+            self.path.unlink()
+
+
 class CliSimpleState(helpers.SimpleFetchedStateStore):
     """
     A simple on-disk storage format for the CLI.
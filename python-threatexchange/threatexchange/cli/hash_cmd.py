@@ -6,6 +6,9 @@ Hash command to convert content into signatures.
 """
 
 import argparse
+from collections import deque
+from concurrent import futures
+import itertools
 import pathlib
 import typing as t
 import tempfile
@@ -21,7 +24,15 @@ from threatexchange.content_type.content_base import RotationType
 
 from threatexchange.signal_type.signal_base import FileHasher, SignalType
 from threatexchange.cli import command_base
-from threatexchange.cli.helpers import FlexFilesInputAction
+from threatexchange.cli.cli_state import CliHashCache
+from threatexchange.cli.helpers import (
+    FlexFilesOrDirsInputAction,
+    iter_expanded_paths,
+    iter_file_list,
+)
+
+# (file, hasher, hash_str)
+_HashResult = t.Tuple[Path, t.Type[SignalType], str]
 
 
 class HashCommand(command_base.Command):
@@ -40,8 +51,21 @@ class HashCommand(command_base.Command):
 
     # Inline
     $ threatexchange hash text -- This is my cool text
+
+    # Whole directories, or glob patterns (quote them to avoid shell limits)
+    $ threatexchange hash photo my_photos/ 'more_photos/**/*.jpg'
+
+    # A file with one path per line (- for stdin)
+    $ find / -name '*.jpg' | threatexchange hash --file-list - photo
     ```
 
+    # Large batches
+    Use --parallel to hash with multiple processes. Output is in input
+    order unless --unordered is also given. --cache remembers hashes between
+    runs (keyed by path, size, mtime, and signal type), so that re-runs only
+    hash new or changed files. --clear-cache forgets them all first. Neither
+    works with --photo-preprocess.
+
     # Output
     <SignalType> <hash string>
     """
@@ -69,8 +93,44 @@ class HashCommand(command_base.Command):
         ap.add_argument(
             "files",
             nargs=argparse.REMAINDER,
-            action=FlexFilesInputAction,
-            help="list of files, URLs, - for stdin, or -- to interpret remainder as a string",
+            action=FlexFilesOrDirsInputAction,
+            help=(
+                "list of files, directories, glob patterns, URLs, - for stdin, "
+                "or -- to interpret remainder as a string"
+            ),
+        )
+
+        ap.add_argument(
+            "--file-list",
+            type=Path,
+            help="read paths to hash from this file, one per line (- for stdin)",
+        )
+
+        ap.add_argument(
+            "--parallel",
+            "-j",
+            type=int,
+            default=1,
+            metavar="N",
+            help="hash using N processes",
+        )
+
+        ap.add_argument(
+            "--unordered",
+            action="store_true",
+            help="with --parallel, print hashes as they finish instead of in input order",
+        )
+
+        ap.add_argument(
+            "--cache",
+            action="store_true",
+            help="skip hashing files that haven't changed since a previous --cache run",
+        )
+
+        ap.add_argument(
+            "--clear-cache",
+            action="store_true",
+            help="forget hashes remembered by previous --cache runs before hashing",
         )
 
         ap.add_argument(
@@ -117,6 +177,11 @@ class HashCommand(command_base.Command):
         photo_preprocess: t.Optional[str] = None,
         black_threshold: int = 0,
         save_preprocess: bool = False,
+        file_list: t.Optional[pathlib.Path] = None,
+        parallel: int = 1,
+        unordered: bool = False,
+        cache: bool = False,
+        clear_cache: bool = False,
     ) -> None:
         self.content_type = content_type
         self.signal_type = signal_type
@@ -124,18 +189,48 @@ class HashCommand(command_base.Command):
         self.black_threshold = black_threshold
         self.save_preprocess = save_preprocess
         self.files = files
+        self.file_list = file_list
+        self.parallel = parallel
+        self.unordered = unordered
+        self.cache = cache
+        self.clear_cache = clear_cache
+        if not self.files and self.file_list is None:
+            raise CommandError("files or --file-list is required", 2)
+        if self.parallel < 1:
+            raise CommandError("--parallel must be at least 1", 2)
         if self.photo_preprocess and not issubclass(self.content_type, PhotoContent):
             raise CommandError(
                 "--photo-preprocess flag is only available for Photo content type", 2
             )
+        if self.photo_preprocess and (self.parallel > 1 or self.cache):
+            raise CommandError(
+                "--parallel and --cache don't work with --photo-preprocess", 2
+            )
+
+    def _iter_files(self) -> t.Iterator[Path]:
+        paths: t.Iterable[Path] = self.files
+        if self.file_list is not None:
+            paths = itertools.chain(paths, iter_file_list(self.file_list))
+        for path in iter_expanded_paths(paths):
+            if not path.is_file():
+                raise CommandError(f"no such file {path}", 2)
+            yield path
+
+    def execute(self, settings: CLISettings) -> None:
+        if self.clear_cache:
+            settings.hash_cache.clear()
+        files = self._iter_files()
         if issubclass(self.content_type, FileContent):
+            # Use the first file to determine content type
+            first = next(files, None)
+            if first is None:
+                return
             try:
-                # Use the first file to determine content type
-                self.content_type = FileContent.map_to_content_type(self.files[0])
+                self.content_type = FileContent.map_to_content_type(first)
             except ValueError as e:
                 raise CommandError(f"{e}", returncode=2)
+            files = itertools.chain([first], files)
 
-    def execute(self, settings: CLISettings) -> None:
         hashers = [
             s
             for s in settings.get_signal_types_for_content(self.content_type)
@@ -151,11 +246,14 @@ class HashCommand(command_base.Command):
             hashers = [self.signal_type]  # type: ignore  # can't detect intersection types
 
         if not self.photo_preprocess:
-            for file in self.files:
-                for hasher in hashers:
-                    hash_str = hasher.hash_from_file(file)
+            cache = settings.hash_cache if self.cache else None
+            try:
+                for _, hasher, hash_str in self._hash_files(files, hashers, cache):
                     if hash_str:
                         print(hasher.get_name(), hash_str)
+            finally:
+                if cache is not None:
+                    cache.close()
             return
 
         def pre_processed_files() -> (
@@ -165,7 +263,7 @@ class HashCommand(command_base.Command):
             Generator that yields preprocessed files and their metadata.
             Each item is a tuple of (file path, processed bytes, rotation name, image format).
             """
-            for file in self.files:
+            for file in files:
                 image_format = file.suffix.lower().lstrip(".")
                 if self.photo_preprocess == "unletterbox":
                     processed_bytes = PhotoContent.unletterbox(
@@ -205,3 +303,69 @@ class HashCommand(command_base.Command):
                     )
                     temp_file_path.rename(output_path)
                     print(f"Processed image saved to: {output_path}")
+
+    def _hash_files(
+        self,
+        files: t.Iterable[Path],
+        hashers: t.Sequence[t.Type[SignalType]],
+        cache: t.Optional[CliHashCache],
+    ) -> t.Iterator[_HashResult]:
+        jobs = ((file, hasher) for file in files for hasher in hashers)
+
+        if self.parallel == 1:
+            for file, hasher in jobs:
+                hash_str = cache.get(file, hasher) if cache else None
+                if hash_str is None:
+                    hash_str = _hash_file(hasher, file)
+                    if cache:
+                        cache.put(file, hasher, hash_str)
+                yield file, hasher, hash_str
+            return
+
+        # Bound how far ahead of the output we get, so that arbitrarily
+        # large inputs (i.e. --file-list) don't all get queued up at once
+        max_pending = self.parallel * 4
+        pending: t.Deque[t.Tuple[Path, t.Type[SignalType], futures.Future, bool]]
+        pending = deque()
+
+        with futures.ProcessPoolExecutor(max_workers=self.parallel) as executor:
+            for file, hasher in jobs:
+                cached = cache.get(file, hasher) if cache else None
+                if cached is None:
+                    future = executor.submit(_hash_file, hasher, file)
+                else:
+                    future = futures.Future()
+                    future.set_result(cached)
+                pending.append((file, hasher, future, cached is None))
+                if len(pending) >= max_pending:
+                    yield from self._drain(pending, cache, max_pending - 1)
+            yield from self._drain(pending, cache, 0)
+
+    def _drain(
+        self,
+        pending: t.Deque[t.Tuple[Path, t.Type[SignalType], futures.Future, bool]],
+        cache: t.Optional[CliHashCache],
+        until_size: int,
+    ) -> t.Iterator[_HashResult]:
+        """Yield finished work until at most until_size jobs are pending"""
+        while len(pending) > until_size:
+            if self.unordered:
+                done, _ = futures.wait(
+                    [f for _, _, f, _ in pending], return_when=futures.FIRST_COMPLETED
+                )
+                finished = [p for p in pending if p[2] in done]
+                for p in finished:
+                    pending.remove(p)
+            else:
+                finished = [pending.popleft()]
+            for file, hasher, future, needs_store in finished:
+                hash_str = future.result()
+                if cache and needs_store:
+                    cache.put(file, hasher, hash_str)
+                yield file, hasher, hash_str
+
+
+def _hash_file(hasher: t.Type[SignalType], file: Path) -> str:
+    """Module level so it can be sent to worker processes"""
+    assert issubclass(hasher, FileHasher)
+    return hasher.hash_from_file(file)
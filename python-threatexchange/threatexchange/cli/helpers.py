@@ -1,8 +1,11 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
 import argparse
+import glob
 import logging
+import os
 import pathlib
+import re
 import sys
 import tempfile
 import shutil
@@ -68,7 +71,83 @@ class FlexFilesInputAction(argparse.Action):
                     tmp.write(resp.content)
                 filename = pathlib.Path(tmp.name)
             path = pathlib.Path(filename)
-            if not path.is_file():
+            if not self._is_valid_path(path):
                 raise argparse.ArgumentError(self, f"no such file {path}")
             ret.append(path)
         setattr(namespace, self.dest, ret)
+
+    def _is_valid_path(self, path: pathlib.Path) -> bool:
+        return path.is_file()
+
+
+class FlexFilesOrDirsInputAction(FlexFilesInputAction):
+    """
+    FlexFilesInputAction, but also accepting directories and glob patterns
+
+    Directories and patterns are stored as-is, use iter_expanded_paths() to
+    turn them into files. Unlike FlexFilesInputAction, an empty list is
+    allowed, so the command should check it has something to work on.
+
+    $ cmd my_photos/
+    $ cmd 'my_photos/**/*.jpg'  # quoted, to avoid shell argument limits
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        if not values:
+            setattr(namespace, self.dest, [])
+            return
+        super().__call__(parser, namespace, values, option_string)
+
+    def _is_valid_path(self, path: pathlib.Path) -> bool:
+        return path.exists() or _is_glob_pattern(str(path))
+
+
+_GLOB_MAGIC = re.compile(r"[*?[]")
+
+
+def _is_glob_pattern(s: str) -> bool:
+    return _GLOB_MAGIC.search(s) is not None
+
+
+def iter_expanded_paths(paths: t.Iterable[pathlib.Path]) -> t.Iterator[pathlib.Path]:
+    """
+    Expand directories (recursively) and glob patterns into files
+
+    Files are yielded lazily in a stable (sorted) order, so this is safe to
+    use on very large directories.
+    """
+    for path in paths:
+        if path.is_dir():
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield pathlib.Path(root) / name
+        elif not path.exists() and _is_glob_pattern(str(path)):
+            for match in sorted(glob.iglob(str(path), recursive=True)):
+                match_path = pathlib.Path(match)
+                if match_path.is_dir():
+                    yield from iter_expanded_paths([match_path])
+                elif match_path.is_file():
+                    yield match_path
+        else:
+            yield path
+
+
+def iter_file_list(file_list: pathlib.Path) -> t.Iterator[pathlib.Path]:
+    """
+    Stream paths from a file containing one path per line (- for stdin)
+
+    Blank lines and lines starting with # are skipped.
+    """
+    if str(file_list) == "-":
+        yield from _iter_file_list_lines(sys.stdin)
+        return
+    with file_list.open() as f:
+        yield from _iter_file_list_lines(f)
+
+
+def _iter_file_list_lines(lines: t.Iterable[str]) -> t.Iterator[pathlib.Path]:
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield pathlib.Path(line)
@@ -33,7 +33,6 @@ from threatexchange.content_type.photo import PhotoContent
 from threatexchange.signal_type.signal_base import MatchesStr, TextHasher, FileHasher
 from threatexchange.cli import command_base
 
-
 TMatcher = t.Callable[[pathlib.Path], t.List[IndexMatch]]
 
 
@@ -303,21 +302,19 @@ def _match_hashes(
     path: pathlib.Path, s_type: t.Type[SignalType], index: SignalTypeIndex
 ) -> t.Sequence[_IndexMatchWithRotation]:
     ret: t.List[_IndexMatchWithRotation] = []
-    for hash in path.read_text().splitlines():
-        hash = hash.strip()
-        if not hash:
-            continue
-        try:
-            hash = s_type.validate_signal_str(hash)
-        except Exception:
-            logging.exception("%s failed verification on %s", s_type.get_name(), hash)
-            hash_repr = repr(hash)
-            if len(hash_repr) > 50:
-                hash_repr = hash_repr[:47] + "..."
-            raise CommandError(
-                f"{hash_repr} from {path} is not a valid hash for {s_type.get_name()}",
-                2,
-            )
+    hashes = [h.strip() for h in path.read_text().splitlines()]
+    validated = s_type.validate_signals(h for h in hashes if h)
+    if validated.invalid.any():
+        hash = validated.signals[int(validated.invalid.argmax())]
+        logging.error("%s failed verification on %s", s_type.get_name(), hash)
+        hash_repr = repr(hash)
+        if len(hash_repr) > 50:
+            hash_repr = hash_repr[:47] + "..."
+        raise CommandError(
+            f"{hash_repr} from {path} is not a valid hash for {s_type.get_name()}",
+            2,
+        )
+    for hash in validated.signals:
         matches = index.query(hash)
         ret.extend([_IndexMatchWithRotation(match=match) for match in matches])
     return ret
@@ -275,3 +275,116 @@ def test_file_content(hash_cli: ThreatExchangeCLIE2eHelper):
             ("file", tmp_unsupported_file.name),
             msg_regex="Unsupported file type: .txt",
         )
+
+
+def test_directory_and_glob(
+    hash_cli: ThreatExchangeCLIE2eHelper, tmp_path: pathlib.Path
+):
+    # tmp_path is also the CLI state directory
+    tmp_path = tmp_path / "in"
+    (tmp_path / "sub").mkdir(parents=True)
+    (tmp_path / "a.txt").write_text("http://evil.com")
+    (tmp_path / "sub" / "b.txt").write_text("fb.com")
+    (tmp_path / "c.dat").write_text("")
+
+    hash_cli.assert_cli_output(
+        ("url", str(tmp_path)),
+        [
+            "url_md5 6d3af727a4e7b025fd59a5469b3a9c57",
+            "url_md5 d41d8cd98f00b204e9800998ecf8427e",
+            "url_md5 fb8191ebebc85f9eb6fd21e198f20979",
+        ],
+    )
+    hash_cli.assert_cli_output(
+        ("url", str(tmp_path / "**" / "*.txt")),
+        [
+            "url_md5 6d3af727a4e7b025fd59a5469b3a9c57",
+            "url_md5 fb8191ebebc85f9eb6fd21e198f20979",
+        ],
+    )
+
+
+def test_file_list(hash_cli: ThreatExchangeCLIE2eHelper, tmp_path: pathlib.Path):
+    a = tmp_path / "a"
+    b = tmp_path / "b"
+    a.write_text("http://evil.com")
+    b.write_text("fb.com")
+    file_list = tmp_path / "files.txt"
+    file_list.write_text(f"{b}\n\n# comment\n{a}\n")
+
+    hash_cli.assert_cli_output(
+        ("--file-list", str(file_list), "url"),
+        [
+            "url_md5 fb8191ebebc85f9eb6fd21e198f20979",
+            "url_md5 6d3af727a4e7b025fd59a5469b3a9c57",
+        ],
+    )
+    file_list.write_text(str(tmp_path / "missing"))
+    hash_cli.assert_cli_usage_error(("--file-list", str(file_list), "url"))
+
+
+def test_parallel(hash_cli: ThreatExchangeCLIE2eHelper, tmp_path: pathlib.Path):
+    files = []
+    for i in range(20):
+        f = tmp_path / f"{i:02}"
+        f.write_text(f"https://example.com/{i}")
+        files.append(str(f))
+    serial = hash_cli.cli_call("url", *files)
+
+    assert hash_cli.cli_call("--parallel", "3", "url", *files) == serial
+    unordered = hash_cli.cli_call("--parallel", "3", "--unordered", "url", *files)
+    assert sorted(unordered.splitlines()) == sorted(serial.splitlines())
+
+    hash_cli.assert_cli_usage_error(("--parallel", "0", "url", *files))
+
+
+def test_cache(
+    hash_cli: ThreatExchangeCLIE2eHelper,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+):
+    from threatexchange.signal_type.url_md5 import UrlMD5Signal
+
+    a = tmp_path / "a"
+    a.write_text("http://evil.com")
+    hash_cli.assert_cli_output(
+        ("--cache", "url", str(a)), "url_md5 6d3af727a4e7b025fd59a5469b3a9c57"
+    )
+
+    def no_hashing(cls, file):
+        raise AssertionError("should have used the cache")
+
+    with monkeypatch.context() as m:
+        m.setattr(UrlMD5Signal, "hash_from_file", classmethod(no_hashing))
+        hash_cli.assert_cli_output(
+            ("--cache", "url", str(a)), "url_md5 6d3af727a4e7b025fd59a5469b3a9c57"
+        )
+        hash_cli.assert_cli_output(
+            ("--cache", "--parallel", "2", "url", str(a)),
+            "url_md5 6d3af727a4e7b025fd59a5469b3a9c57",
+        )
+
+    # Changing the file invalidates the entry
+    a.write_text("fb.com!")
+    hash_cli.assert_cli_output(
+        ("--cache", "url", str(a)), "url_md5 005709ac22bb0a86f85af45f4f9929ee"
+    )
+
+    # --clear-cache forgets everything from before
+    with monkeypatch.context() as m:
+        m.setattr(UrlMD5Signal, "hash_from_file", classmethod(no_hashing))
+        with pytest.raises(AssertionError, match="should have used the cache"):
+            hash_cli.cli_call("--cache", "--clear-cache", "url", str(a))
+
+
+def test_photo_preprocess_rejects_parallel_and_cache(
+    hash_cli: ThreatExchangeCLIE2eHelper,
+):
+    test_file = (
+        pathlib.Path(__file__).parent.parent.parent / "tests/hashing/resources/LA.png"
+    )
+    for flags in (("--parallel", "2"), ("--cache",)):
+        hash_cli.assert_cli_usage_error(
+            (*flags, "--photo-preprocess=rotations", "photo", str(test_file)),
+            msg_regex="don't work with --photo-preprocess",
+        )
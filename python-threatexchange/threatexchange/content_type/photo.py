@@ -4,6 +4,7 @@
 """
 Wrapper around the video content type.
 """
+
 from PIL import Image
 from pathlib import Path
 import io
@@ -113,15 +114,26 @@ class PhotoContent(ContentType):
         """
         with file_path.open("rb") as file:
             with Image.open(file) as image:
-                img = image.convert("RGB")
-                top = unletterboxing.detect_top_border(img, black_threshold)
-                bottom = unletterboxing.detect_bottom_border(img, black_threshold)
-                left = unletterboxing.detect_left_border(img, black_threshold)
-                right = unletterboxing.detect_right_border(img, black_threshold)
-
-                width, height = image.size
-                cropped_img = image.crop((left, top, width - right, height - bottom))
-
+                cropped_img = cls.unletterbox_image(image, black_threshold)
                 with io.BytesIO() as buffer:
                     cropped_img.save(buffer, format=image.format)
                     return buffer.getvalue()
+
+    @classmethod
+    def unletterbox_image(
+        cls, image: Image.Image, black_threshold: int = 0
+    ) -> Image.Image:
+        """
+        unletterbox(), but on an already open image, without encoding the result.
+        The cropped image can be passed straight to a hasher, i.e. pdq_from_image().
+        """
+        borders = unletterboxing.detect_borders(image, black_threshold)
+        width, height = image.size
+        return image.crop(
+            (
+                borders.left,
+                borders.top,
+                width - borders.right,
+                height - borders.bottom,
+            )
+        )
@@ -328,24 +328,35 @@ class SignalExchangeAPIWithSimpleUpdates(
         collab: TCollabConfig,
         fetched: t.Mapping[t.Tuple[str, str], t.Optional[state.TFetchedSignalMetadata]],
     ) -> t.Dict[t.Type[SignalType], t.Dict[str, state.TFetchedSignalMetadata]]:
-        ret: t.Dict[t.Type[SignalType], t.Dict[str, state.TFetchedSignalMetadata]] = {}
+        by_type: t.Dict[
+            t.Type[SignalType], t.List[t.Tuple[str, state.TFetchedSignalMetadata]]
+        ] = {}
         type_by_name = {st.get_name(): st for st in signal_types}
         for (type_str, signal_str), metadata in fetched.items():
             s_type = type_by_name.get(type_str)
             if s_type is None or metadata is None:
                 continue
-            try:
-                s_type.validate_signal_str(signal_str)
-            except ValueError:
-                logging.warning(
-                    "Invalid fingerprint (%s): %s",
-                    s_type.get_name(),
-                    signal_str if len(signal_str) < 100 else signal_str[:100] + "...",
-                )
-                continue
-            inner = ret.get(s_type)
-            if inner is None:
-                inner = {}
+            by_type.setdefault(s_type, []).append((signal_str, metadata))
+
+        ret: t.Dict[t.Type[SignalType], t.Dict[str, state.TFetchedSignalMetadata]] = {}
+        for s_type, signals in by_type.items():
+            # Validating every signal of a type at once is much faster for
+            # large fetches (@see SignalType.validate_signals)
+            validated = s_type.validate_signals(s for s, _ in signals)
+            inner = {}
+            for (signal_str, metadata), valid in zip(signals, validated.valid.tolist()):
+                if not valid:
+                    logging.warning(
+                        "Invalid fingerprint (%s): %s",
+                        s_type.get_name(),
+                        (
+                            signal_str
+                            if len(signal_str) < 100
+                            else signal_str[:100] + "..."
+                        ),
+                    )
+                    continue
+                inner[signal_str] = metadata
+            if inner:
                 ret[s_type] = inner
-            inner[signal_str] = metadata
         return ret
@@ -7,7 +7,6 @@ Use of pytesseract requires additional libaries already be installed, see https:
 """
 
 import pathlib
-import pytesseract
 import warnings
 from PIL import Image
 
@@ -17,6 +16,9 @@ def text_from_image_file(path: pathlib.Path):
     Given a path to a file return predicted OCR text
     Current tested against: jpg
     """
+    # Imported here so matching (which doesn't need OCR) works without it
+    import pytesseract
+
     img_pil = Image.open(path)
     try:
         return pytesseract.image_to_string(img_pil)
@@ -13,6 +13,7 @@ from threatexchange.content_type.photo import PhotoContent
 
 from threatexchange.signal_type.pdq.signal import PdqSignal
 from threatexchange.signal_type.raw_text import RawTextSignal
+from threatexchange.signal_type import index
 from threatexchange.signal_type import signal_base
 from threatexchange.exchanges.impl.fb_threatexchange_signal import (
     HasFbThreatExchangeIndicatorType,
@@ -20,6 +21,7 @@ from threatexchange.exchanges.impl.fb_threatexchange_signal import (
 
 from threatexchange.signal_type.pdq.pdq_hasher import pdq_from_file
 from threatexchange.extensions.pdq_ocr.ocr_utils import text_from_image_file
+from threatexchange.extensions.pdq_ocr import pdq_ocr_index
 
 
 class PdqOcrSignal(
@@ -41,14 +43,22 @@ class PdqOcrSignal(
 
     # This may need to be updated (TODO make more configurable)
     # Hashes of distance less than or equal to this threshold are considered a 'match'
-    PDQ_PLUS_OCR_CONFIDENT_MATCH_THRESHOLD = 31
+    PDQ_PLUS_OCR_CONFIDENT_MATCH_THRESHOLD = (
+        pdq_ocr_index.PDQ_PLUS_OCR_CONFIDENT_MATCH_THRESHOLD
+    )
     # Match considered if 90% of the strings match
-    LEVENSHTEIN_DISTANCE_PERCENT_THRESHOLD = 90
+    LEVENSHTEIN_DISTANCE_PERCENT_THRESHOLD = (
+        pdq_ocr_index.LEVENSHTEIN_DISTANCE_PERCENT_THRESHOLD
+    )
 
     @classmethod
     def get_content_types(cls) -> t.List[t.Type[ContentType]]:
         return [PhotoContent]
 
+    @classmethod
+    def get_index_cls(cls) -> t.Type[index.SignalTypeIndex]:
+        return pdq_ocr_index.PdqOcrIndex
+
     @classmethod
     def hash_from_file(cls, file: pathlib.Path) -> str:
         pdq_hash, quality = pdq_from_file(file)
@@ -0,0 +1,98 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+Implementation of SignalTypeIndex for PDQ+OCR, PDQ via faiss then OCR text
+"""
+
+import typing as t
+
+from threatexchange import common
+from threatexchange.signal_type.index import (
+    IndexMatch,
+    SignalSimilarityInfoWithIntDistance,
+    SignalTypeIndex,
+    T as IndexT,
+)
+from threatexchange.signal_type.pdq.pdq_faiss_matcher import PDQFlatHashIndex
+from threatexchange.signal_type.raw_text import RawTextSignal
+
+# Defaults for PdqOcrSignal, here so the index doesn't have to import it
+PDQ_PLUS_OCR_CONFIDENT_MATCH_THRESHOLD = 31
+LEVENSHTEIN_DISTANCE_PERCENT_THRESHOLD = 90
+
+
+def split_pdq_ocr(signal_str: str) -> t.Tuple[str, str]:
+    """Split a "pdq,ocr text" signal_str, throws ValueError if either is missing"""
+    pdq_hash, _, ocr_text = signal_str.partition(",")
+    if not (pdq_hash and ocr_text):
+        raise ValueError("malformed pdq_ocr hash")
+    return pdq_hash, ocr_text
+
+
+class PdqOcrIndex(SignalTypeIndex[IndexT]):
+    """
+    Finds the same matches as PdqOcrSignal.compare_hash(), in two stages
+
+    1. The PDQ half of every entry is in a faiss binary index, which finds
+       the candidates within the PDQ threshold.
+    2. Only those candidates have their OCR text (normalized once, on add)
+       compared with Levenshtein.
+
+    So the text comparison cost scales with PDQ matches, not the size of
+    the index.
+    """
+
+    def __init__(
+        self,
+        pdq_threshold: int = PDQ_PLUS_OCR_CONFIDENT_MATCH_THRESHOLD,
+        text_pct_diff_threshold: float = LEVENSHTEIN_DISTANCE_PERCENT_THRESHOLD,
+    ) -> None:
+        super().__init__()
+        self.pdq_threshold = pdq_threshold
+        self.text_pct_diff_threshold = text_pct_diff_threshold
+        self.index = PDQFlatHashIndex()
+        # Aligned with the faiss ids
+        self._normalized_texts: t.List[str] = []
+        self._entries: t.List[IndexT] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, signal_str: str, entry: IndexT) -> None:
+        self.add_all(((signal_str, entry),))
+
+    def add_all(self, entries: t.Iterable[t.Tuple[str, IndexT]]) -> None:
+        pdq_hashes = []
+        ids = []
+        for signal_str, entry in entries:
+            pdq_hash, ocr_text = split_pdq_ocr(signal_str)
+            ids.append(len(self._entries))
+            pdq_hashes.append(pdq_hash)
+            self._normalized_texts.append(common.normalize_string(ocr_text))
+            self._entries.append(entry)
+        if pdq_hashes:
+            self.index.add(pdq_hashes, ids)
+
+    def query(self, query: str) -> t.List[IndexMatch[IndexT]]:
+        pdq_hash, ocr_text = split_pdq_ocr(query)
+        if not self._entries:
+            return []
+        normalized_text = common.normalize_string(ocr_text)
+        results = self.index.search_with_distance_in_result(
+            [pdq_hash], self.pdq_threshold
+        )
+        matches: t.List[IndexMatch[IndexT]] = []
+        for idx, _, distance in results[pdq_hash]:
+            text_result = RawTextSignal.matches_normalized_str(
+                self._normalized_texts[idx],
+                normalized_text,
+                self.text_pct_diff_threshold,
+            )
+            if text_result.match:
+                matches.append(
+                    IndexMatch(
+                        SignalSimilarityInfoWithIntDistance(int(distance)),
+                        self._entries[idx],
+                    )
+                )
+        return matches
@@ -0,0 +1 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
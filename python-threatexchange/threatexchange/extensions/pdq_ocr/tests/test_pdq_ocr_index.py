@@ -0,0 +1,57 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import pickle
+import random
+
+import pytest
+
+from threatexchange.extensions.pdq_ocr.pdq_ocr import PdqOcrSignal
+from threatexchange.extensions.pdq_ocr.pdq_ocr_index import (
+    PDQ_PLUS_OCR_CONFIDENT_MATCH_THRESHOLD,
+    PdqOcrIndex,
+)
+from threatexchange.tests.hashing.utils import get_random_hash, get_similar_hash
+
+TEXTS = ["This is a sample text string", "Something else entirely", "x"]
+
+
+def test_same_as_compare_hash():
+    rng = random.Random(5)
+    bases = [get_random_hash() for _ in range(10)]
+    signals = [
+        f"{get_similar_hash(rng.choice(bases), rng.randint(0, 40))},{rng.choice(TEXTS)}"
+        for _ in range(200)
+    ]
+    index = PdqOcrSignal.get_index_cls().build((s, i) for i, s in enumerate(signals))
+    assert len(index) == len(signals)
+
+    found = 0
+    for query in signals[:50]:
+        expected = {}
+        for i, s in enumerate(signals):
+            res = PdqOcrSignal.compare_hash(s, query)
+            if res.match:
+                expected[i] = res.distance.distance
+        got = {m.metadata: m.similarity_info.distance for m in index.query(query)}
+        assert got == expected
+        found += len(expected)
+    assert found > 50  # Not just exact matches
+
+
+def test_text_must_match():
+    pdq = get_random_hash()
+    index = PdqOcrIndex.build([(f"{pdq},{TEXTS[0]}", "a")])
+    assert [m.metadata for m in index.query(f"{pdq},{TEXTS[0].upper()}")] == ["a"]
+    assert index.query(f"{pdq},{TEXTS[2]}") == []
+    far_pdq = get_similar_hash(pdq, PDQ_PLUS_OCR_CONFIDENT_MATCH_THRESHOLD + 1)
+    assert index.query(f"{far_pdq},{TEXTS[0]}") == []
+
+
+def test_serialize_and_malformed():
+    signal = f"{get_random_hash()},{TEXTS[0]}"
+    index = pickle.loads(pickle.dumps(PdqOcrIndex.build([(signal, "a")])))
+    assert [m.metadata for m in index.query(signal)] == ["a"]
+    with pytest.raises(ValueError):
+        index.query(get_random_hash())
+    with pytest.raises(ValueError):
+        index.add(f",{TEXTS[0]}", "b")
@@ -1,7 +1,6 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 import unittest
 
-
 try:
     import tlsh as _
 
@@ -26,3 +25,8 @@ class TLSHHasherModuleUnitTest(unittest.TestCase):
             hashed = TextTLSHSignal.hash_from_str(input)
 
         assert hashed == expected_hash, f"case: {input}"
+
+    def test_random_signal(self):
+        for _ in range(20):
+            signal = TextTLSHSignal.get_random_signal()
+            assert TextTLSHSignal.validate_signal_str(signal) == signal
@@ -0,0 +1,80 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+import pickle
+import random
+import string
+import unittest
+
+try:
+    import tlsh as _
+
+    _DISABLED = False
+except ImportError:
+    _DISABLED = True
+else:
+    from threatexchange.extensions.tlsh.text_tlsh import TextTLSHSignal
+    from threatexchange.extensions.tlsh.tlsh_index import TLSHIndex
+    from threatexchange.signal_type.signal_base import TrivialLinearSearchHashIndex
+
+    class TLSHLinearSearch(TrivialLinearSearchHashIndex):
+        _SIGNAL_TYPE = TextTLSHSignal
+
+
+def _random_text(rng: random.Random, words: int) -> str:
+    return " ".join(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 8)))
+        for _ in range(words)
+    )
+
+
+def _perturb(rng: random.Random, text: str, edits: int) -> str:
+    chars = list(text)
+    for _ in range(edits):
+        chars[rng.randrange(len(chars))] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+@unittest.skipIf(_DISABLED, "tlsh not installed")
+class TLSHIndexTest(unittest.TestCase):
+    def test_same_as_linear_search(self):
+        rng = random.Random(3)
+        texts = [_random_text(rng, 100) for _ in range(20)]
+        texts += [
+            _perturb(rng, rng.choice(texts), rng.randint(1, 40)) for _ in range(80)
+        ]
+        hashes = [TextTLSHSignal.hash_from_str(t) for t in texts]
+        entries = [(h, i) for i, h in enumerate(hashes)]
+        index = TextTLSHSignal.get_index_cls().build(entries)
+        assert isinstance(index, TLSHIndex)
+        linear = TLSHLinearSearch.build(entries)
+
+        found = 0
+        for query in hashes:
+            expected = {
+                (m.metadata, m.similarity_info.distance) for m in linear.query(query)
+            }
+            got = {(m.metadata, m.similarity_info.distance) for m in index.query(query)}
+            assert got == expected
+            found += len(expected)
+        assert found > len(hashes)  # Not just exact matches
+
+    def test_invalid(self):
+        index = TLSHIndex.build([(TextTLSHSignal.get_examples()[1], "a")])
+        assert index.query("") == []
+        assert index.query("TNULL") == []
+        with self.assertRaises(ValueError):
+            index.add("T1", "b")
+
+    def test_validate_signals(self):
+        example = TextTLSHSignal.get_examples()[1]
+        signals = [example, example.lower(), example[:-1], "T2" + example[2:], ""]
+        validated = TextTLSHSignal.validate_signals(signals)
+        assert validated.valid.tolist() == [True, False, False, False, False]
+        for s, valid in zip(signals, validated.valid.tolist()):
+            if not valid:
+                with self.assertRaises(ValueError):
+                    TextTLSHSignal.validate_signal_str(s)
+
+    def test_serialize(self):
+        example = TextTLSHSignal.get_examples()[1]
+        index = pickle.loads(pickle.dumps(TLSHIndex.build([(example, "a")])))
+        assert [m.metadata for m in index.query(example)] == ["a"]
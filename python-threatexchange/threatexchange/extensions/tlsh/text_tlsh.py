@@ -9,16 +9,24 @@ import typing as t
 from threatexchange.content_type.content_base import ContentType
 from threatexchange.content_type.text import TextContent
 
+from threatexchange.signal_type import index
 from threatexchange.signal_type import signal_base
 from threatexchange.signal_type.raw_text import RawTextSignal
+from threatexchange.extensions.tlsh.tlsh_index import (
+    TLSH_CONFIDENT_MATCH_THRESHOLD,
+    TLSHIndex,
+)
 
 import tlsh
 
-TLSH_CONFIDENT_MATCH_THRESHOLD = 30
 EXPECT_TLSH_HASH_LENGTH = 72
 
 
-class TextTLSHSignal(signal_base.SimpleSignalType, signal_base.TextHasher):
+class TextTLSHSignal(
+    signal_base.SimpleSignalType,
+    signal_base.TextHasher,
+    signal_base.CanGenerateRandomSignal,
+):
     """
     Simple signal type for text using TLSH.
 
@@ -34,10 +42,26 @@ class TextTLSHSignal(signal_base.SimpleSignalType, signal_base.TextHasher):
     @classmethod
     def validate_signal_str(cls, signal_str: str) -> str:
         """'T1' followed 70 hexidecimal characters. Total length 72 characters."""
-        if not re.match("^T1[0-9A-F]{70}$", signal_str):
+        if not re.fullmatch("T1[0-9A-F]{70}", signal_str):
             raise ValueError("invalid TLSH hash")
         return signal_str
 
+    @classmethod
+    def validate_signals(
+        cls, signal_strs: t.Iterable[str]
+    ) -> signal_base.ValidatedSignals:
+        signal_strs = list(signal_strs)
+        return signal_base.ValidatedSignals(
+            signal_strs,
+            signal_base.validate_hex_signals(
+                signal_strs, 70, prefix="T1", lowercase=False
+            ),
+        )
+
+    @classmethod
+    def get_index_cls(cls) -> t.Type[index.SignalTypeIndex]:
+        return TLSHIndex
+
     @classmethod
     def hash_from_str(cls, text: str) -> str:
         hash_str = str(tlsh.hash(text.encode()))
@@ -55,6 +79,11 @@ class TextTLSHSignal(signal_base.SimpleSignalType, signal_base.TextHasher):
         dist: int = tlsh.diffxlen(hash1, hash2)
         return signal_base.SignalComparisonResult.from_simple_dist(dist, tlsh_threshold)
 
+    @classmethod
+    def get_random_signal(cls) -> str:
+        # Long enough that TLSH always produces a hash
+        return cls.hash_from_str(" ".join(signal_base.random_words(100)))
+
     @staticmethod
     def get_examples() -> t.List[str]:
         return [TextTLSHSignal.hash_from_str(s) for s in RawTextSignal.get_examples()]
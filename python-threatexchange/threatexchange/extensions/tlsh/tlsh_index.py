@@ -0,0 +1,120 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+Implementation of SignalTypeIndex for TLSH, vectorized with numpy
+"""
+
+import re
+import typing as t
+
+import numpy as np
+
+from threatexchange.signal_type.index import (
+    IndexMatch,
+    SignalSimilarityInfoWithIntDistance,
+    SignalTypeIndex,
+    T as IndexT,
+)
+
+TLSH_CONFIDENT_MATCH_THRESHOLD = 30
+TLSH_HEADER_BYTES = 3
+TLSH_BODY_BYTES = 32
+_TLSH_BYTES = TLSH_HEADER_BYTES + TLSH_BODY_BYTES
+_TLSH_RE = re.compile("^T1[0-9A-Fa-f]{70}$")
+# Caps temporary memory at ~_QUERY_CHUNK_ROWS * TLSH_BODY_BYTES bytes
+_QUERY_CHUNK_ROWS = 1 << 16
+
+
+def _bucket_distance(a: int, b: int) -> int:
+    """Distance between two 2 bit body buckets, same as tlsh's h_distance"""
+    diff = abs(a - b)
+    return 6 if diff == 3 else diff
+
+
+def _body_byte_distance_table() -> np.ndarray:
+    """[a, b] => distance between body bytes a and b (4 buckets each)"""
+    table = np.zeros((256, 256), dtype=np.uint8)
+    for a in range(256):
+        for b in range(256):
+            table[a, b] = sum(
+                _bucket_distance((a >> shift) & 3, (b >> shift) & 3)
+                for shift in (0, 2, 4, 6)
+            )
+    return table
+
+
+_BODY_BYTE_DISTANCE = _body_byte_distance_table()
+
+
+def tlsh_to_bytes(tlsh_hash: str) -> t.Optional[bytes]:
+    """
+    The raw bytes of a TLSH hash: checksum, length, q ratios, then body
+
+    Returns None if the hash isn't a version 1 TLSH hash with a 1 byte
+    checksum (the only kind TextTLSHSignal produces).
+    """
+    if not _TLSH_RE.match(tlsh_hash):
+        return None
+    return bytes.fromhex(tlsh_hash[2:])
+
+
+class TLSHIndex(SignalTypeIndex[IndexT]):
+    """
+    Returns exactly the hashes within a threshold of tlsh.diffxlen()
+
+    TLSH distance isn't a metric (a bucket off by 3 costs 6, but 1 + 2 costs
+    3) and ignores the length byte, so neither metric trees nor bucketing on
+    the header can skip hashes without missing matches. Instead, the distance
+    to every hash is computed at once with numpy: the header terms first, and
+    then the body via a table of distances between every pair of body bytes,
+    only for the hashes whose header didn't already rule them out.
+    """
+
+    def __init__(self, threshold: int = TLSH_CONFIDENT_MATCH_THRESHOLD) -> None:
+        self.threshold = threshold
+        self._hashes = bytearray()
+        self._entries: t.List[IndexT] = []
+
+    def add(self, signal_str: str, entry: IndexT) -> None:
+        raw = tlsh_to_bytes(signal_str)
+        if raw is None:
+            raise ValueError(f"invalid TLSH hash: {signal_str}")
+        self._hashes += raw
+        self._entries.append(entry)
+
+    def query(self, query: str) -> t.List[IndexMatch[IndexT]]:
+        raw = tlsh_to_bytes(query)
+        if raw is None or not self._entries:
+            return []
+        q = np.frombuffer(raw, dtype=np.uint8)
+        hashes = np.frombuffer(self._hashes, dtype=np.uint8).reshape(-1, _TLSH_BYTES)
+        ret: t.List[IndexMatch[IndexT]] = []
+        for start in range(0, len(hashes), _QUERY_CHUNK_ROWS):
+            chunk = hashes[start : start + _QUERY_CHUNK_ROWS]
+            distances = self._header_distances(q, chunk)
+            candidates = np.flatnonzero(distances <= self.threshold)
+            distances = distances[candidates] + _BODY_BYTE_DISTANCE[
+                q[TLSH_HEADER_BYTES:], chunk[candidates, TLSH_HEADER_BYTES:]
+            ].sum(axis=1, dtype=np.int32)
+            hits = distances <= self.threshold
+            for i, distance in zip(candidates[hits].tolist(), distances[hits].tolist()):
+                ret.append(
+                    IndexMatch(
+                        SignalSimilarityInfoWithIntDistance(distance),
+                        self._entries[start + i],
+                    )
+                )
+        return ret
+
+    @staticmethod
+    def _header_distances(q: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+        """The checksum and q ratio parts of tlsh.diffxlen()"""
+        distances = (hashes[:, 0] != q[0]).astype(np.int32)
+        for shift in (0, 4):
+            diff = np.abs(
+                ((hashes[:, 2] >> shift) & 0xF).astype(np.int32)
+                - ((q[2] >> shift) & 0xF)
+            )
+            diff = np.minimum(diff, 16 - diff)
+            distances += np.where(diff <= 1, diff, (diff - 1) * 12)
+        return distances
@@ -1,5 +1,6 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
+import base64
 import pytest
 import pickle
 import random
@@ -15,20 +16,34 @@ except (ImportError, ModuleNotFoundError) as e:
     _DISABLED = True
 else:
     import typing as t
-    from threatexchange.extensions.vpdq.vpdq_index import VPDQIndex, VPDQSimilarityInfo
+    from threatexchange.extensions.vpdq.vpdq_index import (
+        VPDQIndex,
+        VPDQSimilarityInfo,
+        VPDQStreamingQuery,
+    )
+    from threatexchange.extensions.vpdq.vpdq_faiss import VPDQHashIndex
     from threatexchange.extensions.vpdq.vpdq_util import (
+        assert_valid_vpdq_str,
         json_to_vpdq,
         prepare_vpdq_feature,
         VPDQ_QUALITY_THRESHOLD,
         vpdq_to_json,
         dedupe,
         quality_filter,
+        compact_to_vpdq,
+        compact_to_vpdq_arrays,
+        vpdq_to_compact,
+        VPDQ_COMPACT_PREFIX,
     )
     from threatexchange.extensions.vpdq.tests.utils import (
         get_random_vpdq_features,
         pdq_hashes_to_vpdq_features,
     )
     from threatexchange.extensions.vpdq.vpdq import VPDQSignal
+    from threatexchange.extensions.vpdq.vpdq_brute_matcher import (
+        match_VPDQ_hash_brute,
+        match_VPDQ_hash_vectorized,
+    )
     from threatexchange.tests.hashing.utils import (
         get_random_hash,
         get_similar_hash,
@@ -87,10 +102,97 @@ def test_utils():
     )
 
 
+def test_compact_encoding():
+    features = get_random_vpdq_features(100, seconds_per_frame=0.25)
+    features[3].quality = 0
+    compact = vpdq_to_compact(features)
+    assert compact.startswith(VPDQ_COMPACT_PREFIX)
+    assert len(compact) < len(vpdq_to_json(features)) * 2 / 3
+    assert compact_to_vpdq(compact) == features
+    # Either form can be read, and indexes the same
+    assert json_to_vpdq(compact) == features
+    duplicated = features[:40] + features[:10]
+    assert prepare_vpdq_feature(
+        vpdq_to_compact(duplicated), VPDQ_QUALITY_THRESHOLD
+    ) == prepare_vpdq_feature(vpdq_to_json(duplicated), VPDQ_QUALITY_THRESHOLD)
+
+    hashes, qualities, timestamps = compact_to_vpdq_arrays(compact)
+    assert hashes.shape == (100, 32)
+    assert bytes(hashes[0]).hex() == features[0].pdq_hex
+    assert qualities[3] == 0
+    assert timestamps[10] == 2.5
+
+    assert compact_to_vpdq(vpdq_to_compact([])) == []
+    assert prepare_vpdq_feature(vpdq_to_compact([]), VPDQ_QUALITY_THRESHOLD) == []
+    # hash + quality + timestamp
+    one_frame = bytes(32) + bytes([101]) + bytes(4)
+    for invalid in (
+        VPDQ_COMPACT_PREFIX + "not base64!",
+        compact[:-4],
+        VPDQ_COMPACT_PREFIX + base64.b64encode(one_frame).decode(),
+    ):
+        with pytest.raises(ValueError):
+            VPDQSignal.validate_signal_str(invalid)
+
+
+def test_assert_valid_vpdq_str():
+    features = get_random_vpdq_features(10, seconds_per_frame=0.25)
+    valid = vpdq_to_json(features)
+    assert_valid_vpdq_str(valid)
+    assert_valid_vpdq_str(valid.upper())
+    assert_valid_vpdq_str("[]")
+    assert_valid_vpdq_str("")
+    assert_valid_vpdq_str(vpdq_to_compact(features))
+    pdq_hex = features[0].pdq_hex
+    for invalid in ("{}", "[1]"):
+        with pytest.raises(ValueError):
+            VPDQSignal.validate_signal_str(invalid)
+    for invalid in (
+        "not json",
+        f'["{pdq_hex},100"]',
+        f'["{pdq_hex[:-1]},100,1.0"]',
+        f'["{pdq_hex[:-1]}g,100,1.0"]',
+        f'["{pdq_hex},101,1.0"]',
+        f'["{pdq_hex},1.5,1.0"]',
+        f'["{pdq_hex},100,-1.0"]',
+        f'["{pdq_hex},100,x"]',
+    ):
+        # Agrees with the slow path
+        with pytest.raises(ValueError):
+            json_to_vpdq(invalid)
+        with pytest.raises(ValueError):
+            VPDQSignal.validate_signal_str(invalid)
+
+
+def test_vectorized_brute_match_same_as_brute(monkeypatch):
+    from threatexchange.extensions.vpdq import vpdq_brute_matcher
+
+    # Small blocks, to check they're combined correctly
+    monkeypatch.setattr(vpdq_brute_matcher, "_VECTORIZED_BLOCK_ROWS", 7)
+    query = get_random_vpdq_features(40)
+    # Some frames close enough to match, some just too far, some duplicated,
+    # and some low quality
+    compared = pdq_hashes_to_vpdq_features(
+        [get_similar_hash(f.pdq_hex, 31) for f in query[:10]]
+        + [get_similar_hash(f.pdq_hex, 32) for f in query[10:20]]
+        + [query[0].pdq_hex] * 3
+        + [get_random_hash() for _ in range(5)]
+    )
+    for f in query[30:35] + compared[:3]:
+        f.quality = 10
+    for a, b in ((query, compared), (compared, query), (query, query)):
+        expected = match_VPDQ_hash_brute(a, b, VPDQ_QUALITY_THRESHOLD, 31)
+        assert match_VPDQ_hash_vectorized(a, b, VPDQ_QUALITY_THRESHOLD, 31) == expected
+    assert VPDQSignal.compare_hash(
+        vpdq_to_json(query), vpdq_to_json(query)
+    ).distance == VPDQSimilarityInfo(100.0, 100.0)
+
+
 def test_simple():
     index = VPDQIndex.build([[HASH, EXAMPLE_META_DATA]])
-    assert index._entry_idx_to_features_and_entries[0][0] == FEATURES
-    assert len(index._index_idx_to_vpdqHex_and_entry) == len(FEATURES)
+    assert index.video_offsets.tolist() == [0, len(FEATURES)]
+    assert index.video_frame_counts.tolist() == [len(FEATURES)]
+    assert len(index.index) == len(FEATURES)
     res = index.query(HASH)
     # A complete match to itself
     assert res[0] == IndexMatch(VPDQSimilarityInfo(100.0, 100.0), EXAMPLE_META_DATA)
@@ -117,6 +219,45 @@ def test_serialize():
     assert res[0] == IndexMatch(VPDQSimilarityInfo(100.0, 100.0), EXAMPLE_META_DATA)
 
 
+def test_unpickle_old_version():
+    # Before the frame => video mapping was array-backed, shared frames were
+    # only indexed once
+    video1 = pdq_hashes_to_vpdq_features(G1[:4])
+    video2 = pdq_hashes_to_vpdq_features(G1[:2] + G2[:2])
+    old_faiss = VPDQHashIndex()
+    old_faiss.add_single_video(video1 + video2[2:])
+    index = VPDQIndex.__new__(VPDQIndex)
+    index.__setstate__(
+        {
+            "index": old_faiss,
+            "_entry_idx_to_features_and_entries": [
+                (video1, "video1"),
+                (video2, "video2"),
+            ],
+            "_index_idx_to_vpdqHex_and_entry": [
+                (0, [0, 1]),
+                (1, [0, 1]),
+                (2, [0]),
+                (3, [0]),
+                (4, [1]),
+                (5, [1]),
+            ],
+            "_unique_vpdqHex_to_index_idx": {},
+            "quality_threshold": VPDQ_QUALITY_THRESHOLD,
+            "query_match_threshold_pct": 0,
+            "index_match_threshold_pct": 0,
+        }
+    )
+    assert index.video_frame_counts.tolist() == [4, 4]
+    res = index.query(vpdq_to_json(video2))
+    assert res == [
+        IndexMatch(VPDQSimilarityInfo(50.0, 100.0), "video1"),
+        IndexMatch(VPDQSimilarityInfo(100.0, 100.0), "video2"),
+    ]
+    # Survives another round trip
+    assert pickle.loads(pickle.dumps(index)).query(vpdq_to_json(video2)) == res
+
+
 def test_empty_video_():
     empty_video = []
     video1 = pdq_hashes_to_vpdq_features(G1)
@@ -296,3 +437,96 @@ def test_duplicate_video_matches():
     res = index.query(vpdq_to_json(video3))
     assert res[0] == IndexMatch(VPDQSimilarityInfo(100.0, 100.0), VIDEO1_META_DATA)
     assert res[1] == IndexMatch(VPDQSimilarityInfo(50.0, 100.0), VIDEO2_META_DATA)
+
+
+def _counting_iter(features, consumed):
+    for f in features:
+        consumed.append(f)
+        yield f
+
+
+def test_streaming_same_as_query():
+    # Consuming the whole stream gives the same answer as query()
+    video1 = get_random_vpdq_features(40)
+    video2 = video1[:20] + get_random_vpdq_features(20)
+    index = VPDQIndex(query_match_threshold_pct=0)
+    index.add_all(
+        [
+            [vpdq_to_json(video1), VIDEO1_META_DATA],
+            [vpdq_to_json(video2), VIDEO2_META_DATA],
+        ]
+    )
+    query = video1[:30] + video1[:5] + get_random_vpdq_features(10)
+    expected = index.query(vpdq_to_json(query))
+    assert len(expected) == 2
+    for chunk_size in (1, 7, 100):
+        assert (
+            index.query_streaming(
+                query, chunk_size=chunk_size, min_query_frames=len(query) + 1
+            )
+            == expected
+        )
+
+
+def test_streaming_early_match():
+    video = get_random_vpdq_features(200)
+    index = VPDQIndex.build([[vpdq_to_json(video), VIDEO1_META_DATA]])
+    consumed: t.List[VpdqCompactFeature] = []
+    res = index.query_streaming(
+        _counting_iter(video, consumed), chunk_size=10, min_query_frames=30
+    )
+    assert len(consumed) == 30
+    assert res == [IndexMatch(VPDQSimilarityInfo(100.0, 15.0), VIDEO1_META_DATA)]
+
+    # The index threshold also has to be met before stopping early
+    index = VPDQIndex.build(
+        [[vpdq_to_json(video), VIDEO1_META_DATA]], index_match_threshold_pct=50
+    )
+    consumed.clear()
+    res = index.query_streaming(
+        _counting_iter(video, consumed), chunk_size=10, min_query_frames=30
+    )
+    assert len(consumed) == 100
+    assert res == [IndexMatch(VPDQSimilarityInfo(100.0, 50.0), VIDEO1_META_DATA)]
+
+
+def test_streaming_early_no_match():
+    video = get_random_vpdq_features(100)
+    # 100/130 frames match, which is under the 80% threshold
+    query = get_random_vpdq_features(30) + video
+    consumed: t.List[VpdqCompactFeature] = []
+
+    # Without the expected length, there's no way to know it can't match
+    index = VPDQIndex.build([[vpdq_to_json(video), VIDEO1_META_DATA]])
+    res = index.query_streaming(_counting_iter(query, consumed), chunk_size=1)
+    assert len(consumed) == len(query)
+    assert res == []
+
+    # But with it, after 27/130 frames fail to match, 80% can't be reached
+    consumed.clear()
+    res = index.query_streaming(
+        _counting_iter(query, consumed),
+        chunk_size=1,
+        expected_query_frames=len(query),
+    )
+    assert len(consumed) == 27
+    assert res == []
+
+
+def test_streaming_query_tallies():
+    video = get_random_vpdq_features(10)
+    index = VPDQIndex.build(
+        [[vpdq_to_json(video), VIDEO1_META_DATA]], query_match_threshold_pct=0
+    )
+    streaming_query = VPDQStreamingQuery(index, min_query_frames=100)
+    assert streaming_query.matches() == []
+    assert not streaming_query.add(video[:5])
+    # Duplicates and low quality frames are dropped, same as query()
+    assert not streaming_query.add(
+        video[:5] + [VpdqCompactFeature(video[5].pdq_hex, 10, 5.0)]
+    )
+    assert streaming_query.frames_seen == 11
+    assert streaming_query.unique_frames_seen == 5
+    assert streaming_query.matches() == [
+        IndexMatch(VPDQSimilarityInfo(100.0, 50.0), VIDEO1_META_DATA)
+    ]
@@ -15,6 +15,7 @@ else:
         vpdq_to_json,
         json_to_vpdq,
         VpdqCompactFeature,
+        VpdqHashingConfig,
         VPDQ_QUALITY_THRESHOLD,
         VPDQ_DISTANCE_THRESHOLD,
     )
@@ -66,3 +67,27 @@ def test_vpdq_from_string_path():
     )
     assert res.query_match_percent == 100
     assert res.compared_match_percent == 100
+
+
+@pytest.mark.skipif(_DISABLED, reason="vpdq not installed")
+def test_vpdq_streaming():
+    full = json_to_vpdq(VPDQSignal.hash_from_file(ROOTDIR / VIDEO))
+    assert list(VPDQSignal.hash_from_file_streaming(ROOTDIR / VIDEO)) == full
+
+    stream = VPDQSignal.hash_from_file_streaming(ROOTDIR / VIDEO)
+    first = [next(stream) for _ in range(3)]
+    stream.close()  # Stops decoding
+    assert first == full[:3]
+
+
+@pytest.mark.skipif(_DISABLED, reason="vpdq not installed")
+def test_vpdq_hashing_config(monkeypatch: pytest.MonkeyPatch):
+    full = json_to_vpdq(VPDQSignal.hash_from_file(ROOTDIR / VIDEO))
+    monkeypatch.setattr(
+        VPDQSignal,
+        "HASHING_CONFIG",
+        VpdqHashingConfig(seconds_per_hash=2.0, thread_count=1),
+    )
+    sparse = json_to_vpdq(VPDQSignal.hash_from_file(ROOTDIR / VIDEO))
+    assert 0 < len(sparse) < len(full)
+    assert {f.pdq_hex for f in sparse} <= {f.pdq_hex for f in full}
@@ -7,14 +7,20 @@ Wrapper around the vpdq signal type.
 from threatexchange.extensions.vpdq.vpdq_util import (
     VPDQ_INDEX_MATCH_THRESHOLD_PERCENT,
     VpdqCompactFeature,
+    assert_valid_vpdq_str,
     json_to_vpdq,
+    vpdq_to_compact,
     vpdq_to_json,
     VPDQ_DISTANCE_THRESHOLD,
     VPDQ_QUERY_MATCH_THRESHOLD_PERCENT,
     VPDQ_QUALITY_THRESHOLD,
+    VpdqHashingConfig,
     hash_file_compact,
+    iter_hash_file_compact,
+)
+from threatexchange.extensions.vpdq.vpdq_brute_matcher import (
+    match_VPDQ_hash_vectorized,
 )
-from threatexchange.extensions.vpdq.vpdq_brute_matcher import match_VPDQ_hash_brute
 import pathlib
 import typing as t
 from threatexchange.content_type.content_base import ContentType
@@ -45,8 +51,20 @@ class VPDQSignal(signal_base.SimpleSignalType, signal_base.FileHasher):
             ...
     }
     Read about VPDQ at https://github.com/facebook/ThreatExchange/tree/main/vpdq
+
+    signal_str can also be the compact (base64) serialization from
+    vpdq_to_compact(), which is smaller and faster to load into an index.
+    Both are accepted everywhere, but hash_from_file() only produces it if
+    COMPACT_SIGNAL_STR is set, since older versions can't read it.
+
+    Hashing can be tuned (threads, downsampling, frame rate) by replacing
+    HASHING_CONFIG, either on a subclass that keeps the same name, or once at
+    startup (e.g. in an OMM config file).
     """
 
+    HASHING_CONFIG: t.ClassVar[VpdqHashingConfig] = VpdqHashingConfig()
+    COMPACT_SIGNAL_STR: t.ClassVar[bool] = False
+
     @classmethod
     def get_content_types(cls) -> t.List[t.Type[ContentType]]:
         return [VideoContent]
@@ -60,12 +78,35 @@ class VPDQSignal(signal_base.SimpleSignalType, signal_base.FileHasher):
         """
         @see VpdqCompactFeature
         """
-        json_to_vpdq(signal_str)  # throws value error on failure
+        assert_valid_vpdq_str(signal_str)
         return signal_str
 
     @classmethod
-    def hash_from_file(cls, path: pathlib.Path, seconds_per_hash: float = 1) -> str:
-        return vpdq_to_json(hash_file_compact(str(path), seconds_per_hash))
+    def hash_from_file(
+        cls, path: pathlib.Path, seconds_per_hash: t.Optional[float] = None
+    ) -> str:
+        config = cls.HASHING_CONFIG
+        if seconds_per_hash is None:
+            seconds_per_hash = config.seconds_per_hash
+        features = hash_file_compact(str(path), seconds_per_hash, config)
+        if cls.COMPACT_SIGNAL_STR:
+            return vpdq_to_compact(features)
+        return vpdq_to_json(features)
+
+    @classmethod
+    def hash_from_file_streaming(
+        cls, path: pathlib.Path, seconds_per_hash: t.Optional[float] = None
+    ) -> t.Iterator[VpdqCompactFeature]:
+        """
+        Like hash_from_file(), but yields features as frames are hashed
+
+        Matching can start on the first frames of a long video, and stopping
+        iteration early stops decoding the rest of it.
+        """
+        config = cls.HASHING_CONFIG
+        if seconds_per_hash is None:
+            seconds_per_hash = config.seconds_per_hash
+        return iter_hash_file_compact(str(path), seconds_per_hash, config)
 
     @classmethod
     def compare_hash(
@@ -77,7 +118,7 @@ class VPDQSignal(signal_base.SimpleSignalType, signal_base.FileHasher):
     ) -> signal_base.SignalComparisonResult:
         vpdq_hash1 = json_to_vpdq(hash1)
         vpdq_hash2 = json_to_vpdq(hash2)
-        match_percent = match_VPDQ_hash_brute(
+        match_percent = match_VPDQ_hash_vectorized(
             vpdq_hash1,
             vpdq_hash2,
             VPDQ_QUALITY_THRESHOLD,
@@ -3,8 +3,23 @@ import vpdq
 
 import typing as t
 
-from threatexchange.signal_type.pdq.pdq_utils import simple_distance
-from .vpdq_util import VpdqCompactFeature, dedupe, quality_filter, VPDQMatchResult
+import numpy as np
+
+from threatexchange.signal_type.pdq.pdq_utils import (
+    pdq_distance_matrix,
+    simple_distance_int,
+)
+from .vpdq_util import (
+    VpdqCompactFeature,
+    dedupe,
+    quality_filter,
+    vpdq_to_hash_array,
+    VPDQMatchResult,
+)
+
+# Query frames per pdq_distance_matrix() call, so comparing long videos
+# never needs the whole distance matrix in memory at once
+_VECTORIZED_BLOCK_ROWS = 1024
 
 
 def match_VPDQ_in_another(
@@ -23,12 +38,10 @@ def match_VPDQ_in_another(
     Returns:
         int: The count of matches of hash1 in hash2
     """
+    ints2 = [int(h2.pdq_hex, 16) for h2 in hash2]
     return sum(
-        any(
-            simple_distance(h1.pdq_hex, h2.pdq_hex) <= distance_tolerance
-            for h2 in hash2
-        )
-        for h1 in hash1
+        any(simple_distance_int(int1, int2) <= distance_tolerance for int2 in ints2)
+        for int1 in (int(h1.pdq_hex, 16) for h1 in hash1)
     )
 
 
@@ -67,3 +80,34 @@ def match_VPDQ_hash_brute(
         query_match_cnt * 100 / len(filtered_query),
         compared_match_cnt * 100 / len(filtered_compared),
     )
+
+
+def match_VPDQ_hash_vectorized(
+    query_hash: t.List[VpdqCompactFeature],
+    compared_hash: t.List[VpdqCompactFeature],
+    quality_tolerance: int,
+    distance_tolerance: int,
+) -> VPDQMatchResult:
+    """Same as match_VPDQ_hash_brute(), but vectorized with numpy
+
+    Rather than comparing every pair of frames one at a time (twice!), the
+    distance between every pair is computed with XOR and popcount, a block
+    of query frames at a time. A query frame matches if the minimum of its
+    row is within tolerance, and a compared frame if the minimum of its
+    column is.
+    """
+    query = vpdq_to_hash_array(quality_filter(dedupe(query_hash), quality_tolerance))
+    compared = vpdq_to_hash_array(
+        quality_filter(dedupe(compared_hash), quality_tolerance)
+    )
+    query_matched = np.zeros(len(query), dtype=bool)
+    compared_matched = np.zeros(len(compared), dtype=bool)
+    for start in range(0, len(query), _VECTORIZED_BLOCK_ROWS):
+        end = start + _VECTORIZED_BLOCK_ROWS
+        within = pdq_distance_matrix(query[start:end], compared) <= distance_tolerance
+        query_matched[start:end] = within.any(axis=1)
+        compared_matched |= within.any(axis=0)
+    return VPDQMatchResult(
+        int(query_matched.sum()) * 100 / len(query),
+        int(compared_matched.sum()) * 100 / len(compared),
+    )
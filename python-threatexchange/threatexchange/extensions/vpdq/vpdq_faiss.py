@@ -27,7 +27,32 @@ class VPDQHashIndex:
         """
         hash_bytes = [binascii.unhexlify(h.pdq_hex) for h in hashes]
         vectors = [numpy.frombuffer(h, dtype=numpy.uint8) for h in hash_bytes]
-        self.faiss_index.add(numpy.array(vectors))
+        self.add_hashes(numpy.array(vectors))
+
+    def add_hashes(self, hashes: numpy.ndarray) -> None:
+        """
+        Args:
+            hashes : (n, 32) uint8 array of PDQ hashes, added in order
+        """
+        self.faiss_index.add(numpy.ascontiguousarray(hashes, dtype=numpy.uint8))
+
+    def __len__(self) -> int:
+        return self.faiss_index.ntotal
+
+    def range_search(
+        self, hashes: numpy.ndarray, distance_tolerance: int
+    ) -> t.Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Like search_with_distance_in_result(), but for (n, 32) uint8 arrays
+
+        Returns:
+            limits : results for hashes[i] are at [limits[i], limits[i + 1])
+            neighbors : the idx in this index (in add order) of each result
+        """
+        limits, _, neighbors = self.faiss_index.range_search(
+            numpy.ascontiguousarray(hashes, dtype=numpy.uint8), distance_tolerance + 1
+        )
+        return limits.astype(numpy.int64), neighbors
 
     def search_with_distance_in_result(
         self, queries: t.List[VpdqCompactFeature], distance_tolerance: int
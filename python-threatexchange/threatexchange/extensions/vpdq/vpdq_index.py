@@ -8,6 +8,8 @@ vpdq_faiss.
 from dataclasses import dataclass
 import typing as t
 
+import numpy as np
+
 from threatexchange.signal_type.index import (
     SignalSimilarityInfo,
     SignalTypeIndex,
@@ -17,11 +19,16 @@ from threatexchange.signal_type.index import (
 from threatexchange.extensions.vpdq.vpdq_faiss import VPDQHashIndex
 from threatexchange.extensions.vpdq.vpdq_util import (
     VpdqCompactFeature,
-    prepare_vpdq_feature,
+    dedupe,
+    prepare_vpdq_hashes,
+    quality_filter,
+    vpdq_to_hash_array,
     VPDQ_QUALITY_THRESHOLD,
     VPDQ_DISTANCE_THRESHOLD,
     VPDQ_QUERY_MATCH_THRESHOLD_PERCENT,
     VPDQ_INDEX_MATCH_THRESHOLD_PERCENT,
+    VPDQ_STREAMING_CHUNK_SIZE,
+    VPDQ_STREAMING_MIN_QUERY_FRAMES,
 )
 
 Self = t.TypeVar("Self", bound="VPDQIndex")
@@ -39,6 +46,15 @@ class VPDQSimilarityInfo(SignalSimilarityInfo):
 class VPDQIndex(SignalTypeIndex[IndexT]):
     """
     Wrapper around the vpdq faiss index lib using VPDQHashIndex
+
+    Every video's unique (after quality filtering) frames are added to the
+    faiss index back to back, so the faiss index doubles as the packed hash
+    matrix, and frame idx => video is a CSR-style lookup in _video_offsets:
+    video i owns frames [_video_offsets[i], _video_offsets[i + 1]).
+
+    Frames that appear in more than one video are stored once per video,
+    which costs a little extra faiss memory, but means no per-frame python
+    objects are needed to map frames back to videos.
     """
 
     def __init__(
@@ -49,11 +65,11 @@ class VPDQIndex(SignalTypeIndex[IndexT]):
     ) -> None:
         super().__init__()
         self.index: VPDQHashIndex = VPDQHashIndex()
-        self._entry_idx_to_features_and_entries: t.List[
-            t.Tuple[t.List[VpdqCompactFeature], IndexT]
-        ] = []
-        self._index_idx_to_vpdqHex_and_entry: t.List[t.Tuple[int, t.List[int]]] = []
-        self._unique_vpdqHex_to_index_idx: t.Dict[str, int] = {}
+        self._entries: t.List[IndexT] = []
+        self._video_offsets = np.zeros(1, dtype=np.int64)
+        # Frame counts of videos added since _video_offsets was last updated,
+        # to keep add() from copying _video_offsets every time
+        self._pending_frame_counts: t.List[int] = []
         self.quality_threshold = quality_threshold
         self.query_match_threshold_pct = query_match_threshold_pct
         self.index_match_threshold_pct = index_match_threshold_pct
@@ -73,25 +89,14 @@ class VPDQIndex(SignalTypeIndex[IndexT]):
         return ret
 
     def add(self, signal_str: str, entry: IndexT) -> None:
-        entry_id = len(self._entry_idx_to_features_and_entries)
-        features = prepare_vpdq_feature(signal_str, self.quality_threshold)
-        if not features:
+        hashes = prepare_vpdq_hashes(signal_str, self.quality_threshold)
+        if not len(hashes):
             raise ValueError(
                 "Empty video after deduping/filtering should not be indexed"
             )
-        self._entry_idx_to_features_and_entries.append((features, entry))
-        # Use hex to represent the feature because it saves the space
-        unique_features = []
-        for f in features:
-            idx = self._unique_vpdqHex_to_index_idx.get(f.pdq_hex)
-            if idx is None:
-                idx = len(self._unique_vpdqHex_to_index_idx)
-                self._unique_vpdqHex_to_index_idx[f.pdq_hex] = idx
-                self._index_idx_to_vpdqHex_and_entry.append((idx, list()))
-                unique_features.append(f)
-            self._index_idx_to_vpdqHex_and_entry[idx][1].append(entry_id)
-        if unique_features:
-            self.index.add_single_video(unique_features)
+        self.index.add_hashes(hashes)
+        self._entries.append(entry)
+        self._pending_frame_counts.append(len(hashes))
 
     def query(self, query_hash: str) -> t.List[IndexMatch[IndexT]]:
         """Searches this VPDQ index for query hashes within the index that are no more than the threshold away
@@ -103,44 +108,226 @@ class VPDQIndex(SignalTypeIndex[IndexT]):
         Returns:
             List of VPDQIndexMatch
         """
-        features = prepare_vpdq_feature(query_hash, self.quality_threshold)
-        if not features:
+        hashes = prepare_vpdq_hashes(query_hash, self.quality_threshold)
+        if not len(hashes):
             return []
-        results = self.index.search_with_distance_in_result(
-            features, VPDQ_DISTANCE_THRESHOLD
+        query_matched_counts, matched_frames = self._match_hashes(hashes)
+        return self._to_matches(
+            len(hashes),
+            query_matched_counts,
+            self._matched_frame_counts(matched_frames),
         )
-        query_matched: t.Dict[int, t.Set[str]] = {}
-        index_matched: t.Dict[int, t.Set[int]] = {}
-        matches: t.List[IndexMatch[IndexT]] = []
-        for hash in results:
-            for match in results[hash]:
-                # query_str =>  (matched_idx, distance)
-                vpdq_match, entry_list = self._index_idx_to_vpdqHex_and_entry[match[0]]
-                for entry_id in entry_list:
-                    if entry_id not in query_matched:
-                        query_matched[entry_id] = set()
-                    query_matched[entry_id].add(hash)
-
-                    if entry_id not in index_matched:
-                        index_matched[entry_id] = set()
-                    index_matched[entry_id].add(vpdq_match)
-        for entry_id in query_matched.keys():
-            query_matched_percent = len(query_matched[entry_id]) * 100 / len(features)
-            index_matched_percent = (
-                len(index_matched[entry_id])
-                * 100
-                / len(self._entry_idx_to_features_and_entries[entry_id][0])
-            )
-            if (
-                query_matched_percent >= self.query_match_threshold_pct
-                and index_matched_percent >= self.index_match_threshold_pct
-            ):
-                matches.append(
-                    IndexMatch(
-                        VPDQSimilarityInfo(
-                            query_matched_percent, index_matched_percent
-                        ),
-                        self._entry_idx_to_features_and_entries[entry_id][1],
-                    )
+
+    def query_streaming(
+        self,
+        features: t.Iterable[VpdqCompactFeature],
+        *,
+        chunk_size: int = VPDQ_STREAMING_CHUNK_SIZE,
+        min_query_frames: int = VPDQ_STREAMING_MIN_QUERY_FRAMES,
+        expected_query_frames: t.Optional[int] = None,
+    ) -> t.List[IndexMatch[IndexT]]:
+        """
+        Query with features as they are produced, stopping as soon as the result is known
+
+        Pair this with VPDQSignal.hash_from_file_streaming() to stop decoding
+        long videos early: features are consumed in chunks, and once the
+        result is decided, the rest of the input is not read (generators are
+        also close()d). See VPDQStreamingQuery for when that happens.
+
+        If the input is consumed entirely, the result is the same as query().
+        """
+        streaming_query = VPDQStreamingQuery(
+            self,
+            min_query_frames=min_query_frames,
+            expected_query_frames=expected_query_frames,
+        )
+        it = iter(features)
+        try:
+            chunk: t.List[VpdqCompactFeature] = []
+            for feature in it:
+                chunk.append(feature)
+                if len(chunk) >= chunk_size:
+                    if streaming_query.add(chunk):
+                        break
+                    chunk = []
+            else:
+                streaming_query.add(chunk)
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+        return streaming_query.matches()
+
+    def __setstate__(self, d: t.Dict[str, t.Any]) -> None:
+        """Implemented for pickle version compatibility."""
+        # Per-frame python objects => array-backed frame to video mapping
+        ### The old faiss index only has each unique frame once, so rebuild it
+        if "_entry_idx_to_features_and_entries" in d:
+            old_entries = d.pop("_entry_idx_to_features_and_entries")
+            del d["_index_idx_to_vpdqHex_and_entry"]
+            del d["_unique_vpdqHex_to_index_idx"]
+            d["index"] = VPDQHashIndex()
+            d["_entries"] = []
+            d["_video_offsets"] = np.zeros(1, dtype=np.int64)
+            d["_pending_frame_counts"] = []
+            self.__dict__ = d
+            for features, entry in old_entries:
+                self.index.add_hashes(vpdq_to_hash_array(features))
+                self._entries.append(entry)
+                self._pending_frame_counts.append(len(features))
+            return
+        self.__dict__ = d
+
+    @property
+    def video_offsets(self) -> np.ndarray:
+        """Video i's frames are [video_offsets[i], video_offsets[i + 1])"""
+        if self._pending_frame_counts:
+            self._video_offsets = np.concatenate(
+                (
+                    self._video_offsets,
+                    self._video_offsets[-1]
+                    + np.cumsum(self._pending_frame_counts, dtype=np.int64),
                 )
-        return matches
+            )
+            self._pending_frame_counts = []
+        return self._video_offsets
+
+    @property
+    def video_frame_counts(self) -> np.ndarray:
+        """The number of unique frames indexed for each video"""
+        return np.diff(self.video_offsets)
+
+    def _match_hashes(self, hashes: np.ndarray) -> t.Tuple[np.ndarray, np.ndarray]:
+        """
+        Search already filtered and deduped hashes against the index
+
+        Returns:
+            for each video, the number of query hashes matching any of its frames
+            the sorted, unique frame idxs that matched any query hash
+        """
+        video_count = len(self._entries)
+        if not len(hashes) or not video_count:
+            return np.zeros(video_count, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        limits, frames = self.index.range_search(hashes, VPDQ_DISTANCE_THRESHOLD)
+        query_idxs = np.repeat(np.arange(len(hashes)), np.diff(limits))
+        videos = self._frames_to_videos(frames)
+        # Group by (video, query hash) to count each query hash once per video
+        video_query_pairs = np.unique(videos * len(hashes) + query_idxs)
+        query_matched_counts = np.bincount(
+            video_query_pairs // len(hashes), minlength=video_count
+        )
+        return query_matched_counts, np.unique(frames)
+
+    def _frames_to_videos(self, frames: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.video_offsets, frames, side="right") - 1
+
+    def _matched_frame_counts(self, matched_frames: np.ndarray) -> np.ndarray:
+        """For each video, how many of its frames are in matched_frames"""
+        return np.bincount(
+            self._frames_to_videos(matched_frames), minlength=len(self._entries)
+        )
+
+    def _to_matches(
+        self,
+        query_frame_count: int,
+        query_matched_counts: np.ndarray,
+        index_matched_counts: np.ndarray,
+    ) -> t.List[IndexMatch[IndexT]]:
+        query_matched_percent = query_matched_counts * 100 / query_frame_count
+        index_matched_percent = index_matched_counts * 100 / self.video_frame_counts
+        matched_videos = np.flatnonzero(
+            (query_matched_counts > 0)
+            & (query_matched_percent >= self.query_match_threshold_pct)
+            & (index_matched_percent >= self.index_match_threshold_pct)
+        )
+        return [
+            IndexMatch(
+                VPDQSimilarityInfo(
+                    query_matched_percent[i].item(), index_matched_percent[i].item()
+                ),
+                self._entries[i],
+            )
+            for i in matched_videos
+        ]
+
+
+class VPDQStreamingQuery(t.Generic[IndexT]):
+    """
+    Running match tallies for a query video whose frames arrive over time
+
+    Add features with add() as they are hashed. Once it returns True, the
+    result is decided and the rest of the video doesn't need to be hashed:
+      1. Early match: at least min_query_frames unique frames have been seen,
+         and some indexed video passes both the query and index match
+         thresholds over the frames seen so far.
+      2. Early no-match: expected_query_frames (the total frame count of the
+         query, if known) shows that no indexed video could still reach the
+         query match threshold, even if every remaining frame matched.
+
+    Early matches are a (very good) approximation - the reported percentages
+    are over the frames seen so far, and a video that matches at the start
+    could diverge later. Early no-matches are exact.
+    """
+
+    def __init__(
+        self,
+        index: VPDQIndex[IndexT],
+        *,
+        min_query_frames: int = VPDQ_STREAMING_MIN_QUERY_FRAMES,
+        expected_query_frames: t.Optional[int] = None,
+    ) -> None:
+        self.index = index
+        self.min_query_frames = min_query_frames
+        self.expected_query_frames = expected_query_frames
+        # Counts of all frames (raw) and unique, quality-filtered frames
+        self.frames_seen = 0
+        self.unique_frames_seen = 0
+        self._seen_hashes: t.Set[str] = set()
+        self._query_matched_counts = np.zeros(len(index._entries), dtype=np.int64)
+        self._matched_frames = np.zeros(0, dtype=np.int64)
+        self.is_decided = False
+
+    def add(self, features: t.Sequence[VpdqCompactFeature]) -> bool:
+        """Add the next frames of the query video, returns is_decided"""
+        self.frames_seen += len(features)
+        new_features = [
+            f
+            for f in dedupe(
+                quality_filter(list(features), self.index.quality_threshold)
+            )
+            if f.pdq_hex not in self._seen_hashes
+        ]
+        self._seen_hashes.update(f.pdq_hex for f in new_features)
+        self.unique_frames_seen += len(new_features)
+
+        query_matched_counts, matched_frames = self.index._match_hashes(
+            vpdq_to_hash_array(new_features)
+        )
+        self._query_matched_counts += query_matched_counts
+        self._matched_frames = np.union1d(self._matched_frames, matched_frames)
+
+        self.is_decided = self.is_decided or self._can_stop_early()
+        return self.is_decided
+
+    def matches(self) -> t.List[IndexMatch[IndexT]]:
+        """The matches over the frames seen so far"""
+        if not self.unique_frames_seen:
+            return []
+        return self.index._to_matches(
+            self.unique_frames_seen,
+            self._query_matched_counts,
+            self.index._matched_frame_counts(self._matched_frames),
+        )
+
+    def _can_stop_early(self) -> bool:
+        if self.unique_frames_seen >= self.min_query_frames and self.matches():
+            return True
+        if self.expected_query_frames is None:
+            return False
+        remaining = max(self.expected_query_frames - self.frames_seen, 0)
+        total = self.unique_frames_seen + remaining
+        if total == 0:
+            return True
+        # Best case: every remaining frame is unique and matches
+        best_count = self._query_matched_counts.max(initial=0) + remaining
+        return best_count * 100 / total < self.index.query_match_threshold_pct
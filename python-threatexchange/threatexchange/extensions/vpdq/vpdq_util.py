@@ -1,12 +1,22 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
 import vpdq
+import base64
+import binascii
 import json
+import queue
+import threading
 import typing as t
 import pathlib
 from dataclasses import dataclass
 
-from threatexchange.signal_type.pdq.pdq_utils import PDQ_HEX_STR_LEN
+import numpy as np
+
+from threatexchange.signal_type.pdq.pdq_utils import (
+    PDQ_HEX_STR_LEN,
+    pdq_hashes_to_uint8_array,
+)
+from threatexchange.signal_type.signal_base import validate_hex_signals
 
 QUALITY = "quality"
 HASH = "hash"
@@ -16,6 +26,16 @@ VPDQ_QUALITY_THRESHOLD = 50
 VPDQ_DISTANCE_THRESHOLD = 31
 VPDQ_QUERY_MATCH_THRESHOLD_PERCENT = 80.0
 VPDQ_INDEX_MATCH_THRESHOLD_PERCENT = 0.0
+# For progressive (streaming) matching - how many frames to query at a time
+VPDQ_STREAMING_CHUNK_SIZE = 16
+# For progressive (streaming) matching - how many unique frames must be seen
+# before a match can be accepted early (~30 seconds at 1 hash per second)
+VPDQ_STREAMING_MIN_QUERY_FRAMES = 30
+# Marks the compact serialization - json serializations always start with "["
+VPDQ_COMPACT_PREFIX = "vpdqb1:"
+_COMPACT_HASH_BYTES = 32
+# hash + quality (uint8) + timestamp (float32)
+_COMPACT_FEATURE_BYTES = _COMPACT_HASH_BYTES + 1 + 4
 
 
 @dataclass
@@ -26,6 +46,23 @@ class VPDQMatchResult:
     compared_match_percent: float = 0.0
 
 
+@dataclass(frozen=True)
+class VpdqHashingConfig:
+    """
+    Tuning knobs for vpdq hashing, passed through to vpdq.computeHash()
+
+    The defaults match computeHash()'s defaults.
+    """
+
+    # How often to hash a frame. 0 hashes every frame
+    seconds_per_hash: float = 1.0
+    # Resize frames before hashing. 0 keeps the original dimension
+    downsample_width: int = 0
+    downsample_height: int = 0
+    # Hashing threads per video. 0 picks based on the number of cores
+    thread_count: int = 0
+
+
 @dataclass
 class VpdqCompactFeature:
     """A VPDQ Feature with a subset of fields needed for matching"""
@@ -64,13 +101,94 @@ class VpdqCompactFeature:
 
 
 def hash_file_compact(
-    filepath: str, seconds_per_hash: float = 1.0
+    filepath: str,
+    seconds_per_hash: float = 1.0,
+    config: VpdqHashingConfig = VpdqHashingConfig(),
 ) -> t.List[VpdqCompactFeature]:
     """Wrapper around computeHash to instead return compact features"""
-    vpdq_hashes = vpdq.computeHash(str(filepath), seconds_per_hash=seconds_per_hash)
+    vpdq_hashes = vpdq.computeHash(
+        str(filepath),
+        seconds_per_hash=seconds_per_hash,
+        downsample_width=config.downsample_width,
+        downsample_height=config.downsample_height,
+        thread_count=config.thread_count,
+    )
     return [VpdqCompactFeature.from_vpdq_feature(f) for f in vpdq_hashes]
 
 
+def iter_hash_file_compact(
+    filepath: str,
+    seconds_per_hash: float = 1.0,
+    config: VpdqHashingConfig = VpdqHashingConfig(),
+    *,
+    max_buffered: int = 64,
+) -> t.Iterator[VpdqCompactFeature]:
+    """
+    Like hash_file_compact(), but yields features in order as frames are hashed
+
+    Decoding happens in a background thread, at most max_buffered features
+    ahead of the consumer. Closing the generator early (i.e. `break`) stops
+    decoding the rest of the video.
+
+    Older versions of vpdq can't stream, in which case the whole video is
+    hashed before the first feature is yielded.
+    """
+    kwargs: t.Dict[str, t.Any] = {
+        "seconds_per_hash": seconds_per_hash,
+        "downsample_width": config.downsample_width,
+        "downsample_height": config.downsample_height,
+        "thread_count": config.thread_count,
+    }
+    if not hasattr(vpdq, "computeHashStreaming"):
+        for f in vpdq.computeHash(str(filepath), **kwargs):
+            yield VpdqCompactFeature.from_vpdq_feature(f)
+        return
+
+    buffer: "queue.Queue[t.Any]" = queue.Queue(maxsize=max_buffered)
+    stop = threading.Event()
+    done = object()
+    error: t.List[BaseException] = []
+
+    def on_feature(feature: vpdq.VpdqFeature) -> bool:
+        compact = VpdqCompactFeature.from_vpdq_feature(feature)
+        while not stop.is_set():
+            try:
+                buffer.put(compact, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def hash_in_background() -> None:
+        try:
+            vpdq.computeHashStreaming(str(filepath), on_feature, **kwargs)
+        except BaseException as e:
+            error.append(e)
+        finally:
+            buffer.put(done)
+
+    thread = threading.Thread(
+        target=hash_in_background, name="vpdq-streaming-hash", daemon=True
+    )
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                break
+            yield item
+        if error:
+            raise error[0]
+    finally:
+        stop.set()
+        # Unblock the background thread if it's waiting on a full buffer
+        while thread.is_alive():
+            try:
+                buffer.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
 def vpdq_to_json(
     vpdq_features: t.List[VpdqCompactFeature], *, indent: t.Optional[int] = None
 ) -> str:
@@ -79,10 +197,120 @@ def vpdq_to_json(
 
 
 def json_to_vpdq(json_str: str) -> t.List[VpdqCompactFeature]:
-    """Load a str as a json object and convert from json object to VPDQ features"""
+    """
+    Load a str as a json object and convert from json object to VPDQ features
+
+    Also accepts the compact serialization from vpdq_to_compact()
+    """
+    if json_str.startswith(VPDQ_COMPACT_PREFIX):
+        return compact_to_vpdq(json_str)
     return [VpdqCompactFeature.from_str(s) for s in json.loads(json_str or "[]")]
 
 
+def assert_valid_vpdq_str(signal_str: str) -> None:
+    """
+    Throws ValueError if json_to_vpdq() would, without a feature per frame
+
+    Every frame's hash, quality and timestamp is checked at once with numpy.
+    """
+    if signal_str.startswith(VPDQ_COMPACT_PREFIX):
+        compact_to_vpdq_arrays(signal_str)
+        return
+    frames = json.loads(signal_str or "[]")
+    if not isinstance(frames, list) or not all(isinstance(f, str) for f in frames):
+        raise ValueError("invalid vpdq serialization: not a list of str")
+    parts = [f.split(",") for f in frames]
+    if any(len(p) != 3 for p in parts):
+        raise ValueError("invalid vpdq serialization: wrong number of fields")
+    if not parts:
+        return
+    hexes, qualities, timestamps = zip(*parts)
+    if not validate_hex_signals([h.lower() for h in hexes], PDQ_HEX_STR_LEN).all():
+        raise ValueError("malformed pdq hash")
+    quality_arr = np.array(qualities).astype(np.int64)
+    if ((quality_arr < 0) | (quality_arr > 100)).any():
+        raise ValueError("invalid VPDQ quality")
+    if (np.array(timestamps).astype(np.float64) < 0).any():
+        raise ValueError("invalid timestamp")
+
+
+def vpdq_to_compact(vpdq_features: t.List[VpdqCompactFeature]) -> str:
+    """
+    Convert from VPDQ features to the compact serialization
+
+    This is VPDQ_COMPACT_PREFIX followed by the base64 of three columns:
+      1. The 32 byte PDQ hash of every feature
+      2. The quality of every feature, one byte each
+      3. The timestamp of every feature, as little-endian float32
+
+    which is ~50 characters per feature instead of ~80 for json, and can be
+    decoded without parsing or validating every feature (@see
+    compact_to_vpdq_arrays()).
+    """
+    for f in vpdq_features:
+        f.assert_valid()
+    raw = b"".join(
+        (
+            bytes.fromhex("".join(f.pdq_hex for f in vpdq_features)),
+            bytes(f.quality for f in vpdq_features),
+            np.array([f.timestamp for f in vpdq_features], dtype="<f4").tobytes(),
+        )
+    )
+    return VPDQ_COMPACT_PREFIX + base64.b64encode(raw).decode("ascii")
+
+
+def compact_to_vpdq_arrays(
+    compact_str: str,
+) -> t.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decode the compact serialization without creating a feature per frame
+
+    Returns:
+        hashes: (n, 32) uint8 array of PDQ hashes
+        qualities: (n,) uint8 array
+        timestamps: (n,) float32 array
+    """
+    if not compact_str.startswith(VPDQ_COMPACT_PREFIX):
+        raise ValueError("not a compact vpdq serialization")
+    try:
+        raw = base64.b64decode(compact_str[len(VPDQ_COMPACT_PREFIX) :], validate=True)
+    except binascii.Error:
+        raise ValueError("invalid compact vpdq serialization: bad base64")
+    n, remainder = divmod(len(raw), _COMPACT_FEATURE_BYTES)
+    if remainder:
+        raise ValueError("invalid compact vpdq serialization: bad length")
+    quality_offset = n * _COMPACT_HASH_BYTES
+    hashes = np.frombuffer(raw, dtype=np.uint8, count=quality_offset).reshape(
+        n, _COMPACT_HASH_BYTES
+    )
+    qualities = np.frombuffer(raw, dtype=np.uint8, count=n, offset=quality_offset)
+    timestamps = np.frombuffer(raw, dtype="<f4", count=n, offset=quality_offset + n)
+    if np.any(qualities > 100):
+        raise ValueError("invalid VPDQ quality")
+    if not np.all(np.isfinite(timestamps) & (timestamps >= 0)):
+        raise ValueError("invalid timestamp")
+    return hashes, qualities, timestamps
+
+
+def compact_to_vpdq(compact_str: str) -> t.List[VpdqCompactFeature]:
+    """Convert from the compact serialization back to VPDQ features"""
+    hashes, qualities, timestamps = compact_to_vpdq_arrays(compact_str)
+    return _arrays_to_vpdq(hashes, qualities, timestamps)
+
+
+def _arrays_to_vpdq(
+    hashes: np.ndarray, qualities: np.ndarray, timestamps: np.ndarray
+) -> t.List[VpdqCompactFeature]:
+    all_hex = hashes.tobytes().hex()
+    hex_len = _COMPACT_HASH_BYTES * 2
+    # float32 can't represent most decimals exactly, so undo the noise
+    rounded = np.round(timestamps.astype(np.float64), VPDQ_TIMESTAMP_PRECISION)
+    return [
+        VpdqCompactFeature(all_hex[i * hex_len : (i + 1) * hex_len], q, ts)
+        for i, (q, ts) in enumerate(zip(qualities.tolist(), rounded.tolist()))
+    ]
+
+
 def dedupe(features: t.List[VpdqCompactFeature]) -> t.List[VpdqCompactFeature]:
     """Filter out the VPDQ feature with exact same hash in a list of VPDQ features
 
@@ -171,5 +399,36 @@ def prepare_vpdq_feature(
     quality_tolerance : The quality tolerance of VPDQ Feature.
     If VPDQ Feature is below this quality level then it will not be added
     """
+    if signal_str.startswith(VPDQ_COMPACT_PREFIX):
+        return _arrays_to_vpdq(*_prepare_compact(signal_str, quality_tolerance))
     features = json_to_vpdq(signal_str)
     return dedupe(quality_filter(features, quality_tolerance))
+
+
+def prepare_vpdq_hashes(signal_str: str, quality_tolerance: int) -> np.ndarray:
+    """
+    Like prepare_vpdq_feature(), but only the hashes, as an (n, 32) uint8 array
+
+    For the compact serialization, this never creates a feature per frame.
+    """
+    if signal_str.startswith(VPDQ_COMPACT_PREFIX):
+        hashes, _, _ = _prepare_compact(signal_str, quality_tolerance)
+        return hashes
+    return vpdq_to_hash_array(prepare_vpdq_feature(signal_str, quality_tolerance))
+
+
+def vpdq_to_hash_array(features: t.Sequence[VpdqCompactFeature]) -> np.ndarray:
+    """The hashes of VPDQ features as an (n, 32) uint8 array"""
+    return pdq_hashes_to_uint8_array(f.pdq_hex for f in features)
+
+
+def _prepare_compact(
+    compact_str: str, quality_tolerance: int
+) -> t.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    hashes, qualities, timestamps = compact_to_vpdq_arrays(compact_str)
+    keep = np.flatnonzero(qualities >= quality_tolerance)
+    # Dedupe, keeping the first occurrence of each hash in order
+    rows = np.ascontiguousarray(hashes[keep]).view(f"V{_COMPACT_HASH_BYTES}")
+    _, first = np.unique(rows.ravel(), return_index=True)
+    keep = keep[np.sort(first)]
+    return hashes[keep], qualities[keep], timestamps[keep]
@@ -0,0 +1,284 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+Compact SignalTypeIndex implementations for signal types that only match exactly
+
+Rather than a Dict[str, List[T]], every signal is stored as a fixed width
+16 byte key in one sorted array, with the entries for duplicate keys in
+ranges of a parallel array, and lookups are binary searches.
+
+The serialized form is the same arrays written back to back, so it can be
+loaded without pickle, and memory mapped instead of read when it's a file.
+"""
+
+import hashlib
+import mmap
+import pickle
+import re
+import struct
+import typing as t
+
+import numpy as np
+
+from threatexchange.signal_type.index import (
+    IndexMatch,
+    SignalSimilarityInfo,
+    SignalTypeIndex,
+    T as IndexT,
+)
+from threatexchange.signal_type.signal_base import TrivialSignalTypeIndex
+
+KEY_BYTES = 16
+_KEY_DTYPE = np.dtype(f"V{KEY_BYTES}")
+_Self = t.TypeVar("_Self", bound="ExactMatchIndex")
+_MD5_RE = re.compile("^[0-9a-fA-F]{32}$")
+
+_MAGIC = b"TXEXACT\x01"
+# key kind, entries kind, padding, num keys, num entries, entries section bytes
+_HEADER = struct.Struct("<BB6xQQQ")
+_ALIGNMENT = 8
+
+# How entries are serialized, ints are by far the most common (OMM uses ids)
+_ENTRIES_INT64 = 0
+_ENTRIES_PICKLE = 1
+
+
+def _padding(size: int) -> int:
+    return -size % _ALIGNMENT
+
+
+class ExactMatchIndex(SignalTypeIndex[IndexT]):
+    """
+    Exact matches of any string, keyed by its MD5 digest
+
+    Keys are sorted on first query after an add, so build() or add_all()
+    before querying is much cheaper than interleaving the two.
+    """
+
+    # Written in the serialized header, so deserialize() can check it
+    _KEY_KIND: t.ClassVar[int] = 0
+
+    def __init__(self) -> None:
+        # Sorted and unique
+        self._keys: np.ndarray = np.empty(0, dtype=_KEY_DTYPE)
+        # Entries for _keys[i] are _entries[_offsets[i]:_offsets[i + 1]]
+        self._offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        # int64 array when every entry is an int, otherwise a list
+        self._entries: t.Union[np.ndarray, t.List[IndexT]] = np.empty(0, dtype=np.int64)
+        self._pending_keys = bytearray()
+        self._pending_entries: t.List[IndexT] = []
+
+    @classmethod
+    def signal_to_key(cls, signal_str: str) -> t.Optional[bytes]:
+        """The KEY_BYTES long key for a signal, or None if it's not valid"""
+        return hashlib.md5(signal_str.encode()).digest()
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._pending_entries)
+
+    def add(self, signal_str: str, entry: IndexT) -> None:
+        key = self.signal_to_key(signal_str)
+        if key is None:
+            raise ValueError(f"invalid signal for {self.__class__.__name__}")
+        self._pending_keys += key
+        self._pending_entries.append(entry)
+
+    def query(self, query: str) -> t.List[IndexMatch[IndexT]]:
+        self._consolidate()
+        key = self.signal_to_key(query)
+        if key is None or not len(self._keys):
+            return []
+        i = int(self._keys.searchsorted(np.frombuffer(key, dtype=_KEY_DTYPE)[0]))
+        if i == len(self._keys) or self._keys[i].tobytes() != key:
+            return []
+        return self._matches(int(self._offsets[i]), int(self._offsets[i + 1]))
+
+    def query_many(
+        self, queries: t.Sequence[str]
+    ) -> t.List[t.List[IndexMatch[IndexT]]]:
+        """query(), but for many signals at once, with one vectorized search"""
+        self._consolidate()
+        ret: t.List[t.List[IndexMatch[IndexT]]] = [[] for _ in queries]
+        keys = [self.signal_to_key(q) for q in queries]
+        valid = [i for i, key in enumerate(keys) if key is not None]
+        if not valid or not len(self._keys):
+            return ret
+        query_keys = np.frombuffer(
+            b"".join(t.cast(bytes, keys[i]) for i in valid), dtype=_KEY_DTYPE
+        )
+        idx = np.searchsorted(self._keys, query_keys)
+        found = idx < len(self._keys)
+        found[found] = self._keys[idx[found]] == query_keys[found]
+        starts = self._offsets[idx[found]].tolist()
+        ends = self._offsets[idx[found] + 1].tolist()
+        found_queries = np.flatnonzero(found).tolist()
+        for q, start, end in zip(found_queries, starts, ends):
+            ret[valid[q]] = self._matches(start, end)
+        return ret
+
+    def _matches(self, start: int, end: int) -> t.List[IndexMatch[IndexT]]:
+        entries = self._entries[start:end]
+        if isinstance(entries, np.ndarray):
+            entries = entries.tolist()
+        return [IndexMatch(SignalSimilarityInfo(), e) for e in entries]
+
+    def _consolidate(self) -> None:
+        """Merge pending adds into the sorted arrays"""
+        if not self._pending_entries:
+            return
+        counts = np.diff(self._offsets)
+        keys = np.concatenate(
+            (
+                np.repeat(self._keys, counts),
+                np.frombuffer(bytes(self._pending_keys), dtype=_KEY_DTYPE),
+            )
+        )
+        entries = self._merge_entries(self._entries, self._pending_entries)
+        # Sort as two big endian uint64s, which orders the same as the bytes.
+        # lexsort is stable, so entries for the same key stay in add order.
+        as_ints = keys.view(">u8").reshape(-1, 2)
+        order = np.lexsort((as_ints[:, 1], as_ints[:, 0]))
+        keys = keys[order]
+        if isinstance(entries, np.ndarray):
+            entries = entries[order]
+        else:
+            entries = [entries[i] for i in order.tolist()]
+        is_first = np.ones(len(keys), dtype=bool)
+        is_first[1:] = keys[1:] != keys[:-1]
+        starts = np.flatnonzero(is_first)
+        self._keys = keys[starts]
+        self._offsets = np.append(starts, len(keys)).astype(np.int64)
+        self._entries = entries
+        self._pending_keys = bytearray()
+        self._pending_entries = []
+
+    @staticmethod
+    def _merge_entries(
+        existing: t.Union[np.ndarray, t.List[IndexT]], new: t.List[IndexT]
+    ) -> t.Union[np.ndarray, t.List[IndexT]]:
+        if isinstance(existing, np.ndarray) and all(type(e) is int for e in new):
+            try:
+                return np.concatenate((existing, np.array(new, dtype=np.int64)))
+            except OverflowError:
+                pass
+        if isinstance(existing, np.ndarray):
+            existing = existing.tolist()
+        return existing + new
+
+    def __getstate__(self) -> t.Dict[str, t.Any]:
+        self._consolidate()
+        return self.__dict__
+
+    def serialize(self, fout: t.BinaryIO) -> None:
+        """
+        The sorted arrays, prefixed by a header
+
+        Entries that aren't all ints are the only part that uses pickle.
+        """
+        self._consolidate()
+        if isinstance(self._entries, np.ndarray):
+            entries_kind = _ENTRIES_INT64
+            entries_bytes = self._entries.astype("<i8").tobytes()
+        else:
+            entries_kind = _ENTRIES_PICKLE
+            entries_bytes = pickle.dumps(self._entries)
+        fout.write(_MAGIC)
+        fout.write(
+            _HEADER.pack(
+                self._KEY_KIND,
+                entries_kind,
+                len(self._keys),
+                len(self._entries),
+                len(entries_bytes),
+            )
+        )
+        for section in (
+            self._keys.tobytes(),
+            self._offsets.astype("<i8").tobytes(),
+            entries_bytes,
+        ):
+            fout.write(section)
+            fout.write(b"\0" * _padding(len(section)))
+
+    @classmethod
+    def deserialize(cls: t.Type[_Self], fin: t.BinaryIO) -> _Self:
+        """
+        Load from serialize(), memory mapping the arrays if fin is a file
+
+        Falls back to pickle for indices from before this format existed,
+        converting a pickled TrivialSignalTypeIndex to this class.
+        """
+        start = fin.tell()
+        if fin.read(len(_MAGIC)) != _MAGIC:
+            fin.seek(start)
+            old = pickle.loads(fin.read())
+            if isinstance(old, cls):
+                return old
+            if isinstance(old, TrivialSignalTypeIndex):
+                return cls.build(
+                    (signal_str, entry)
+                    for signal_str, entries in old.state.items()
+                    for entry in entries
+                )
+            raise ValueError(
+                f"can't load a pickled {old.__class__.__name__} as {cls.__name__}"
+            )
+        buf: t.Union[bytes, mmap.mmap]
+        try:
+            buf = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            # Not backed by a file (e.g. BytesIO)
+            fin.seek(start)
+            buf = fin.read()
+            start = 0
+        return cls._from_buffer(buf, start + len(_MAGIC))
+
+    @classmethod
+    def _from_buffer(
+        cls: t.Type[_Self], buf: t.Union[bytes, mmap.mmap], offset: int
+    ) -> _Self:
+        key_kind, entries_kind, num_keys, num_entries, entries_size = (
+            _HEADER.unpack_from(buf, offset)
+        )
+        if key_kind != cls._KEY_KIND:
+            raise ValueError(
+                f"serialized index has key kind {key_kind}, "
+                f"but {cls.__name__} expects {cls._KEY_KIND}"
+            )
+        offset += _HEADER.size
+
+        def section(size: int) -> memoryview:
+            nonlocal offset
+            ret = memoryview(buf)[offset : offset + size]
+            if len(ret) != size:
+                raise ValueError("serialized index is truncated")
+            offset += size + _padding(size)
+            return ret
+
+        ret = cls()
+        ret._keys = np.frombuffer(section(num_keys * KEY_BYTES), dtype=_KEY_DTYPE)
+        ret._offsets = np.frombuffer(section((num_keys + 1) * 8), dtype="<i8")
+        entries = section(entries_size)
+        if entries_kind == _ENTRIES_INT64:
+            ret._entries = np.frombuffer(entries, dtype="<i8")
+        else:
+            ret._entries = pickle.loads(entries)
+        if len(ret._entries) != num_entries:
+            raise ValueError("serialized index has the wrong number of entries")
+        return ret
+
+
+class MD5ExactMatchIndex(ExactMatchIndex[IndexT]):
+    """
+    Exact matches of MD5 hex digests, keyed by the digest's bytes
+
+    Hashes are case insensitive, and invalid query hashes match nothing.
+    """
+
+    _KEY_KIND = 1
+
+    @classmethod
+    def signal_to_key(cls, signal_str: str) -> t.Optional[bytes]:
+        if not _MD5_RE.match(signal_str):
+            return None
+        return bytes.fromhex(signal_str)
@@ -18,6 +18,7 @@ from threatexchange.exchanges.impl.fb_threatexchange_signal import (
     HasFbThreatExchangeIndicatorType,
 )
 from threatexchange.signal_type import signal_base
+from threatexchange.signal_type.exact_index import MD5ExactMatchIndex
 
 
 class VideoMD5Signal(
@@ -44,8 +45,8 @@ class VideoMD5Signal(
         return [VideoContent]
 
     @classmethod
-    def get_index_cls(cls) -> t.Type[signal_base.TrivialSignalTypeIndex]:
-        return signal_base.TrivialSignalTypeIndex
+    def get_index_cls(cls) -> t.Type[MD5ExactMatchIndex]:
+        return MD5ExactMatchIndex
 
     @classmethod
     def validate_signal_str(cls, signal_str: str) -> str:
@@ -54,6 +55,18 @@ class VideoMD5Signal(
             raise ValueError(f"{signal_str!r} is not a valid MD5 hash")
         return normalized
 
+    @classmethod
+    def validate_signals(
+        cls, signal_strs: t.Iterable[str]
+    ) -> signal_base.ValidatedSignals:
+        signal_strs = list(signal_strs)
+        normalized = [s.strip().lower() for s in signal_strs]
+        valid = signal_base.validate_hex_signals(normalized, 32)
+        return signal_base.ValidatedSignals(
+            [n if v else s for s, n, v in zip(signal_strs, normalized, valid.tolist())],
+            valid,
+        )
+
     @classmethod
     def hash_from_file(cls, path: pathlib.Path) -> str:
         file_hash = hashlib.md5()
@@ -6,11 +6,20 @@ import binascii
 import numpy
 from abc import ABC, abstractmethod
 
-from threatexchange.signal_type.pdq.pdq_utils import BITS_IN_PDQ
+from threatexchange.signal_type.pdq.pdq_utils import (
+    BITS_IN_PDQ,
+    pdq_hashes_to_uint8_array,
+)
 
 PDQ_HASH_TYPE = t.Union[str, bytes]
 
 
+def _hashes_to_vectors(hashes: t.Iterable[PDQ_HASH_TYPE]) -> numpy.ndarray:
+    return pdq_hashes_to_uint8_array(
+        h.decode() if isinstance(h, bytes) else h for h in hashes
+    )
+
+
 def uint64_to_int64(as_uint64: int):
     """
     Returns the int64 number represented by the same byte representation as the the provided integer if it was understood to
@@ -82,10 +91,7 @@ class PDQHashIndex(ABC):
             "0000000000000000000000000000000000000000000000000000000000000000" for a threshold of 16. Thus it would appear in
             the entry for both the hashes if they were both in the queries list.
         """
-        query_vectors = [
-            numpy.frombuffer(binascii.unhexlify(q), dtype=numpy.uint8) for q in queries
-        ]
-        qs = numpy.array(query_vectors)
+        qs = _hashes_to_vectors(queries)
         limits, _, I = self.faiss_index.range_search(qs, threshhold + 1)
 
         if return_as_ids:
@@ -98,7 +104,7 @@ class PDQHashIndex(ABC):
 
         return [
             [output_fn(idx.item()) for idx in I[limits[i] : limits[i + 1]]]
-            for i in range(len(query_vectors))
+            for i in range(len(qs))
         ]
 
     def search_with_distance_in_result(
@@ -120,10 +126,7 @@ class PDQHashIndex(ABC):
         }
         """
 
-        query_vectors = [
-            numpy.frombuffer(binascii.unhexlify(q), dtype=numpy.uint8) for q in queries
-        ]
-        qs = numpy.array(query_vectors)
+        qs = _hashes_to_vectors(queries)
         limits, similarities, I = self.faiss_index.range_search(qs, threshhold + 1)
 
         # for custom ids, we understood them initially as uint64 numbers and then coerced them internally to be signed
@@ -177,12 +180,9 @@ class PDQFlatHashIndex(PDQHashIndex):
             then the ids for the hashes will be assumed to be their respective index
             in hashes (i.e., the nth hash would have id n, starting from 0).
         """
-        hash_bytes = [binascii.unhexlify(hash) for hash in hashes]
-        vectors = list(
-            map(lambda h: numpy.frombuffer(h, dtype=numpy.uint8), hash_bytes)
-        )
+        vectors = _hashes_to_vectors(hashes)
         i64_ids = list(map(uint64_to_int64, custom_ids))
-        self.faiss_index.add_with_ids(numpy.array(vectors), numpy.array(i64_ids))
+        self.faiss_index.add_with_ids(vectors, numpy.array(i64_ids))
 
     def hash_at(self, idx: int) -> str:
         i64_id = uint64_to_int64(idx)
@@ -232,12 +232,9 @@ class PDQMultiHashIndex(PDQHashIndex):
         -------
         a PDQMultiHashIndex of these hashes
         """
-        hash_bytes = [binascii.unhexlify(hash) for hash in hashes]
-        vectors = list(
-            map(lambda h: numpy.frombuffer(h, dtype=numpy.uint8), hash_bytes)
-        )
+        vectors = _hashes_to_vectors(hashes)
         i64_ids = list(map(uint64_to_int64, custom_ids))
-        self.faiss_index.add_with_ids(numpy.array(vectors), numpy.array(i64_ids))
+        self.faiss_index.add_with_ids(vectors, numpy.array(i64_ids))
         self.__construct_index_rev_map()
 
     @property
@@ -7,7 +7,6 @@ import numpy as np
 from PIL import Image
 import typing as t
 
-
 PDQOutput = t.Tuple[
     str, int
 ]  # hexadecimal representation of the Hash vector and a numerical quality value
@@ -18,32 +17,23 @@ def pdq_from_file(path: pathlib.Path) -> PDQOutput:
     Given a path to a file return the PDQ Hash string in hex.
     Current tested against: jpg
     """
-    np_array = _convert_image_to_correct_array_dimension(Image.open(path))
-    return _pdq_from_numpy_array(np_array)
+    with Image.open(path) as image:
+        return pdq_from_image(image)
 
 
 def pdq_from_bytes(file_bytes: bytes) -> PDQOutput:
     """
     For the bytestream from an image file, compute PDQ Hash and quality.
     """
-    np_array = _convert_image_to_correct_array_dimension(
-        Image.open(io.BytesIO(file_bytes))
-    )
-    return _pdq_from_numpy_array(np_array)
-
-
-def _pdq_from_numpy_array(array: np.ndarray) -> PDQOutput:
-    hash_vector, quality = pdqhash.compute(array)
+    with Image.open(io.BytesIO(file_bytes)) as image:
+        return pdq_from_image(image)
 
-    bin_str = "".join([str(x) for x in hash_vector])
 
-    # binary to hex using format string
-    # '%0*' is for padding up to ceil(num_bits/4),
-    # '%X' create a hex representation from the binary string's integer value
-    hex_str = "%0*X" % ((len(bin_str) + 3) // 4, int(bin_str, 2))
-    hex_str = hex_str.lower()
-
-    return hex_str, quality
+def pdq_from_image(image: Image.Image) -> PDQOutput:
+    """
+    For an already open (or preprocessed) image, compute PDQ Hash and quality.
+    """
+    return _pdq_from_numpy_array(_convert_image_to_correct_array_dimension(image))
 
 
 def _convert_image_to_correct_array_dimension(image: Image.Image) -> np.ndarray:
@@ -63,3 +53,17 @@ def _convert_image_to_correct_array_dimension(image: Image.Image) -> np.ndarray:
         array = np.concatenate([array[..., np.newaxis]] * 3, axis=2)
 
     return array
+
+
+def _pdq_from_numpy_array(array: np.ndarray) -> PDQOutput:
+    hash_vector, quality = pdqhash.compute(array)
+
+    bin_str = "".join([str(x) for x in hash_vector])
+
+    # binary to hex using format string
+    # '%0*' is for padding up to ceil(num_bits/4),
+    # '%X' create a hex representation from the binary string's integer value
+    hex_str = "%0*X" % ((len(bin_str) + 3) // 4, int(bin_str, 2))
+    hex_str = hex_str.lower()
+
+    return hex_str, quality
@@ -1,11 +1,13 @@
 #!/usr/bin/env python
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
+import sys
 import numpy as np
 import typing as t
 
 BITS_IN_PDQ = 256
 PDQ_HEX_STR_LEN = int(BITS_IN_PDQ / 4)
+PDQ_BYTES = BITS_IN_PDQ // 8
 # Hashes of distance less than or equal to this threshold are considered a 'match'
 PDQ_CONFIDENT_MATCH_THRESHOLD = 31
 
@@ -19,11 +21,33 @@ def simple_distance_binary(bin_a: str, bin_b: str) -> int:
     return sum(bin_a[i] != bin_b[i] for i in range(BITS_IN_PDQ))
 
 
+if sys.version_info >= (3, 10):
+
+    def _popcount(x: int) -> int:
+        return x.bit_count()
+
+else:
+
+    def _popcount(x: int) -> int:
+        return bin(x).count("1")
+
+
 def simple_distance(hex_a: str, hex_b: str) -> int:
     """
     Returns the binary hamming distance of two hexadecimal strings.
     """
-    return simple_distance_binary(hex_to_binary_str(hex_a), hex_to_binary_str(hex_b))
+    assert len(hex_a) == PDQ_HEX_STR_LEN
+    assert len(hex_b) == PDQ_HEX_STR_LEN
+    return simple_distance_int(int(hex_a, 16), int(hex_b, 16))
+
+
+def simple_distance_int(int_a: int, int_b: int) -> int:
+    """
+    Returns the hamming distance of two hashes as ints, i.e. int(pdq_hex, 16)
+
+    If comparing the same hashes many times, converting them once is faster.
+    """
+    return _popcount(int_a ^ int_b)
 
 
 def hex_to_binary_str(pdq_hex: str) -> str:
@@ -59,13 +83,56 @@ def pdq_match(pdq_hex_a: str, pdq_hex_b: str, threshold: int) -> bool:
 def convert_pdq_strings_to_ndarray(pdq_strings: t.Iterable[str]) -> np.ndarray:
     """
     Convert multiple PDQ hash strings to a numpy array.
+
+    Returns an (n, BITS_IN_PDQ) uint8 array, one bit per element.
+    """
+    return np.unpackbits(pdq_hashes_to_uint8_array(pdq_strings), axis=1)
+
+
+def pdq_hashes_to_uint8_array(pdq_strings: t.Iterable[str]) -> np.ndarray:
+    """
+    Convert multiple PDQ hash strings to an (n, PDQ_BYTES) uint8 array
+
+    All the hashes are converted at once, rather than one at a time.
+    """
+    pdq_strings = list(pdq_strings)
+    if any(len(pdq_str) != PDQ_HEX_STR_LEN for pdq_str in pdq_strings):
+        raise ValueError("PDQ hash string must be 64 hex characters long")
+    return np.frombuffer(bytes.fromhex("".join(pdq_strings)), dtype=np.uint8).reshape(
+        -1, PDQ_BYTES
+    )
+
+
+# [byte] => number of bits set, for numpy without bitwise_count (< 2.0)
+_POPCOUNT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(
+    axis=1, dtype=np.uint8
+)
+# Caps temporary memory at ~this many bytes, per pdq_distance_matrix() call
+_DISTANCE_MATRIX_BLOCK_BYTES = 1 << 26
+
+
+def _popcount_uint64(x: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    bytes_set = _POPCOUNT_TABLE[x.view(np.uint8)].reshape(*x.shape, 8)
+    return bytes_set.sum(axis=-1, dtype=np.int32)
+
+
+def pdq_distance_matrix(hashes_a: np.ndarray, hashes_b: np.ndarray) -> np.ndarray:
     """
-    binary_arrays = []
-    for pdq_str in pdq_strings:
-        if len(pdq_str) != PDQ_HEX_STR_LEN:
-            raise ValueError("PDQ hash string must be 64 hex characters long")
-        hash_bytes = bytes.fromhex(pdq_str)
-        binary_array = np.unpackbits(np.frombuffer(hash_bytes, dtype=np.uint8))
-        binary_arrays.append(binary_array)
+    Hamming distance between every pair of hashes from two uint8 arrays
 
-    return np.array(binary_arrays, dtype=np.uint8)
+    Both arrays are (n, PDQ_BYTES), i.e. from pdq_hashes_to_uint8_array().
+    Returns an (len(hashes_a), len(hashes_b)) int32 array.
+    """
+    # XOR and popcount 8 bytes at a time
+    a = np.ascontiguousarray(hashes_a, dtype=np.uint8).view(np.uint64)
+    b = np.ascontiguousarray(hashes_b, dtype=np.uint8).view(np.uint64)
+    ret = np.zeros((len(a), len(b)), dtype=np.int32)
+    rows_per_block = max(1, _DISTANCE_MATRIX_BLOCK_BYTES // (max(len(b), 1) * 8))
+    for start in range(0, len(a), rows_per_block):
+        block = a[start : start + rows_per_block]
+        out = ret[start : start + rows_per_block]
+        for word in range(a.shape[1]):
+            out += _popcount_uint64(block[:, word, None] ^ b[None, :, word])
+    return ret
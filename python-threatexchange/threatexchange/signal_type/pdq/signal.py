@@ -59,10 +59,19 @@ class PdqSignal(
     @classmethod
     def validate_signal_str(cls, signal_str: str) -> str:
         """PDQ hash contains 64 hexidecimal characters."""
-        if not re.match("^[0-9a-f]{64}$", signal_str):
+        if not re.fullmatch("[0-9a-f]{64}", signal_str):
             raise ValueError("invalid PDQ hash")
         return signal_str
 
+    @classmethod
+    def validate_signals(
+        cls, signal_strs: t.Iterable[str]
+    ) -> signal_base.ValidatedSignals:
+        signal_strs = list(signal_strs)
+        return signal_base.ValidatedSignals(
+            signal_strs, signal_base.validate_hex_signals(signal_strs, 64)
+        )
+
     @classmethod
     def compare_hash(
         cls,
@@ -5,10 +5,14 @@
 Wrapper around the raw text signal type.
 """
 
+import array
 from dataclasses import dataclass
+import math
+import random
 import typing as t
 
 import Levenshtein
+import numpy as np
 
 from threatexchange import common
 from threatexchange.content_type.content_base import ContentType
@@ -49,9 +53,14 @@ class RawTextDistance(index.SignalSimilarityInfo):
         return f"{(self.match_fraction) * 100:.0f}%"
 
 
+def _max_match_distance(normalized: str, pct_diff_threshold: float) -> float:
+    return len(normalized) - len(normalized) * (100 - pct_diff_threshold) / 100
+
+
 class RawTextSignal(
     signal_base.SimpleSignalType,
     signal_base.MatchesStr,
+    signal_base.CanGenerateRandomSignal,
     HasFbThreatExchangeIndicatorType,
 ):
     """
@@ -72,10 +81,19 @@ class RawTextSignal(
     def matches_str(
         cls, signal: str, haystack: str, pct_diff_threshold: float = 5.0
     ) -> signal_base.SignalComparisonResult:
+        return cls.matches_normalized_str(
+            common.normalize_string(signal),
+            common.normalize_string(haystack),
+            pct_diff_threshold,
+        )
+
+    @classmethod
+    def matches_normalized_str(
+        cls, a: str, b: str, pct_diff_threshold: float = 5.0
+    ) -> signal_base.SignalComparisonResult:
+        """matches_str() for strings already passed through normalize_string()"""
         assert 0 < pct_diff_threshold <= 100
-        a = common.normalize_string(signal)
-        b = common.normalize_string(haystack)
-        max_match_distance = len(a) - len(a) * (100 - pct_diff_threshold) / 100
+        max_match_distance = _max_match_distance(a, pct_diff_threshold)
 
         ldiff = abs(len(a) - len(b))
 
@@ -92,7 +110,11 @@ class RawTextSignal(
 
     @classmethod
     def get_index_cls(cls) -> t.Type[index.SignalTypeIndex]:
-        return LevenshteinLinearSearch
+        return LevenshteinQGramIndex
+
+    @classmethod
+    def get_random_signal(cls) -> str:
+        return " ".join(signal_base.random_words(random.randint(5, 50)))
 
     @staticmethod
     def get_examples() -> t.List[str]:
@@ -113,3 +135,85 @@ class RawTextSignal(
 class LevenshteinLinearSearch(signal_base.TrivialLinearSearchMatchIndex):
     _SIGNAL_TYPE = RawTextSignal
     # Could also convert these on ingestion
+
+
+class LevenshteinQGramIndex(index.SignalTypeIndex[index.T]):
+    """
+    Finds the same matches as LevenshteinLinearSearch, without comparing to everything
+
+    Strings are normalized once on add(), and only strings that survive two
+    filters are compared with Levenshtein:
+      1. Length: a string can't be within distance k of the query if their
+         lengths differ by more than k.
+      2. Shared q-grams: each edit touches at most Q of a string's q-grams,
+         so within distance k, at least (distinct q-grams - k * Q) of them
+         must also be in the query. This only helps for strings long enough
+         that the bound is positive - the rest fall back on the length filter.
+    """
+
+    Q = 3
+
+    def __init__(self, pct_diff_threshold: float = 5.0) -> None:
+        assert 0 < pct_diff_threshold <= 100
+        self.pct_diff_threshold = pct_diff_threshold
+        self._normalized: t.List[str] = []
+        self._entries: t.List[index.T] = []
+        # Parallel to _normalized, as int32 so queries can vectorize over them
+        self._lengths = array.array("i")
+        self._max_distances = array.array("i")
+        self._min_shared_qgrams = array.array("i")
+        # q-gram => idx of every string containing it
+        self._postings: t.Dict[str, array.array] = {}
+
+    def add(self, signal_str: str, entry: index.T) -> None:
+        normalized = common.normalize_string(signal_str)
+        max_distance = math.floor(
+            _max_match_distance(normalized, self.pct_diff_threshold)
+        )
+        qgrams = self._qgrams(normalized)
+        idx = len(self._normalized)
+        self._normalized.append(normalized)
+        self._entries.append(entry)
+        self._lengths.append(len(normalized))
+        self._max_distances.append(max_distance)
+        self._min_shared_qgrams.append(len(qgrams) - max_distance * self.Q)
+        for qgram in qgrams:
+            self._postings.setdefault(qgram, array.array("i")).append(idx)
+
+    def query(self, query_hash: str) -> t.List[index.IndexMatch[index.T]]:
+        if not self._normalized:
+            return []
+        needle = common.normalize_string(query_hash)
+        shared_qgrams = np.zeros(len(self._normalized), dtype=np.int32)
+        for qgram in self._qgrams(needle):
+            posting = self._postings.get(qgram)
+            if posting is not None:
+                # Each string appears at most once per posting
+                shared_qgrams[np.frombuffer(posting, dtype=np.int32)] += 1
+        max_distances = np.frombuffer(self._max_distances, dtype=np.int32)
+        candidates = np.flatnonzero(
+            (
+                np.abs(np.frombuffer(self._lengths, dtype=np.int32) - len(needle))
+                <= max_distances
+            )
+            & (shared_qgrams >= np.frombuffer(self._min_shared_qgrams, dtype=np.int32))
+        )
+        ret = []
+        for idx in candidates.tolist():
+            normalized = self._normalized[idx]
+            max_distance = max_distances[idx].item()
+            distance: int = Levenshtein.distance(
+                normalized, needle, score_cutoff=max_distance
+            )
+            if distance <= max_distance:
+                ret.append(
+                    index.IndexMatch(
+                        RawTextDistance.from_levenshtein(normalized, distance),
+                        self._entries[idx],
+                    )
+                )
+        return ret
+
+    @classmethod
+    def _qgrams(cls, normalized: str) -> t.Set[str]:
+        return {normalized[i : i + cls.Q] for i in range(len(normalized) - cls.Q + 1)}
@@ -5,9 +5,14 @@ Core abstractions for signal types.
 """
 
 import abc
+from dataclasses import dataclass
 import pathlib
+import random
+import string
 import typing as t
 
+import numpy as np
+
 from threatexchange import common
 from threatexchange.content_type import content_base
 from threatexchange.signal_type import index
@@ -53,6 +58,71 @@ class SignalComparisonResult(t.NamedTuple):
         )
 
 
+@dataclass
+class ValidatedSignals:
+    """The result of SignalType.validate_signals()"""
+
+    # Normalized if valid, otherwise as given
+    signals: t.List[str]
+    # bool array, parallel to signals
+    valid: np.ndarray
+
+    @property
+    def invalid(self) -> np.ndarray:
+        return ~self.valid
+
+    def valid_signals(self) -> t.List[str]:
+        return [s for s, valid in zip(self.signals, self.valid.tolist()) if valid]
+
+
+def _hex_char_table(letters: bytes) -> np.ndarray:
+    """[ascii char] => whether it's a hex digit with these letters"""
+    table = np.zeros(256, dtype=bool)
+    table[list(b"0123456789" + letters)] = True
+    return table
+
+
+_IS_LOWER_HEX = _hex_char_table(b"abcdef")
+_IS_UPPER_HEX = _hex_char_table(b"ABCDEF")
+
+
+def validate_hex_signals(
+    signal_strs: t.Sequence[str],
+    hex_len: int,
+    *,
+    prefix: str = "",
+    lowercase: bool = True,
+) -> np.ndarray:
+    """
+    Vectorized check that each str is prefix followed by hex_len hex chars
+
+    Returns a bool array. Only the case given by lowercase is valid.
+    """
+    width = len(prefix) + hex_len
+    lengths = np.fromiter(map(len, signal_strs), dtype=np.int64, count=len(signal_strs))
+    valid = lengths == width
+    candidates = np.flatnonzero(valid)
+    if len(candidates) == len(signal_strs):
+        joined = "".join(signal_strs)
+    else:
+        joined = "".join([signal_strs[i] for i in candidates.tolist()])
+    if not joined.isascii():  # Rare, so only then check one at a time
+        valid[candidates] = [signal_strs[i].isascii() for i in candidates.tolist()]
+        candidates = np.flatnonzero(valid)
+        joined = "".join([signal_strs[i] for i in candidates.tolist()])
+    if not len(candidates):
+        return valid
+    chars = np.frombuffer(joined.encode("ascii"), dtype=np.uint8).reshape(-1, width)
+    hex_chars = chars[:, len(prefix) :]
+    is_hex = _IS_LOWER_HEX if lowercase else _IS_UPPER_HEX
+    row_valid = is_hex[hex_chars].all(axis=1)
+    if prefix:
+        prefix_bytes = np.frombuffer(prefix.encode(), dtype=np.uint8)
+        row_valid &= (chars[:, : len(prefix)] == prefix_bytes).all(axis=1)
+    valid[candidates] = row_valid
+    return valid
+
+
 class SignalType(abc.ABC):
     """
     Abstraction for different signal types.
@@ -102,6 +172,25 @@ class SignalType(abc.ABC):
             raise ValueError("empty hash")
         return signal_str.strip()
 
+    @classmethod
+    def validate_signals(cls, signal_strs: t.Iterable[str]) -> ValidatedSignals:
+        """
+        validate_signal_str(), but for many signals at once
+
+        Rather than throwing, returns which signals are valid. Override with
+        a faster (i.e. vectorized) version when there is one.
+        """
+        signals = []
+        valid = []
+        for signal_str in signal_strs:
+            try:
+                signals.append(cls.validate_signal_str(signal_str))
+                valid.append(True)
+            except Exception:
+                signals.append(signal_str)
+                valid.append(False)
+        return ValidatedSignals(signals, np.array(valid, dtype=bool))
+
     @staticmethod
     @abc.abstractmethod
     def get_examples() -> t.List[str]:
@@ -297,3 +386,11 @@ class CanGenerateRandomSignal(metaclass=abc.ABCMeta):
         This is meant to help with loadtesting, though it's okay if this
         implementation may return duplicates.
         """
+
+
+def random_words(num_words: int) -> t.List[str]:
+    """Random lowercase "words", for get_random_signal() on text-based types"""
+    return [
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(2, 10)))
+        for _ in range(num_words)
+    ]
@@ -77,6 +77,7 @@ class SignalTypeAutoTest(SignalTypeHashTest):
         raise NotImplementedError
 
     def test_validate_hash(self):
+        cases = []
         for t in self.get_validate_hash_cases():
             if isinstance(t, str):
                 t = (t, None)
@@ -85,6 +86,17 @@ class SignalTypeAutoTest(SignalTypeHashTest):
                 self.assert_signal_str_invalid(s, expected)
             else:
                 self.assert_signal_str_valid(s, expected)
+            cases.append((s, expected))
+        # The batch version should agree
+        validated = self.TYPE.validate_signals(s for s, _ in cases)
+        for (s, expected), signal, valid in zip(
+            cases, validated.signals, validated.valid.tolist()
+        ):
+            if isinstance(expected, type):
+                assert not valid, f"Case: {s}"
+            else:
+                assert valid, f"Case: {s}"
+                assert signal == (s if expected is None else expected)
 
     def get_compare_hash_cases(self) -> t.Iterable[THashValidateCase]:
         raise NotImplementedError
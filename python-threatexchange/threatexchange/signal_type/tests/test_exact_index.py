@@ -0,0 +1,118 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import io
+import pickle
+import random
+
+import pytest
+
+from threatexchange.signal_type.exact_index import ExactMatchIndex, MD5ExactMatchIndex
+from threatexchange.signal_type.md5 import VideoMD5Signal
+from threatexchange.signal_type.signal_base import (
+    TrivialLinearSearchHashIndex,
+    TrivialSignalTypeIndex,
+)
+
+
+def random_md5s(n):
+    return [VideoMD5Signal.get_random_signal() for _ in range(n)]
+
+
+def build_entries(signals):
+    # Duplicates, and adds interleaved with other signals
+    entries = [(s, i) for i, s in enumerate(signals)]
+    entries += [(s, i + len(signals)) for i, s in enumerate(signals[::3])]
+    random.shuffle(entries)
+    return entries
+
+
+def query_all(index, signals):
+    return [sorted(m.metadata for m in index.query(s)) for s in signals]
+
+
+@pytest.mark.parametrize("index_cls", [ExactMatchIndex, MD5ExactMatchIndex])
+def test_same_as_trivial(index_cls):
+    signals = random_md5s(300)
+    entries = build_entries(signals)
+    index = index_cls.build(entries)
+    expected = TrivialSignalTypeIndex.build(entries)
+    queries = signals + random_md5s(20) + ["not a hash", ""]
+    assert query_all(index, queries) == query_all(expected, queries)
+    assert [sorted(m.metadata for m in ms) for ms in index.query_many(queries)] == (
+        query_all(expected, queries)
+    )
+    assert len(index) == len(entries)
+
+
+def test_add_after_query():
+    signals = random_md5s(10)
+    index = MD5ExactMatchIndex.build((s, i) for i, s in enumerate(signals[:5]))
+    assert query_all(index, signals[:1]) == [[0]]
+    index.add_all((s, i + 5) for i, s in enumerate(signals[5:]))
+    index.add(signals[0], 10)
+    assert query_all(index, signals) == [[0, 10]] + [[i] for i in range(1, 10)]
+
+
+def test_md5_case_insensitive():
+    index = MD5ExactMatchIndex.build([("AB" * 16, 1)])
+    assert query_all(index, ["ab" * 16, "Ab" * 16, "ab" * 15]) == [[1], [1], []]
+    with pytest.raises(ValueError):
+        index.add("not a hash", 2)
+
+
+def test_entries_kept_in_add_order():
+    index = ExactMatchIndex.build([("a", 3), ("b", 0), ("a", 1), ("a", 2)])
+    assert [m.metadata for m in index.query("a")] == [3, 1, 2]
+
+
+@pytest.mark.parametrize("metadata", [lambda i: i, lambda i: f"entry {i}"])
+def test_serialize(tmp_path, metadata):
+    signals = random_md5s(100)
+    entries = [(s, metadata(i)) for i, s in enumerate(signals)]
+    index = MD5ExactMatchIndex.build(entries)
+    queries = signals + random_md5s(10)
+    expected = query_all(index, queries)
+
+    path = tmp_path / "index"
+    with path.open("wb") as f:
+        index.serialize(f)
+    with path.open("rb") as f:
+        mapped = MD5ExactMatchIndex.deserialize(f)
+    assert query_all(mapped, queries) == expected
+
+    buf = io.BytesIO()
+    index.serialize(buf)
+    buf.seek(0)
+    from_bytes = MD5ExactMatchIndex.deserialize(buf)
+    assert query_all(from_bytes, queries) == expected
+    # Still writable after loading
+    from_bytes.add(queries[-1], metadata(1000))
+    assert query_all(from_bytes, queries[-1:]) == [[metadata(1000)]]
+
+    assert query_all(pickle.loads(pickle.dumps(mapped)), queries) == expected
+
+
+def test_deserialize_errors():
+    buf = io.BytesIO()
+    MD5ExactMatchIndex.build([("ab" * 16, 1)]).serialize(buf)
+    with pytest.raises(ValueError):
+        ExactMatchIndex.deserialize(io.BytesIO(buf.getvalue()))
+    with pytest.raises(ValueError):
+        MD5ExactMatchIndex.deserialize(io.BytesIO(buf.getvalue()[:-16]))
+
+
+def test_deserialize_pickled_trivial_index():
+    buf = io.BytesIO()
+    TrivialSignalTypeIndex.build([("ab" * 16, 1), ("cd" * 16, 2)]).serialize(buf)
+    buf.seek(0)
+    index = MD5ExactMatchIndex.deserialize(buf)
+    assert isinstance(index, MD5ExactMatchIndex)
+    assert query_all(index, ["ab" * 16, "cd" * 16]) == [[1], [2]]
+
+
+def test_deserialize_pickled_other_index():
+    buf = io.BytesIO()
+    TrivialLinearSearchHashIndex.build([("ab" * 16, 1)]).serialize(buf)
+    buf.seek(0)
+    with pytest.raises(ValueError, match="TrivialLinearSearchHashIndex"):
+        MD5ExactMatchIndex.deserialize(buf)
@@ -1,7 +1,14 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
+import random
+import string
+
 import pytest
-from threatexchange.signal_type.raw_text import RawTextSignal
+from threatexchange.signal_type.raw_text import (
+    LevenshteinLinearSearch,
+    LevenshteinQGramIndex,
+    RawTextSignal,
+)
 from threatexchange.signal_type.tests.signal_type_test_helper import (
     MatchesStrAutoTest,
     THashValidateCase,
@@ -49,3 +56,58 @@ class TestRawTextSignal(MatchesStrAutoTest):
         assert validated == expected_str, (
             f"Expected {expected_str} for input {input_val}, but got " f"{validated}"
         )
+
+
+def _perturb(rng: random.Random, s: str, edits: int) -> str:
+    chars = list(s)
+    for _ in range(edits):
+        i = rng.randrange(len(chars) + 1)
+        op = rng.randrange(3)
+        c = rng.choice(string.ascii_lowercase)
+        if op == 0 or i == len(chars):
+            chars.insert(i, c)
+        elif op == 1:
+            chars[i] = c
+        else:
+            del chars[i]
+    return "".join(chars)
+
+
+def _match_set(matches) -> t.Set[t.Tuple[int, int]]:
+    return {(m.metadata, m.similarity_info.distance) for m in matches}
+
+
+def test_qgram_index_same_as_linear_search() -> None:
+    rng = random.Random(42)
+    words = ["".join(rng.choices("abcdef", k=rng.randint(1, 8))) for _ in range(50)]
+    texts = [" ".join(rng.choices(words, k=rng.randint(1, 30))) for _ in range(300)] + [
+        "",
+        "a",
+        "ab",
+        "abc",
+    ]
+    entries = list(zip(texts, range(len(texts))))
+    linear = LevenshteinLinearSearch.build(entries)
+    qgram = LevenshteinQGramIndex.build(entries)
+    assert RawTextSignal.get_index_cls() is LevenshteinQGramIndex
+
+    queries = [_perturb(rng, rng.choice(texts), rng.randint(0, 6)) for _ in range(300)]
+    queries += ["", "a", "abc", "abcd"]
+    found = 0
+    for query in queries:
+        expected = _match_set(linear.query(query))
+        assert _match_set(qgram.query(query)) == expected, query
+        found += len(expected)
+    assert found > 100  # Actually tested something
+
+
+def test_qgram_index_threshold() -> None:
+    base = "the quick brown fox jumps over the lazy dog " * 2
+    index: LevenshteinQGramIndex[str] = LevenshteinQGramIndex(pct_diff_threshold=10)
+    index.add(base, "a")
+    assert [m.metadata for m in index.query(base.upper())] == ["a"]
+    # 70 chars after normalization, so up to 7 edits
+    normalized = base.replace(" ", "")
+    assert len(normalized) == 70
+    assert len(index.query(normalized[:-7])) == 1
+    assert len(index.query(normalized[:-8])) == 0
@@ -0,0 +1,70 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import json
+import random
+import typing as t
+
+from threatexchange.signal_type.trend_query import (
+    TrendQuery,
+    TrendQueryIndex,
+    TrendQuerySignal,
+)
+
+TERMS = [
+    "ball",
+    "basket",
+    "basket ball",
+    "basket-ball",
+    "basketball",
+    "-ball",
+    "ball!",
+    "_x",
+    "x",
+    "café",
+    "",
+    "regex-/b+all/",
+    "regex-/^basket/",
+    "regex-/\\d{2}/",
+]
+WORDS = ["ball", "basket", "basketball", "-", "!", "_", "x", "café", "12", "1"]
+
+
+def test_same_as_trend_query_matches() -> None:
+    rng = random.Random(7)
+    queries = [
+        json.dumps(
+            {
+                "and": [
+                    {"or": rng.sample(TERMS, rng.randint(1, 3))}
+                    for _ in range(rng.randint(0, 3))
+                ],
+                "not": rng.sample(TERMS, rng.randint(0, 2)),
+            }
+        )
+        for _ in range(200)
+    ] + TrendQuerySignal.get_examples()
+    index = TrendQueryIndex.build((q, i) for i, q in enumerate(queries))
+    index.add(queries[0], -1)  # Same query, second value
+
+    texts = [
+        rng.choice(["", " "]).join(rng.choices(WORDS, k=rng.randint(0, 6)))
+        for _ in range(300)
+    ] + ["bball now?", "basket ball tonight", "basketball tomorrow"]
+    found = 0
+    for text in texts:
+        expected = {
+            i for i, q in enumerate(queries) if TrendQuery(json.loads(q)).matches(text)
+        }
+        if 0 in expected:
+            expected.add(-1)
+        assert {m.metadata for m in index.query(text)} == expected, text
+        found += len(expected)
+    assert found > 100  # Actually tested something
+
+
+def test_add_after_query() -> None:
+    index: TrendQueryIndex[str] = TrendQueryIndex()
+    assert index.query("hoops today") == []
+    index.add(TrendQuerySignal.get_examples()[0], "example")
+    assert [m.metadata for m in index.query("hoops today")] == ["example"]
+    assert index.query("hoops tomorrow") == []
@@ -0,0 +1,110 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import pytest
+
+from threatexchange.cli.main import _DEFAULT_SIGNAL_TYPES
+from threatexchange.signal_type.md5 import VideoMD5Signal
+from threatexchange.signal_type.pdq.signal import PdqSignal
+from threatexchange.signal_type.raw_text import RawTextSignal
+from threatexchange.signal_type.trend_query import TrendQuerySignal
+from threatexchange.signal_type.signal_base import (
+    CanGenerateRandomSignal,
+    validate_hex_signals,
+)
+
+PDQ = "f8f8f0cee0f4a84f06370a22038f63f0b36e2ed596621e1d33e6b39c4e9c9b22"
+MD5 = "cab08b36195edb1a1231d2d09fa450e0"
+
+
+def assert_same_as_validate_signal_str(signal_type, signal_strs):
+    validated = signal_type.validate_signals(signal_strs)
+    assert len(validated.signals) == len(signal_strs)
+    for s, signal, valid in zip(
+        signal_strs, validated.signals, validated.valid.tolist()
+    ):
+        try:
+            expected = signal_type.validate_signal_str(s)
+        except ValueError:
+            assert not valid, f"Case: {s!r}"
+            assert signal == s
+        else:
+            assert valid, f"Case: {s!r}"
+            assert signal == expected
+
+
+@pytest.mark.parametrize(
+    "signal_type, signal_strs",
+    [
+        (
+            PdqSignal,
+            [
+                PDQ,
+                PDQ.upper(),
+                PDQ[:-1],
+                PDQ + "0",
+                PDQ[:-1] + "g",
+                PDQ + "\n",
+                " " + PDQ[1:],
+                "é" + PDQ[2:],
+                "",
+            ],
+        ),
+        (
+            VideoMD5Signal,
+            [MD5, f" {MD5.upper()}\n", MD5[:-1], MD5[:-1] + "z", "", "   "],
+        ),
+        (RawTextSignal, ["a", " a ", ""]),
+    ],
+)
+def test_same_as_validate_signal_str(signal_type, signal_strs):
+    assert_same_as_validate_signal_str(signal_type, signal_strs)
+
+
+def test_masks():
+    validated = PdqSignal.validate_signals(iter([PDQ, "x", PDQ]))
+    assert validated.valid.tolist() == [True, False, True]
+    assert validated.invalid.tolist() == [False, True, False]
+    assert validated.valid_signals() == [PDQ, PDQ]
+    assert PdqSignal.validate_signals([]).valid.tolist() == []
+
+
+def test_validate_hex_signals():
+    assert validate_hex_signals(
+        ["T1ABCDEF09", "T1abcdef09", "T2ABCDEF09", "ABCDEF09", "T1ABCDEG09"],
+        8,
+        prefix="T1",
+        lowercase=False,
+    ).tolist() == [True, False, False, False, False]
+    # Every char at the edges of the hex ranges
+    assert validate_hex_signals(list("/09:`af" + "g@AFG"), 1).tolist() == [
+        False,
+        True,
+        True,
+        False,
+        False,
+        True,
+        True,
+        False,
+        False,
+        False,
+        False,
+        False,
+    ]
+
+
+@pytest.mark.parametrize(
+    "signal_type",
+    [st for st in _DEFAULT_SIGNAL_TYPES if issubclass(st, CanGenerateRandomSignal)],
+)
+def test_random_signals_are_valid(signal_type):
+    for _ in range(20):
+        signal = signal_type.get_random_signal()
+        assert signal_type.validate_signal_str(signal) == signal
+
+
+def test_default_catches_any_exception():
+    # TrendQuerySignal raises KeyError for JSON that isn't a query
+    validated = TrendQuerySignal.validate_signals(
+        [TrendQuerySignal.get_examples()[0], '{"x": 1}', "not json"]
+    )
+    assert validated.valid.tolist() == [True, False, False]
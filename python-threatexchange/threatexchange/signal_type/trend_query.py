@@ -5,7 +5,9 @@
 Wrapper around the Trend Query (keywords and regexes) content type.
 """
 
+from dataclasses import dataclass, field
 import json
+import random
 import re
 import typing as t
 from threatexchange.content_type.content_base import ContentType
@@ -27,10 +29,16 @@ class TrendQuery:
 
     # re.pattern is not in 3.6, which is what we are targeting right now
     def __init__(self, query_json: t.Dict[str, t.Any]) -> None:
+        self.and_term_strs: t.List[t.List[str]] = [
+            list(and_["or"]) for and_ in query_json["and"]
+        ]
+        self.not_term_strs: t.List[str] = list(query_json["not"])
         self.and_terms: t.List[t.List[t.Any]] = [
-            [self._parse_term(t) for t in and_["or"]] for and_ in query_json["and"]
+            [self._parse_term(t) for t in or_] for or_ in self.and_term_strs
+        ]
+        self.not_terms: t.List[t.Any] = [
+            self._parse_term(t) for t in self.not_term_strs
         ]
-        self.not_terms: t.List[t.Any] = [self._parse_term(t) for t in query_json["not"]]
 
     def _parse_term(self, t) -> t.Any:
         if t.startswith(self.REGEX_PREFIX):
@@ -49,8 +57,142 @@ class TrendQuery:
         return False
 
 
+@dataclass
+class _CompiledTerms:
+    """An or of terms, split into literals (as a bitmask) and regexes"""
+
+    literal_mask: int = 0
+    regexes: t.List[t.Any] = field(default_factory=list)
+
+
+@dataclass
+class _CompiledTrendQuery:
+    and_terms: t.List[_CompiledTerms]
+    not_terms: _CompiledTerms
+
+
+_WORD_BOUNDARY_RE = re.compile(r"\b")
+
+# Key in a trie node for the id of the literal ending there (never a char)
+_LITERAL_ID = ""
+
+
+def _iter_bits(mask: int) -> t.Iterator[int]:
+    """The index of every set bit in mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class CompiledTrendQueries:
+    """
+    Matches text against many TrendQueries at once
+
+    Instead of running every term of every query as its own regex, all the
+    literal (non-regex) terms are found in one pass over the text, by
+    walking a trie of them from each word boundary, and queries are
+    evaluated as bitmasks over which literals were found. Queries that need
+    one of a set of literals are only looked at if one of those was found,
+    and regex terms are only run for queries that literals haven't already
+    decided.
+    """
+
+    def __init__(self, queries: t.Sequence[TrendQuery]) -> None:
+        self._literal_ids: t.Dict[str, int] = {}
+        self._queries = [
+            _CompiledTrendQuery(
+                [
+                    self._compile_terms(strs, parsed)
+                    for strs, parsed in zip(q.and_term_strs, q.and_terms)
+                ],
+                self._compile_terms(q.not_term_strs, q.not_terms),
+            )
+            for q in queries
+        ]
+        # literal id => queries that can't match without it
+        self._queries_by_literal: t.Dict[int, t.List[int]] = {}
+        # queries that could match without any literals
+        self._always_check: t.List[int] = []
+        for i, q in enumerate(self._queries):
+            trigger = next((o for o in q.and_terms if not o.regexes), None)
+            if trigger is None:
+                self._always_check.append(i)
+                continue
+            for literal_id in _iter_bits(trigger.literal_mask):
+                self._queries_by_literal.setdefault(literal_id, []).append(i)
+        # char => child node, and _LITERAL_ID => id of the literal ending here
+        self._trie: t.Dict[str, t.Any] = {}
+        for literal, literal_id in self._literal_ids.items():
+            node = self._trie
+            for c in literal:
+                node = node.setdefault(c, {})
+            node[_LITERAL_ID] = literal_id
+
+    def _compile_terms(
+        self, term_strs: t.List[str], parsed_terms: t.List[t.Any]
+    ) -> _CompiledTerms:
+        ret = _CompiledTerms()
+        for term, parsed in zip(term_strs, parsed_terms):
+            # Empty literals match on any word boundary, leave those to re
+            if term.startswith(TrendQuery.REGEX_PREFIX) or not term:
+                ret.regexes.append(parsed)
+                continue
+            ret.literal_mask |= 1 << self._literal_ids.setdefault(
+                term, len(self._literal_ids)
+            )
+        return ret
+
+    def _find_literals(self, text: str) -> t.Tuple[int, t.Set[int]]:
+        """Returns the literals found with word boundaries in text"""
+        found = 0
+        found_ids: t.Set[int] = set()
+        if not self._literal_ids:
+            return found, found_ids
+
+        # Same boundaries as the \b around literals in TrendQuery
+        boundaries = {m.start() for m in _WORD_BOUNDARY_RE.finditer(text)}
+        for start in boundaries:
+            node = self._trie
+            for end in range(start, len(text)):
+                child: t.Optional[t.Dict[str, t.Any]] = node.get(text[end])
+                if child is None:
+                    break
+                node = child
+                literal_id = node.get(_LITERAL_ID)
+                if literal_id is not None and end + 1 in boundaries:
+                    found_ids.add(literal_id)
+        for literal_id in found_ids:
+            found |= 1 << literal_id
+        return found, found_ids
+
+    def matches(self, text: str) -> t.List[int]:
+        """The idx of every query that matches text"""
+        found, found_ids = self._find_literals(text)
+        candidates = set(self._always_check)
+        for literal_id in found_ids:
+            candidates.update(self._queries_by_literal.get(literal_id, ()))
+        ret = []
+        for i in sorted(candidates):
+            q = self._queries[i]
+            if q.not_terms.literal_mask & found:
+                continue
+            undecided = [o for o in q.and_terms if not o.literal_mask & found]
+            if any(not o.regexes for o in undecided):
+                continue
+            if not all(any(r.search(text) for r in o.regexes) for o in undecided):
+                continue
+            if any(r.search(text) for r in q.not_terms.regexes):
+                continue
+            ret.append(i)
+        return ret
+
+
 class TrendQuerySignal(
-    signal_base.SignalType, signal_base.MatchesStr, HasFbThreatExchangeIndicatorType
+    signal_base.SignalType,
+    signal_base.MatchesStr,
+    signal_base.CanGenerateRandomSignal,
+    HasFbThreatExchangeIndicatorType,
 ):
     """
     Trend Queries are a combination of and/or/not regexes.
@@ -86,6 +228,18 @@ class TrendQuerySignal(
     def get_index_cls(cls) -> t.Type[index.SignalTypeIndex]:
         return TrendQueryIndex
 
+    @classmethod
+    def get_random_signal(cls) -> str:
+        return json.dumps(
+            {
+                "and": [
+                    {"or": signal_base.random_words(random.randint(1, 5))}
+                    for _ in range(random.randint(1, 3))
+                ],
+                "not": signal_base.random_words(random.randint(0, 3)),
+            }
+        )
+
     @staticmethod
     def get_examples() -> t.List[str]:
         return [
@@ -112,15 +266,21 @@ class TrendQuerySignal(
 class TrendQueryIndex(index.SignalTypeIndex[index.T]):
     def __init__(self) -> None:
         self.state: t.Dict[str, t.Tuple[TrendQuery, t.List[index.T]]] = {}
+        # Built on the first query after an add
+        self._compiled: t.Optional[CompiledTrendQueries] = None
 
     # TODO - Figure out how to properly capture hash vs search
     def query(self, hash: str) -> t.List[index.IndexMatch[index.T]]:
+        states = list(self.state.values())
+        compiled = getattr(self, "_compiled", None)  # Pickled before it existed
+        if compiled is None:
+            compiled = CompiledTrendQueries([tq for tq, _ in states])
+            self._compiled = compiled
         ret: t.List[index.IndexMatch[index.T]] = []
-        for tq, values in self.state.values():
-            if tq.matches(hash):
-                ret.extend(
-                    index.IndexMatch(index.SignalSimilarityInfo(), v) for v in values
-                )
+        for i in compiled.matches(hash):
+            ret.extend(
+                index.IndexMatch(index.SignalSimilarityInfo(), v) for v in states[i][1]
+            )
         return ret
 
     def add(self, hash: str, value: index.T) -> None:
@@ -132,5 +292,6 @@ class TrendQueryIndex(index.SignalTypeIndex[index.T]):
                 TrendQuery(query_json),
                 [value],
             )
+            self._compiled = None
         else:
             old_val[1].append(value)
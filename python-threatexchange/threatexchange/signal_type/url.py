@@ -5,23 +5,148 @@
 Wrapper around the URL signal type.
 """
 
+import hashlib
+import itertools
+import random
 import typing as t
+from urllib.parse import parse_qsl, urlencode, urlsplit
 
 from threatexchange.content_type.content_base import ContentType
 from threatexchange.content_type.url import URLContent
-from threatexchange.signal_type import signal_base
+from threatexchange.signal_type import index, signal_base
+from threatexchange.signal_type.exact_index import ExactMatchIndex
 from threatexchange.exchanges.impl.fb_threatexchange_signal import (
     HasFbThreatExchangeIndicatorType,
 )
 
+DEFAULT_PORTS = {"http": 80, "https": 443, "ftp": 21}
+# Query params that only track where a link was shared, and never change
+# what it points at. Also anything starting with "utm_".
+TRACKING_PARAMS = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "dclid",
+        "gbraid",
+        "wbraid",
+        "msclkid",
+        "yclid",
+        "twclid",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "_ga",
+    }
+)
+
+# In the trie, the component after the host labels that starts the path,
+# with the port if it's not the default
+_PORT_PREFIX = ":"
+
+
+class _ParsedURL(t.NamedTuple):
+    host_labels: t.List[str]
+    port: str
+    path_segments: t.List[str]
+    query: str
+
+    def canonical(self) -> str:
+        ret = ".".join(reversed(self.host_labels))
+        if self.port:
+            ret += f":{self.port}"
+        if self.path_segments:
+            ret += "/" + "/".join(self.path_segments)
+        if self.query:
+            ret += f"?{self.query}"
+        return ret
+
+    def trie_path(self) -> t.List[str]:
+        """Reversed host labels, then the port (if any) and path segments"""
+        ret = list(self.host_labels)
+        if self.port or self.path_segments:
+            ret.append(_PORT_PREFIX + self.port)
+            ret.extend(self.path_segments)
+        return ret
+
+
+def _parse_url(url: str) -> _ParsedURL:
+    url = url.strip()
+    try:
+        return _parse_stripped_url(url)
+    except ValueError:
+        # i.e. "http://[bad", which urlsplit() can't parse, so compare as-is
+        return _ParsedURL(host_labels=[url], port="", path_segments=[], query="")
+
+
+def _parse_stripped_url(url: str) -> _ParsedURL:
+    if "://" not in url:
+        url = f"http://{url}"
+    parts = urlsplit(url)
+    host = (parts.hostname or "").rstrip(".")
+    try:
+        port = parts.port
+    except ValueError:
+        # Garbage after the colon - keep it as part of the host, but not
+        # the userinfo, same as hostname
+        host = parts.netloc.rpartition("@")[2].lower()
+        port = None
+    if port is None or port == DEFAULT_PORTS.get(parts.scheme.lower()):
+        port_str = ""
+    else:
+        port_str = str(port)
+    # By name only: the order of a repeated param's values can matter
+    query = urlencode(
+        sorted(
+            (
+                (k, v)
+                for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                if not (k.lower() in TRACKING_PARAMS or k.lower().startswith("utm_"))
+            ),
+            key=lambda kv: kv[0],
+        )
+    )
+    if ":" in host:
+        # IPv6, which shouldn't be split on "." or look like a port
+        host_labels = [f"[{host}]"]
+    else:
+        host_labels = host.split(".")[::-1] if host else []
+    return _ParsedURL(
+        host_labels=host_labels,
+        port=port_str,
+        path_segments=[s for s in parts.path.split("/") if s],
+        query=query,
+    )
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so that links to the same thing compare equal
+
+    * The scheme is removed (like common.normalize_url()), and with it any
+      default port for the scheme
+    * The host is lowercased, but not the path, which is case sensitive
+    * Empty path segments (i.e. trailing and duplicate slashes) are removed
+    * Tracking query params are removed, and the rest are sorted by name
+    * The fragment is removed
+
+    Strings that can't be parsed as URLs are only stripped of whitespace.
+
+    HtTPS://Example.com:443/a//b/?utm_source=x&z=1&y=2#top => example.com/a/b?y=2&z=1
+    """
+    return _parse_url(url).canonical()
+
 
 class URLSignal(
     signal_base.SimpleSignalType,
     signal_base.MatchesStr,
+    signal_base.CanGenerateRandomSignal,
     HasFbThreatExchangeIndicatorType,
 ):
     """
     Wrapper around URL links, such as https://github.com/
+
+    URLs are compared after canonicalize_url(), so different links to the
+    same page still match.
     """
 
     INDICATOR_TYPE = {"URI", "RAW_URI"}
@@ -31,17 +156,21 @@ class URLSignal(
         return [URLContent]
 
     @classmethod
-    def get_index_cls(cls) -> t.Type[signal_base.TrivialSignalTypeIndex]:
-        # TODO - There are a lot more considerations than this
-        #        as well as normalizations that could be applied
-        return signal_base.TrivialSignalTypeIndex
+    def get_index_cls(cls) -> t.Type["URLIndex"]:
+        return URLIndex
 
     @classmethod
     def matches_str(
         cls, signal: str, haystack: str
     ) -> signal_base.SignalComparisonResult:
-        # TODO - normalization
-        return signal_base.SignalComparisonResult.from_bool_only(signal == haystack)
+        return signal_base.SignalComparisonResult.from_bool_only(
+            canonicalize_url(signal) == canonicalize_url(haystack)
+        )
+
+    @classmethod
+    def get_random_signal(cls) -> str:
+        host, tld, *path = signal_base.random_words(random.randint(2, 5))
+        return f"https://{host}.{tld[:3]}/" + "/".join(path)
 
     @staticmethod
     def get_examples() -> t.List[str]:
@@ -56,3 +185,138 @@ class URLSignal(
         return super().normalize_fb_threatexchange_indicator(
             tx_type, tx_indicator, tx_tag
         )
+
+
+class URLIndex(ExactMatchIndex[index.T]):
+    """
+    Exact matches of URLs, after canonicalize_url()
+
+    See URLTrieIndex for also finding URLs by host or prefix.
+    """
+
+    _KEY_KIND = 2
+
+    @classmethod
+    def signal_to_key(cls, signal_str: str) -> t.Optional[bytes]:
+        return hashlib.md5(canonicalize_url(signal_str).encode()).digest()
+
+
+class _URLTrieNode(t.Generic[index.T]):
+    __slots__ = ("children", "entries")
+
+    def __init__(self) -> None:
+        self.children: t.Dict[str, "_URLTrieNode[index.T]"] = {}
+        # query string ("" for none) => entries
+        self.entries: t.Dict[str, t.List[index.T]] = {}
+
+    def walk(self) -> t.Iterator["_URLTrieNode[index.T]"]:
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.children.values())
+
+
+class URLTrieIndex(index.SignalTypeIndex[index.T]):
+    """
+    URLs, canonicalized on add, in a trie of reversed host labels then path
+
+    i.e. https://www.example.com/a/b is stored under com -> example -> www
+    -> (port) -> a -> b, so every lookup only walks as many nodes as the URL
+    has components, no matter how many URLs are in the index. As well as
+    exact matches with query(), this allows finding every URL on a host
+    with query_host(), and every indexed URL that is a prefix of a URL with
+    query_prefix().
+
+    A node per component costs a lot more memory than URLIndex, and it's
+    serialized with pickle, so it isn't URLSignal's index. Use it directly
+    for these lookups.
+    """
+
+    def __init__(self) -> None:
+        self._root: _URLTrieNode[index.T] = _URLTrieNode()
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, signal_str: str, entry: index.T) -> None:
+        url = _parse_url(signal_str)
+        node = self._root
+        for component in url.trie_path():
+            child = node.children.get(component)
+            if child is None:
+                child = _URLTrieNode()
+                node.children[component] = child
+            node = child
+        node.entries.setdefault(url.query, []).append(entry)
+        self._len += 1
+
+    def query(self, query: str) -> t.List[index.IndexMatch[index.T]]:
+        """Entries for the same URL, after canonicalization"""
+        url = _parse_url(query)
+        node = self._find(url.trie_path())
+        if node is None:
+            return []
+        return self._matches(node.entries.get(url.query, ()))
+
+    def query_prefix(self, query: str) -> t.List[index.IndexMatch[index.T]]:
+        """
+        Entries for every URL that query is on, or under
+
+        A URL without a path (e.g. example.com) also matches every subdomain
+        and port, and a URL with a path (e.g. example.com/a) matches every
+        URL under that path on the same host and port. URLs with query
+        params only match as in query().
+        """
+        url = _parse_url(query)
+        node = self._root
+        ret = self._matches(node.entries.get("", ()))
+        for component in url.trie_path():
+            child = node.children.get(component)
+            if child is None:
+                return ret
+            node = child
+            ret.extend(self._matches(node.entries.get("", ())))
+        if url.query:
+            ret.extend(self._matches(node.entries.get(url.query, ())))
+        return ret
+
+    def query_host(
+        self, host: str, include_subdomains: bool = True
+    ) -> t.List[index.IndexMatch[index.T]]:
+        """Entries for every URL on host (and optionally its subdomains)"""
+        node = self._find(_parse_url(host).host_labels)
+        if node is None:
+            return []
+        nodes: t.Iterable[_URLTrieNode[index.T]] = node.walk()
+        if not include_subdomains:
+            nodes = itertools.chain(
+                [node],
+                *(
+                    child.walk()
+                    for component, child in node.children.items()
+                    if component.startswith(_PORT_PREFIX)
+                ),
+            )
+        return [
+            match
+            for n in nodes
+            for entries in n.entries.values()
+            for match in self._matches(entries)
+        ]
+
+    def _find(self, trie_path: t.List[str]) -> t.Optional[_URLTrieNode[index.T]]:
+        node = self._root
+        for component in trie_path:
+            child = node.children.get(component)
+            if child is None:
+                return None
+            node = child
+        return node
+
+    @staticmethod
+    def _matches(
+        entries: t.Iterable[index.T],
+    ) -> t.List[index.IndexMatch[index.T]]:
+        return [index.IndexMatch(index.SignalSimilarityInfo(), e) for e in entries]
@@ -11,6 +11,7 @@ from threatexchange.content_type.content_base import ContentType
 from threatexchange.content_type.url import URLContent
 
 from threatexchange.signal_type import signal_base
+from threatexchange.signal_type.exact_index import MD5ExactMatchIndex
 from threatexchange import common
 from threatexchange.signal_type.url import URLSignal
 from threatexchange.exchanges.impl.fb_threatexchange_signal import (
@@ -21,6 +22,7 @@ from threatexchange.exchanges.impl.fb_threatexchange_signal import (
 class UrlMD5Signal(
     signal_base.SimpleSignalType,
     signal_base.TextHasher,
+    signal_base.CanGenerateRandomSignal,
     HasFbThreatExchangeIndicatorType,
 ):
     """
@@ -34,8 +36,8 @@ class UrlMD5Signal(
         return [URLContent]
 
     @classmethod
-    def get_index_cls(cls) -> t.Type[signal_base.TrivialSignalTypeIndex]:
-        return signal_base.TrivialSignalTypeIndex
+    def get_index_cls(cls) -> t.Type[MD5ExactMatchIndex]:
+        return MD5ExactMatchIndex
 
     @classmethod
     def hash_from_str(cls, url: str) -> str:
@@ -43,6 +45,10 @@ class UrlMD5Signal(
         url_hash = hashlib.md5(encoded_url)
         return url_hash.hexdigest()
 
+    @classmethod
+    def get_random_signal(cls) -> str:
+        return cls.hash_from_str(URLSignal.get_random_signal())
+
     @staticmethod
     def get_examples() -> t.List[str]:
         return [UrlMD5Signal.hash_from_str(s) for s in URLSignal.get_examples()]
@@ -12,7 +12,6 @@ from threatexchange.tests.hashing.utils import (
     get_similar_hash,
 )
 
-
 test_hashes = [
     "0000000000000000000000000000000000000000000000000000000000000000",
     "0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f",
@@ -79,6 +78,45 @@ class TestPDQUtils(unittest.TestCase):
             simple_distance(test_hashes[1], test_hashes[3]), BITS_IN_PDQ // 2
         )
 
+    def test_distance_same_as_binary(self):
+        hashes = [get_random_hash() for _ in range(20)]
+        hashes += [get_similar_hash(hashes[0], d) for d in (1, 31, 200)]
+        for a in hashes:
+            for b in hashes:
+                self.assertEqual(
+                    simple_distance(a, b),
+                    simple_distance_binary(hex_to_binary_str(a), hex_to_binary_str(b)),
+                )
+
+    def test_hashes_to_uint8_array(self):
+        arr = pdq_hashes_to_uint8_array(test_hashes)
+        self.assertEqual(arr.shape, (len(test_hashes), PDQ_BYTES))
+        self.assertEqual(arr[1].tobytes().hex(), test_hashes[1])
+        self.assertEqual(pdq_hashes_to_uint8_array([]).shape, (0, PDQ_BYTES))
+        self.assertRaises(ValueError, pdq_hashes_to_uint8_array, [test_hashes[0][1:]])
+        self.assertRaises(
+            ValueError, pdq_hashes_to_uint8_array, [test_hashes[0][1:] + "g"]
+        )
+        bits = convert_pdq_strings_to_ndarray(test_hashes)
+        self.assertEqual(bits.shape, (len(test_hashes), BITS_IN_PDQ))
+        self.assertEqual("".join(map(str, bits[1])), hex_to_binary_str(test_hashes[1]))
+
+    def test_distance_matrix(self):
+        a = [get_random_hash() for _ in range(7)] + test_hashes
+        b = [get_random_hash() for _ in range(5)] + test_hashes
+        distances = pdq_distance_matrix(
+            pdq_hashes_to_uint8_array(a), pdq_hashes_to_uint8_array(b)
+        )
+        self.assertEqual(distances.shape, (len(a), len(b)))
+        for i, hash_a in enumerate(a):
+            for j, hash_b in enumerate(b):
+                self.assertEqual(distances[i, j], simple_distance(hash_a, hash_b))
+        empty = pdq_hashes_to_uint8_array([])
+        self.assertEqual(
+            pdq_distance_matrix(empty, pdq_hashes_to_uint8_array(b)).shape,
+            (0, len(b)),
+        )
+
     def test_match_threshold(self):
         self.assertFalse(pdq_match(test_hashes[0], test_hashes[1], threshold=31))
         self.assertTrue(
@@ -0,0 +1,94 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import io
+import pathlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from threatexchange.content_type.photo import PhotoContent
+from threatexchange.content_type.preprocess import unletterboxing
+from threatexchange.signal_type.pdq import pdq_hasher
+
+
+def reference_borders(image, black_threshold):
+    """The original pixel-by-pixel scan"""
+    width, height = image.size
+    pixels = image.load()
+
+    def is_black_row(y):
+        return all(
+            unletterboxing.is_pixel_black(pixels[x, y], black_threshold)
+            for x in range(width)
+        )
+
+    def is_black_col(x):
+        return all(
+            unletterboxing.is_pixel_black(pixels[x, y], black_threshold)
+            for y in range(height)
+        )
+
+    def leading(is_black, lines):
+        for i, line in enumerate(lines):
+            if not is_black(line):
+                return i
+        return len(lines)
+
+    return (
+        leading(is_black_row, range(height)),
+        leading(is_black_row, range(height - 1, -1, -1)),
+        leading(is_black_col, range(width)),
+        leading(is_black_col, range(width - 1, -1, -1)),
+    )
+
+
+def letterboxed(top, bottom, left, right, size=(20, 30), fill=(10, 10, 10)):
+    arr = np.random.randint(40, 256, size=size + (3,), dtype=np.uint8)
+    arr[:top] = fill
+    arr[arr.shape[0] - bottom :] = fill
+    arr[:, :left] = fill
+    arr[:, arr.shape[1] - right :] = fill
+    return Image.fromarray(arr, "RGB")
+
+
+@pytest.mark.parametrize(
+    "borders", [(0, 0, 0, 0), (3, 0, 0, 0), (0, 4, 0, 0), (2, 3, 5, 7), (0, 0, 1, 1)]
+)
+@pytest.mark.parametrize("black_threshold", [0, 10, 15])
+def test_same_as_reference(borders, black_threshold):
+    image = letterboxed(*borders)
+    expected = reference_borders(image, black_threshold)
+    assert unletterboxing.detect_borders(image, black_threshold) == expected
+    assert (
+        unletterboxing.detect_top_border(image, black_threshold),
+        unletterboxing.detect_bottom_border(image, black_threshold),
+        unletterboxing.detect_left_border(image, black_threshold),
+        unletterboxing.detect_right_border(image, black_threshold),
+    ) == expected
+
+
+def test_one_channel_over_threshold():
+    image = letterboxed(2, 2, 2, 2, fill=(0, 0, 0))
+    image.putpixel((10, 0), (0, 0, 1))
+    assert unletterboxing.detect_borders(image, 0) == (0, 2, 2, 2)
+    assert unletterboxing.detect_borders(image, 1) == (2, 2, 2, 2)
+
+
+def test_all_black():
+    image = Image.new("RGB", (6, 4))
+    assert unletterboxing.detect_borders(image) == (4, 4, 6, 6)
+    assert unletterboxing.detect_borders(image.convert("L")) == (4, 4, 6, 6)
+
+
+def test_unletterbox(tmp_path: pathlib.Path):
+    image = letterboxed(2, 3, 5, 7, fill=(0, 0, 0))
+    path = tmp_path / "image.png"
+    image.save(path)
+    cropped = PhotoContent.unletterbox_image(image)
+    assert cropped.size == (30 - 5 - 7, 20 - 2 - 3)
+    with Image.open(io.BytesIO(PhotoContent.unletterbox(path))) as from_file:
+        assert np.array_equal(np.asarray(from_file), np.asarray(cropped))
+        assert pdq_hasher.pdq_from_image(cropped) == pdq_hasher.pdq_from_image(
+            from_file
+        )
@@ -63,6 +63,38 @@ class FFmpegHasher {
   }
 
   bool run(std::vector<hashing::vpdqFeature>& pdqHashes) {
+    const bool decoded = decode();
+
+    // Signal to the threads that no more frames will be added to the queue
+    pdqHashes = m_vpdqhasher.finish();
+
+    return decoded;
+  }
+
+  // Like run(), but passes features to callback as they become available.
+  // Stops decoding early if callback returns false.
+  bool runStreaming(FeatureCallback callback, void* context) {
+    m_callback = callback;
+    m_callbackContext = context;
+
+    const bool decoded = decode();
+
+    // Signal to the threads that no more frames will be added to the queue
+    auto const remaining = m_vpdqhasher.finish();
+    for (auto const& feature : remaining) {
+      if (!emit(feature)) {
+        break;
+      }
+    }
+
+    return decoded;
+  }
+
+ private:
+  // Decode all frames (or until a streaming callback stops us), adding
+  // the ones that should be hashed to m_vpdqhasher.
+  // Returns false on decoding errors.
+  bool decode() {
     // Create packet used to read frames
     // The packet is moved into processPacket() in order
     // to reuse the same packet for each frame to avoid allocs
@@ -74,7 +106,8 @@ class FFmpegHasher {
 
     // Read frames in a loop and process them
     bool failed = false;
-    while (av_read_frame(m_video->formatContext.get(), packet.get()) == 0) {
+    while (!m_stopped &&
+           av_read_frame(m_video->formatContext.get(), packet.get()) == 0) {
       // Check if the packet belongs to the video stream
       try {
         processPacket(*packet);
@@ -85,6 +118,11 @@ class FFmpegHasher {
       }
     }
 
+    if (m_stopped) {
+      // Stopped early by the streaming callback, no need to flush
+      return true;
+    }
+
     if (!failed) {
       // Flush decode buffer
       // See for more information:
@@ -98,12 +136,21 @@ class FFmpegHasher {
       }
     }
 
-    // Signal to the threads that no more frames will be added to the queue
-    pdqHashes = m_vpdqhasher.finish();
-
     return !failed;
   }
 
+  // Pass a feature to the streaming callback, if any.
+  // Returns false if hashing should stop.
+  bool emit(const vpdqFeature& feature) {
+    if (m_stopped) {
+      return false;
+    }
+    if (!m_callback(&feature, m_callbackContext)) {
+      m_stopped = true;
+    }
+    return !m_stopped;
+  }
+
   // Decode and add vpdqFeature to the hashes vector
   // Increments the passed frame number
   // Returns back the processed packet
@@ -179,6 +226,17 @@ class FFmpegHasher {
         FFmpegFrame frame{
             std::move(targetFrame), static_cast<uint64_t>(frameNumber)};
         m_vpdqhasher.push_back(std::move(frame));
+
+        if (m_callback != nullptr) {
+          for (auto const& feature : m_vpdqhasher.pop_ready()) {
+            if (!emit(feature)) {
+              break;
+            }
+          }
+          if (m_stopped) {
+            break;
+          }
+        }
       }
     }
 
@@ -186,24 +244,22 @@ class FFmpegHasher {
     av_packet_unref(&packet);
   }
 
- private:
   std::unique_ptr<FFmpegVideo> m_video;
   VpdqHasher<FFmpegFrame> m_vpdqhasher;
   AVFramePtr m_decodeFrame;
   int m_frameMod{};
+  FeatureCallback m_callback{nullptr};
+  void* m_callbackContext{nullptr};
+  bool m_stopped{false};
 };
 
-} // namespace
-
-// Get pdq hashes for selected frames every secondsPerHash
-bool hashVideoFile(
+// Open the video and prepare it for hashing.
+// Returns nullptr on failure.
+std::unique_ptr<FFmpegVideo> openVideo(
     const std::string& inputVideoFileName,
-    std::vector<hashing::vpdqFeature>& pdqHashes,
     bool verbose,
-    const double secondsPerHash,
     const int downsampleWidth,
-    const int downsampleHeight,
-    const unsigned int num_threads) {
+    const int downsampleHeight) {
   // These are lavu_log_constants from "libavutil/log.h"
   // It can be helpful for debugging to
   // set this to AV_LOG_DEBUG or AV_LOG_VERBOSE
@@ -224,7 +280,7 @@ bool hashVideoFile(
   } catch (const std::runtime_error& e) {
     std::cerr << "Error while attempting to read video file: " << e.what()
               << '\n';
-    return false;
+    return nullptr;
   }
 
   // If downsampleWidth or downsampleHeight is 0,
@@ -239,6 +295,26 @@ bool hashVideoFile(
   // Create image rescaler context
   if (!video->createSwsContext()) {
     std::cerr << "Error while attempting to create sws context.\n";
+    return nullptr;
+  }
+
+  return video;
+}
+
+} // namespace
+
+// Get pdq hashes for selected frames every secondsPerHash
+bool hashVideoFile(
+    const std::string& inputVideoFileName,
+    std::vector<hashing::vpdqFeature>& pdqHashes,
+    bool verbose,
+    const double secondsPerHash,
+    const int downsampleWidth,
+    const int downsampleHeight,
+    const unsigned int num_threads) {
+  auto video =
+      openVideo(inputVideoFileName, verbose, downsampleWidth, downsampleHeight);
+  if (video == nullptr) {
     return false;
   }
 
@@ -248,6 +324,27 @@ bool hashVideoFile(
   return hasher.run(pdqHashes);
 }
 
+bool hashVideoFileStreaming(
+    const std::string& inputVideoFileName,
+    FeatureCallback callback,
+    void* context,
+    bool verbose,
+    const double secondsPerHash,
+    const int downsampleWidth,
+    const int downsampleHeight,
+    const unsigned int num_threads) {
+  auto video =
+      openVideo(inputVideoFileName, verbose, downsampleWidth, downsampleHeight);
+  if (video == nullptr) {
+    return false;
+  }
+
+  // Create frame hasher
+  FFmpegHasher hasher(std::move(video), num_threads, secondsPerHash);
+
+  return hasher.runStreaming(callback, context);
+}
+
 } // namespace hashing
 } // namespace vpdq
 } // namespace facebook
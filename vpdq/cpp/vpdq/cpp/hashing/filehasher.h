@@ -39,6 +39,49 @@ bool hashVideoFile(
     const int downsampleHeight = 0,
     const unsigned int num_threads = 0);
 
+/**
+ * @brief Called with each frame's feature during streaming hashing.
+ *
+ * Takes a pointer rather than a reference to be easy to bind from C.
+ *
+ * @param feature The next hashed frame. Only valid during the call.
+ * @param context The context pointer passed to hashVideoFileStreaming.
+ *
+ * @return true to keep hashing, false to stop early.
+ */
+using FeatureCallback = bool (*)(const vpdqFeature* feature, void* context);
+
+/**
+ * @brief Hashes the video file, passing each frame's feature to a callback
+ *        as soon as it is available, instead of all at the end.
+ *
+ * Features are passed in frame order, and the callback is always called on
+ * the thread that called this function. Returning false from the callback
+ * stops decoding, which is useful to avoid decoding the rest of a long video.
+ *
+ * @param inputVideoFileName Input video path.
+ * @param callback Called once per hashed frame.
+ * @param context Passed through to callback.
+ * @param verbose Output details for diagnostic purposes.
+ * @param secondsPerHash The interval for frame hashing.
+ * @param downsampleWidth Width to downsample to before hashing. 0 means no
+ *                        downsample
+ * @param downsampleHeight Height to downsample to before hashing. 0 means no
+ *                         downsample
+ * @param num_threads Number of threads to use for hashing. 0 is auto.
+ *
+ * @return Video hashed successfully (including if stopped by the callback).
+ */
+bool hashVideoFileStreaming(
+    const std::string& inputVideoFileName,
+    FeatureCallback callback,
+    void* context,
+    bool verbose = false,
+    const double secondsPerHash = 1,
+    const int downsampleWidth = 0,
+    const int downsampleHeight = 0,
+    const unsigned int num_threads = 0);
+
 } // namespace hashing
 } // namespace vpdq
 } // namespace facebook
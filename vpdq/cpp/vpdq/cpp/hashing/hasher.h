@@ -10,6 +10,7 @@
 #include <cmath>
 #include <condition_variable>
 #include <cstdio>
+#include <deque>
 #include <fstream>
 #include <functional>
 #include <iostream>
@@ -97,6 +98,17 @@ class VpdqHasher {
    **/
   std::vector<vpdqFeature> finish();
 
+  /** @brief Remove and return the hashes that are finished so far, in frame
+   *         order.
+   *
+   * Stops at the first frame that is still waiting to be hashed, so that
+   * repeated calls return every frame exactly once and in order. Frames
+   * returned here are not included in the result of finish().
+   *
+   * @return The newly available hashes, possibly empty.
+   **/
+  std::vector<vpdqFeature> pop_ready();
+
   VpdqHasher() = delete;
   VpdqHasher(VpdqHasher const&) = delete;
   VpdqHasher& operator=(VpdqHasher const&) = delete;
@@ -143,6 +155,12 @@ class VpdqHasher {
    **/
   std::vector<vpdqFeature> m_result;
 
+  /** @brief Frame numbers added with push_back() and not yet returned by
+   *         pop_ready(), in the order they were added. Guarded by
+   *         m_result_mutex.
+   **/
+  std::deque<int> m_unpopped_frames;
+
   /** @brief Hashes frames from the queue and inserts the PDQ hash into the
    *         result.
    **/
@@ -210,6 +228,10 @@ VpdqHasher<TFrame>::VpdqHasher(
 
 template <typename TFrame>
 void VpdqHasher<TFrame>::push_back(TFrame&& frame) {
+  {
+    std::lock_guard<std::mutex> lock(m_result_mutex);
+    m_unpopped_frames.push_back(static_cast<int>(frame.get_frame_number()));
+  }
   if (m_multithreaded) {
     {
       std::lock_guard<std::mutex> lock(m_queue_mutex);
@@ -259,6 +281,30 @@ std::vector<vpdqFeature> VpdqHasher<TFrame>::finish() {
   return m_result;
 }
 
+template <typename TFrame>
+std::vector<vpdqFeature> VpdqHasher<TFrame>::pop_ready() {
+  std::lock_guard<std::mutex> lock(m_result_mutex);
+
+  std::sort(
+      std::begin(m_result),
+      std::end(m_result),
+      [](const vpdqFeature& a, const vpdqFeature& b) {
+        return a.frameNumber < b.frameNumber;
+      });
+
+  std::size_t ready_count{0};
+  while (ready_count < m_result.size() && !m_unpopped_frames.empty() &&
+         m_result[ready_count].frameNumber == m_unpopped_frames.front()) {
+    m_unpopped_frames.pop_front();
+    ++ready_count;
+  }
+
+  std::vector<vpdqFeature> ready(
+      std::begin(m_result), std::begin(m_result) + ready_count);
+  m_result.erase(std::begin(m_result), std::begin(m_result) + ready_count);
+  return ready;
+}
+
 template <typename TFrame>
 void VpdqHasher<TFrame>::hasher(TFrame& frame) {
   auto hashedFrame = hashFrame(frame, m_video_metadata);
@@ -163,3 +163,32 @@ def test_compare_hashes():
                 if h1.quality >= QUALITY_TOLERANCE and h2.quality >= QUALITY_TOLERANCE:
                     assert h1.hamming_distance(h2) < DISTANCE_TOLERANCE
                     assert h1.frame_number == h2.frame_number
+
+
+def test_streaming_matches_compute_hash():
+    test_files = get_test_file_paths()
+    video_file = test_files[0]
+
+    expected = vpdq.computeHash(input_video_filename=video_file, thread_count=2)
+    streamed = []
+    completed = vpdq.computeHashStreaming(video_file, streamed.append, thread_count=2)
+    assert completed
+    assert [(f.frame_number, f.hex) for f in streamed] == [
+        (f.frame_number, f.hex) for f in expected
+    ]
+
+    # Stop after the first few frames
+    early = []
+
+    def take_three(feature) -> bool:
+        early.append(feature)
+        return len(early) < 3
+
+    assert not vpdq.computeHashStreaming(video_file, take_three, thread_count=2)
+    assert [f.hex for f in early] == [f.hex for f in expected[:3]]
+
+    def explode(feature):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        vpdq.computeHashStreaming(video_file, explode)
@@ -35,6 +35,8 @@ cdef extern from "vpdq/cpp/hashing/vpdqHashType.h" namespace "facebook::vpdq::ha
 
 
 cdef extern from "vpdq/cpp/hashing/filehasher.h" namespace "facebook::vpdq::hashing":
+    ctypedef bool (*FeatureCallback)(const vpdqFeature* feature, void* context) noexcept
+
     bool hashVideoFile(
         string input_video_filename,
         vector[vpdqFeature]& pdqHashes,
@@ -45,6 +47,17 @@ cdef extern from "vpdq/cpp/hashing/filehasher.h" namespace "facebook::vpdq::hash
         unsigned int thread_count,
     )
 
+    bool hashVideoFileStreaming(
+        string input_video_filename,
+        FeatureCallback callback,
+        void* context,
+        bool verbose,
+        double seconds_per_hash,
+        int width,
+        int height,
+        unsigned int thread_count,
+    ) nogil
+
 
 @dataclass
 class VpdqFeature:
@@ -97,6 +110,27 @@ def hamming_distance(hash1: Hash256, hash2: Hash256) -> int:
     return hammingDistance(hash1, hash2)
 
 
+def _check_hash_args(
+    input_video_filename: t.Union[str, Path],
+    seconds_per_hash: float,
+    downsample_width: int,
+    downsample_height: int,
+    thread_count: int,
+) -> str:
+    str_path = str(input_video_filename)
+    if not Path(str_path).is_file():
+        raise ValueError("Input_video_filename doesn't exist")
+    if seconds_per_hash < 0:
+        raise ValueError("Seconds_per_hash must be non-negative")
+    if downsample_width < 0:
+        raise ValueError("Downsample_width must be non-negative")
+    if downsample_height < 0:
+        raise ValueError("Downsample_height must be non-negative")
+    if thread_count < 0:
+        raise ValueError("Thread_count must be non-negative")
+    return str_path
+
+
 def computeHash(
     input_video_filename: t.Union[str, Path],
     ffmpeg_path: t.Union[str, None] = None,
@@ -119,17 +153,13 @@ def computeHash(
     Returns:
         list of vpdq_feature: VPDQ hash from the video
     """
-    str_path = str(input_video_filename)
-    if not Path(str_path).is_file():
-        raise ValueError("Input_video_filename doesn't exist")
-    if seconds_per_hash < 0:
-        raise ValueError("Seconds_per_hash must be non-negative")
-    if downsample_width < 0:
-        raise ValueError("Downsample_width must be non-negative")
-    if downsample_height < 0:
-        raise ValueError("Downsample_height must be non-negative")
-    if thread_count < 0:
-        raise ValueError("Thread_count must be non-negative")
+    str_path = _check_hash_args(
+        input_video_filename,
+        seconds_per_hash,
+        downsample_width,
+        downsample_height,
+        thread_count,
+    )
     cdef vector[vpdqFeature] vpdq_hash;
     
 
@@ -153,6 +183,95 @@ def computeHash(
     return hashes
 
 
+class _StreamingState:
+    def __init__(self, callback: t.Callable[[VpdqFeature], t.Optional[bool]]):
+        self.callback = callback
+        self.stopped = False
+        self.error: t.Optional[BaseException] = None
+
+
+cdef bool _on_streamed_feature(const vpdqFeature* feature, void* context) noexcept with gil:
+    state = <object>context
+    try:
+        keep_going = state.callback(
+            VpdqFeature(
+                feature.quality,
+                feature.frameNumber,
+                feature.pdqHash,
+                feature.timeStamp,
+            )
+        )
+    except BaseException as e:
+        state.error = e
+        keep_going = False
+    if keep_going is False:
+        state.stopped = True
+        return False
+    return True
+
+
+def computeHashStreaming(
+    input_video_filename: t.Union[str, Path],
+    callback: t.Callable[[VpdqFeature], t.Optional[bool]],
+    seconds_per_hash: float = 1.0,
+    verbose: bool = False,
+    downsample_width: int = 0,
+    downsample_height: int = 0,
+    thread_count: int = 0,
+) -> bool:
+    """Compute vpdq hash, passing each frame's feature to callback as it is hashed
+
+    Features are passed in frame order. The GIL is released while decoding,
+    so other python threads can process features as they arrive.
+
+    Args:
+        input_video_filename: Input video file path
+        callback: Called with each VpdqFeature. Return False to stop hashing early.
+          If it raises, hashing stops and the exception is re-raised.
+        seconds_per_hash: The frequence(per second) a hash is generated from the video. If it is 0, will generate every frame's hash
+        verbose: If verbose, will print detailed information
+        downsample_width: Width to downsample the video to before hashing frames. If it is 0, will use the original width of the video to hash
+        downsample_height: Height to downsample the video to before hashing frames. If it is 0, will use the original height of the video to hash
+        thread_count: Number of threads for hashing. If it is 0, will use choose automatically
+    Returns:
+        True if the whole video was hashed, False if callback stopped early
+    """
+    str_path = _check_hash_args(
+        input_video_filename,
+        seconds_per_hash,
+        downsample_width,
+        downsample_height,
+        thread_count,
+    )
+    state = _StreamingState(callback)
+    cdef string c_path = str_path.encode("utf-8")
+    cdef void* context = <void*>state
+    cdef bool c_verbose = verbose
+    cdef double c_seconds_per_hash = seconds_per_hash
+    cdef int c_width = downsample_width
+    cdef int c_height = downsample_height
+    cdef unsigned int c_thread_count = thread_count
+    cdef bool rt
+
+    with nogil:
+        rt = hashVideoFileStreaming(
+            c_path,
+            _on_streamed_feature,
+            context,
+            c_verbose,
+            c_seconds_per_hash,
+            c_width,
+            c_height,
+            c_thread_count,
+        )
+
+    if state.error is not None:
+        raise state.error
+    if not rt:
+        raise Exception("Fail to create VPDQ hash")
+    return not state.stopped
+
+
 def _cli():
     import argparse
 